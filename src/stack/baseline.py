@@ -0,0 +1,173 @@
+"""Performance baselines for smoke and load runs.
+
+Every run is appended to a history file together with the HEAD commit of
+each repo in repos.yaml. A run can be saved as the baseline for its kind
+(smoke or load), and later runs compared against it: a metric regresses
+when its p95 moves in the wrong direction by more than the threshold.
+Metrics with fewer than MIN_GATE_SAMPLES samples on either side are
+compared but never gate, since a p95 over a handful of samples is mostly
+noise.
+"""
+
+import json
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from stack.config import get_repo_graph, get_workspace_root
+from stack.telemetry import percentile
+
+DEFAULT_THRESHOLD = 0.25
+
+# Regressions smaller than this many seconds are treated as noise
+MIN_LATENCY_DELTA = 0.005
+
+# Samples a metric needs in both runs before its p95 can fail a comparison
+MIN_GATE_SAMPLES = 5
+
+
+def get_perf_dir() -> Path:
+    """Get the directory holding performance history and baselines."""
+    return get_workspace_root() / "state" / "perf"
+
+
+def stats(values: list[float]) -> dict | None:
+    """Summarize samples as p50/p95/p99 and a count, or None if empty."""
+    if not values:
+        return None
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "count": len(values),
+    }
+
+
+def _repo_state(repo_path: Path) -> dict:
+    def git(*args: str) -> str | None:
+        result = subprocess.run(
+            ["git", *args], cwd=repo_path, capture_output=True, text=True
+        )
+        return result.stdout.strip() if result.returncode == 0 else None
+
+    return {
+        "sha": git("rev-parse", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+def get_repo_states() -> dict[str, dict | None]:
+    """Get the HEAD commit and dirty flag of every repo, or None if missing."""
+    graph = get_repo_graph()
+    repo_paths = graph.existing()
+    with ThreadPoolExecutor(max_workers=max(len(repo_paths), 1)) as pool:
+        states = dict(zip(repo_paths, pool.map(_repo_state, repo_paths.values())))
+    return {repo_key: states.get(repo_key) for repo_key in graph}
+
+
+def record_run(kind: str, metrics: dict[str, dict | None]) -> dict:
+    """Append a run with the current repo commits to the history file.
+
+    Args:
+        kind: Run kind, e.g. "smoke" or "load".
+        metrics: Mapping of metric name to stats() output.
+
+    Returns:
+        The recorded run.
+    """
+    run = {
+        "kind": kind,
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "repos": get_repo_states(),
+        "metrics": {name: s for name, s in metrics.items() if s is not None},
+    }
+    path = get_perf_dir() / "history.jsonl"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(run) + "\n")
+    return run
+
+
+def _baseline_path(kind: str) -> Path:
+    return get_perf_dir() / f"baseline-{kind}.json"
+
+
+def save_baseline(run: dict) -> Path:
+    """Save a run as the baseline for its kind."""
+    path = _baseline_path(run["kind"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(run, indent=2) + "\n")
+    return path
+
+
+def load_baseline(kind: str) -> dict | None:
+    """Load the baseline for a run kind, or None if none was saved."""
+    try:
+        return json.loads(_baseline_path(kind).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _direction(metric: str) -> int:
+    """+1 if higher values are worse, -1 if lower are worse, 0 if not gated."""
+    if metric.endswith("events"):
+        return 0
+    if metric.endswith("per_s"):
+        return -1
+    return 1
+
+
+def compare(baseline: dict, run: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """Compare the p95 of every metric present in both runs.
+
+    Returns:
+        One dict per compared metric with its name, baseline and current
+        p95, relative change, whether it had enough samples to be gated and
+        whether it regressed.
+    """
+    rows = []
+    for name, current in run["metrics"].items():
+        base = baseline["metrics"].get(name)
+        if base is None:
+            continue
+        before, after = base["p95"], current["p95"]
+        change = (after - before) / before if before else 0.0
+        direction = _direction(name)
+        gated = min(base["count"], current["count"]) >= MIN_GATE_SAMPLES
+        regressed = gated and direction != 0 and direction * change > threshold
+        if regressed and direction > 0 and after - before < MIN_LATENCY_DELTA:
+            regressed = False
+        rows.append(
+            {
+                "metric": name,
+                "baseline": before,
+                "current": after,
+                "change": change,
+                "gated": gated,
+                "regressed": regressed,
+            }
+        )
+    return rows
+
+
+def changed_repos(baseline: dict, run: dict) -> list[tuple[str, str, str]]:
+    """List repos whose commit differs between the baseline and the run.
+
+    Returns:
+        Tuples of (repo key, baseline description, current description),
+        where a description is a short SHA with "+dirty" for local changes.
+    """
+
+    def describe(state: dict | None) -> str:
+        if not state or not state.get("sha"):
+            return "missing"
+        return state["sha"][:10] + ("+dirty" if state.get("dirty") else "")
+
+    changed = []
+    for repo_key in {**baseline.get("repos", {}), **run["repos"]}:
+        before = describe(baseline.get("repos", {}).get(repo_key))
+        after = describe(run["repos"].get(repo_key))
+        if before != after or after.endswith("+dirty"):
+            changed.append((repo_key, before, after))
+    return changed
@@ -0,0 +1,166 @@
+"""Content-addressed cache for validation step results.
+
+Entries are keyed by a hash of everything a step's outcome depends on: the
+repo key, the tree state (HEAD tree, uncommitted diff and untracked files) of
+the repository and of every repo it depends on, the toolchain versions and
+the step command. Each entry is a small JSON file under
+`state/cache/validate/`; file mtimes double as LRU timestamps for eviction.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import subprocess
+import time
+from pathlib import Path
+
+from stack.config import get_workspace_root
+
+# Bump to invalidate every existing entry when the key format changes
+CACHE_VERSION = 2
+
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+def get_cache_dir() -> Path:
+    """Get the directory holding validation cache entries."""
+    return get_workspace_root() / "state" / "cache" / "validate"
+
+
+def _git(repo_path: Path, *args: str) -> bytes | None:
+    """Run a git command in repo_path and return its stdout, or None on failure."""
+    try:
+        result = subprocess.run(
+            ["git", *args],
+            cwd=repo_path,
+            capture_output=True,
+            check=True,
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+    return result.stdout
+
+
+def tree_fingerprint(repo_path: Path) -> str | None:
+    """Hash the working tree state of a repository.
+
+    Returns:
+        Hex digest covering the committed tree, the uncommitted diff and the
+        contents of untracked (non-ignored) files, or None if repo_path is not
+        a git repository.
+    """
+    head = _git(repo_path, "rev-parse", "HEAD^{tree}")
+    if head is None:
+        # Repositories without commits have no HEAD; fall back to the diff alone
+        if _git(repo_path, "rev-parse", "--git-dir") is None:
+            return None
+        head = b""
+
+    diff = _git(repo_path, "diff", "HEAD", "--binary") or b""
+    untracked = _git(repo_path, "ls-files", "--others", "--exclude-standard", "-z")
+
+    digest = hashlib.sha256()
+    digest.update(head)
+    digest.update(b"\0diff\0")
+    digest.update(diff)
+    for name in sorted(filter(None, (untracked or b"").split(b"\0"))):
+        digest.update(b"\0untracked\0" + name + b"\0")
+        try:
+            digest.update((repo_path / os.fsdecode(name)).read_bytes())
+        except OSError:
+            continue
+    return digest.hexdigest()
+
+
+@functools.cache
+def tool_version(tool: str) -> str:
+    """Return the `--version` output of a tool, or an empty string if unavailable."""
+    try:
+        result = subprocess.run(
+            [tool, "--version"],
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return ""
+    return result.stdout.strip()
+
+
+def step_key(
+    repo_key: str, fingerprints: dict[str, str], tools: list[str], cmd: list[str]
+) -> str:
+    """Compute the cache key for a validation step.
+
+    Args:
+        repo_key: Repository the step runs in.
+        fingerprints: Tree fingerprints of the repository and of every repo
+            it transitively depends on, keyed by repo key.
+        tools: Toolchain whose versions the outcome depends on.
+        cmd: Step command.
+    """
+    payload = {
+        "version": CACHE_VERSION,
+        "repo": repo_key,
+        "trees": fingerprints,
+        "tools": {tool: tool_version(tool) for tool in sorted(tools)},
+        "cmd": cmd,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def load_result(key: str) -> dict | None:
+    """Return the cached entry for key, marking it as recently used."""
+    path = get_cache_dir() / f"{key}.json"
+    try:
+        entry = json.loads(path.read_text())
+        os.utime(path)
+    except (OSError, ValueError):
+        return None
+    return entry
+
+
+def store_result(key: str, entry: dict) -> None:
+    """Store an entry for key. Write failures are ignored; the cache is best-effort."""
+    cache_dir = get_cache_dir()
+    path = cache_dir / f"{key}.json"
+    tmp_path = cache_dir / f".{key}.{os.getpid()}.tmp"
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_text(json.dumps({**entry, "created": time.time()}))
+        os.replace(tmp_path, path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+
+
+def evict(
+    max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES
+) -> int:
+    """Remove least recently used entries until the cache fits its bounds.
+
+    Returns:
+        Number of entries removed.
+    """
+    cache_dir = get_cache_dir()
+    if not cache_dir.is_dir():
+        return 0
+
+    entries = []
+    for path in cache_dir.glob("*.json"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    entries.sort(reverse=True)
+    total_bytes = sum(size for _, size, _ in entries)
+    removed = 0
+    while entries and (len(entries) > max_entries or total_bytes > max_bytes):
+        _, size, path = entries.pop()
+        path.unlink(missing_ok=True)
+        total_bytes -= size
+        removed += 1
+    return removed
@@ -1,20 +1,19 @@
-"""Stack management CLI entry point."""
+"""Stack management CLI entry point.
 
+Command modules are imported inside the command functions rather than at
+module level, so a subcommand only pays for its own dependencies (httpx,
+jinja2, yaml, rich tables, ...) and not for every other command's.
+"""
+
+from pathlib import Path
 from typing import Annotated
 
 import typer
 
-from stack.commands.clone import clone as clone_cmd
-from stack.commands.down import down as down_cmd
-from stack.commands.logs import logs as logs_cmd
-from stack.commands.new_sprint import new_sprint as new_sprint_cmd
-from stack.commands.prompt import prompt_impl as prompt_impl_cmd
-from stack.commands.prompt import prompt_plan as prompt_plan_cmd
-from stack.commands.smoke import smoke as smoke_cmd
-from stack.commands.up import up as up_cmd
-from stack.commands.validate import validate as validate_cmd
-
 prompt_app = typer.Typer(help="Output planner or implementer prompt from templates.")
+standin_app = typer.Typer(
+    help="Run a local PCP stand-in that records, replays or synthesizes streams."
+)
 
 app = typer.Typer(
     name="stack",
@@ -24,9 +23,47 @@ app = typer.Typer(
 
 
 @app.command()
-def clone() -> None:
+def clone(
+    jobs: Annotated[
+        int | None,
+        typer.Option("--jobs", "-j", min=1, help="Maximum concurrent clones"),
+    ] = None,
+    partial: Annotated[
+        bool,
+        typer.Option(
+            "--partial", help="Make blobless partial clones (--filter=blob:none)"
+        ),
+    ] = False,
+    depth: Annotated[
+        int | None,
+        typer.Option("--depth", min=1, help="Make shallow clones of this depth"),
+    ] = None,
+    mirror_cache: Annotated[
+        Path | None,
+        typer.Option(
+            "--mirror-cache",
+            envvar="STACK_MIRROR_CACHE",
+            help="Shared directory of bare mirrors to clone with --reference",
+        ),
+    ] = None,
+) -> None:
     """Clone all repositories defined in repos.yaml."""
-    clone_cmd()
+    from stack.commands.clone import clone as clone_cmd
+
+    clone_cmd(jobs=jobs, partial=partial, depth=depth, mirror_cache=mirror_cache)
+
+
+@app.command()
+def sync(
+    jobs: Annotated[
+        int | None,
+        typer.Option("--jobs", "-j", min=1, help="Maximum repos synced concurrently"),
+    ] = None,
+) -> None:
+    """Fetch all repositories and fast-forward the clean ones."""
+    from stack.commands.sync import sync as sync_cmd
+
+    sync_cmd(jobs=jobs)
 
 
 @app.command()
@@ -35,17 +72,63 @@ def up(
         bool,
         typer.Option("--with-observability", help="Include observability infrastructure"),
     ] = False,
+    services: Annotated[
+        str | None,
+        typer.Option(
+            "--services",
+            help="Comma-separated services or repos to rebuild (e.g. pcp,aisp)",
+        ),
+    ] = None,
+    changed: Annotated[
+        bool,
+        typer.Option(
+            "--changed",
+            help="Only rebuild services whose sources changed since their last build",
+        ),
+    ] = False,
 ) -> None:
     """Start the stack using docker compose."""
-    up_cmd(with_observability=with_observability)
+    from stack.commands.up import up as up_cmd
+
+    selected = [name.strip() for name in services.split(",")] if services else None
+    up_cmd(with_observability=with_observability, services=selected, changed=changed)
 
 
 @app.command()
 def down() -> None:
     """Stop the stack using docker compose."""
+    from stack.commands.down import down as down_cmd
+
     down_cmd()
 
 
+@app.command()
+def status(
+    live: Annotated[
+        bool,
+        typer.Option(
+            "--live", help="Follow docker events and sample resources until Ctrl+C"
+        ),
+    ] = False,
+    interval: Annotated[
+        float,
+        typer.Option("--interval", min=0.5, help="Seconds between resource samples"),
+    ] = 5.0,
+    json_output: Annotated[
+        bool,
+        typer.Option("--json", help="Print JSON (one snapshot per line with --live)"),
+    ] = False,
+    duration: Annotated[
+        float | None,
+        typer.Option("--duration", min=0, help="Stop --live after this many seconds"),
+    ] = None,
+) -> None:
+    """Show container state and CPU/memory/network usage per service."""
+    from stack.commands.status import status as status_cmd
+
+    status_cmd(live=live, interval=interval, json_output=json_output, duration=duration)
+
+
 @app.command()
 def validate(
     quick: Annotated[
@@ -56,8 +139,85 @@ def validate(
         bool,
         typer.Option("--full", help="Run validation on all repos"),
     ] = False,
+    jobs: Annotated[
+        int | None,
+        typer.Option(
+            "--jobs",
+            "-j",
+            min=1,
+            help="Maximum repos validated concurrently (default: core count)",
+        ),
+    ] = None,
+    no_cache: Annotated[
+        bool,
+        typer.Option("--no-cache", help="Re-run every step, ignoring cached results"),
+    ] = False,
+    fail_fast: Annotated[
+        bool,
+        typer.Option(
+            "--fail-fast",
+            help="Stream step output and cancel all repos on the first failure",
+        ),
+    ] = False,
+    report_json: Annotated[
+        Path | None,
+        typer.Option("--report-json", help="Write a JSON timing report to this path"),
+    ] = None,
+    report_junit: Annotated[
+        Path | None,
+        typer.Option("--report-junit", help="Write a JUnit XML report to this path"),
+    ] = None,
+    trends: Annotated[
+        bool,
+        typer.Option("--trends", help="Show step duration trends from past runs"),
+    ] = False,
+    base: Annotated[
+        str,
+        typer.Option(
+            "--base", help="Ref to diff against (via merge-base) in quick mode"
+        ),
+    ] = "main",
+    shards: Annotated[
+        int,
+        typer.Option(
+            "--shards",
+            min=1,
+            help="Split the pytest suite of uv repos into this many parallel shards",
+        ),
+    ] = 1,
+    impact: Annotated[
+        bool,
+        typer.Option(
+            "--impact",
+            help="Record test coverage on full runs; run only impacted tests on quick runs",
+        ),
+    ] = False,
+    watch: Annotated[
+        bool,
+        typer.Option(
+            "--watch", help="Watch repos and re-run affected steps on every change"
+        ),
+    ] = False,
 ) -> None:
     """Validate repositories by running build/format/lint/test."""
+    from stack.commands.validate import show_trends as show_trends_cmd
+    from stack.commands.validate import validate as validate_cmd
+    from stack.commands.validate import watch as watch_cmd
+
+    if trends:
+        show_trends_cmd()
+        return
+
+    if watch:
+        watch_cmd(
+            jobs=jobs,
+            use_cache=not no_cache,
+            fail_fast=fail_fast,
+            shards=shards,
+            use_impact=impact,
+        )
+        return
+
     # Default to quick if neither flag is specified
     if not quick and not full:
         quick = True
@@ -65,28 +225,211 @@ def validate(
     # If both are specified, full takes precedence
     run_full = full
 
-    validate_cmd(full=run_full)
+    validate_cmd(
+        full=run_full,
+        jobs=jobs,
+        use_cache=not no_cache,
+        fail_fast=fail_fast,
+        report_json=report_json,
+        report_junit=report_junit,
+        base_ref=base,
+        shards=shards,
+        use_impact=impact,
+    )
 
 
 @app.command()
-def smoke() -> None:
+def smoke(
+    scenario: Annotated[
+        list[str] | None,
+        typer.Option(
+            "--scenario", "-s", help="Only run this scenario (repeatable)"
+        ),
+    ] = None,
+    base_url: Annotated[
+        str | None,
+        typer.Option(
+            "--base-url",
+            help="Run against this API base URL instead of the local stack",
+        ),
+    ] = None,
+    save_baseline: Annotated[
+        bool,
+        typer.Option("--save-baseline", help="Save this run as the baseline"),
+    ] = False,
+    compare_baseline: Annotated[
+        bool,
+        typer.Option(
+            "--compare-baseline",
+            help="Fail if p95 metrics regressed against the saved baseline",
+        ),
+    ] = False,
+    regression_threshold: Annotated[
+        float,
+        typer.Option(
+            "--regression-threshold",
+            min=0,
+            help="Allowed relative p95 regression (0.25 = 25%)",
+        ),
+    ] = 0.25,
+    repeat: Annotated[
+        int | None,
+        typer.Option(
+            "--repeat",
+            min=1,
+            help="Run the scenarios this many times "
+            "(default: 5 with a baseline option, else 1)",
+        ),
+    ] = None,
+) -> None:
     """Run a smoke test of the entire stack."""
-    smoke_cmd()
+    from stack.commands.smoke import smoke as smoke_cmd
+
+    smoke_cmd(
+        scenarios=scenario,
+        base_url=base_url,
+        save_baseline=save_baseline,
+        compare_baseline=compare_baseline,
+        threshold=regression_threshold,
+        repeat=repeat,
+    )
+
+
+@app.command()
+def load(
+    sessions: Annotated[
+        int,
+        typer.Option("--sessions", "-n", min=1, help="Concurrent chat sessions"),
+    ] = 10,
+    turns: Annotated[
+        int,
+        typer.Option("--turns", "-m", min=1, help="Turns sent per session"),
+    ] = 1,
+    ramp_up: Annotated[
+        float,
+        typer.Option("--ramp-up", min=0, help="Seconds to spread session starts over"),
+    ] = 0.0,
+    max_rps: Annotated[
+        float | None,
+        typer.Option(
+            "--max-rps",
+            min=0.01,
+            help="Cap on turn requests started per second (not a target rate)",
+        ),
+    ] = None,
+    base_url: Annotated[
+        str | None,
+        typer.Option("--base-url", help="API base URL (default: the local stack)"),
+    ] = None,
+    save_baseline: Annotated[
+        bool,
+        typer.Option("--save-baseline", help="Save this run as the baseline"),
+    ] = False,
+    compare_baseline: Annotated[
+        bool,
+        typer.Option(
+            "--compare-baseline",
+            help="Fail if p95 metrics regressed against the saved baseline",
+        ),
+    ] = False,
+    regression_threshold: Annotated[
+        float,
+        typer.Option(
+            "--regression-threshold",
+            min=0,
+            help="Allowed relative p95 regression (0.25 = 25%)",
+        ),
+    ] = 0.25,
+) -> None:
+    """Load test the chat turn path with concurrent sessions."""
+    from stack.commands.load import load as load_cmd
+    from stack.commands.perf import BASE_URL
+
+    load_cmd(
+        sessions=sessions,
+        turns=turns,
+        ramp_up=ramp_up,
+        max_rps=max_rps,
+        base_url=base_url or BASE_URL,
+        save_baseline=save_baseline,
+        compare_baseline=compare_baseline,
+        threshold=regression_threshold,
+    )
 
 
 @app.command()
 def logs(
-    service: Annotated[
-        str,
-        typer.Argument(help="Service to view logs for (pcp, aisp, or uip)"),
-    ],
+    services: Annotated[
+        list[str] | None,
+        typer.Argument(
+            help="Services to view logs for (default: pcp, aisp and uip); "
+            "start with 'search' to search the captured archive instead"
+        ),
+    ] = None,
     follow: Annotated[
         bool,
         typer.Option("-f", "--follow", help="Follow log output"),
     ] = False,
+    request_id: Annotated[
+        str | None,
+        typer.Option("--request-id", help="Only lines with this request or trace id"),
+    ] = None,
+    since: Annotated[
+        str | None,
+        typer.Option("--since", help="Only logs newer than this (e.g. 5m, 2h)"),
+    ] = None,
+    level: Annotated[
+        str | None,
+        typer.Option("--level", help="Minimum level (trace, debug, info, warn, ...)"),
+    ] = None,
+    until: Annotated[
+        str | None,
+        typer.Option("--until", help="Only logs older than this (e.g. 5m, 2h)"),
+    ] = None,
+    capture: Annotated[
+        bool,
+        typer.Option("--capture", help="Also store the logs in the local archive"),
+    ] = False,
+    archive: Annotated[
+        Path | None,
+        typer.Option("--archive", help="Archive directory (default: state/logs)"),
+    ] = None,
+    max_archive_mb: Annotated[
+        int,
+        typer.Option("--max-archive-mb", help="Archive size limit when capturing"),
+    ] = 256,
 ) -> None:
-    """View docker compose logs for a service."""
-    logs_cmd(service=service, follow=follow)
+    """View docker compose logs of services, interleaved by time.
+
+    `stack logs search [SERVICES] --request-id X` searches the captured
+    archive instead, without docker.
+    """
+    from stack.commands import logs as logs_module
+
+    if services and services[0] == "search":
+        if follow or capture:
+            raise typer.BadParameter("--follow and --capture can't be used with search")
+        logs_module.logs_search(
+            services=services[1:] or None,
+            request_id=request_id,
+            since=since,
+            level=level,
+            until=until,
+            archive=archive,
+        )
+        return
+
+    logs_module.logs(
+        services=services,
+        follow=follow,
+        request_id=request_id,
+        since=since,
+        level=level,
+        until=until,
+        capture=capture,
+        archive=archive,
+        max_bytes=max_archive_mb * 1024 * 1024,
+    )
 
 
 @app.command()
@@ -97,12 +440,16 @@ def new_sprint(
     ],
 ) -> None:
     """Archive the current sprint file and create a new one from the template."""
+    from stack.commands.new_sprint import new_sprint as new_sprint_cmd
+
     new_sprint_cmd(sprint_name)
 
 
 @prompt_app.command("plan")
 def prompt_plan() -> None:
     """Output the planner prompt template."""
+    from stack.commands.prompt import prompt_plan as prompt_plan_cmd
+
     prompt_plan_cmd()
 
 
@@ -114,10 +461,88 @@ def prompt_impl(
     ],
 ) -> None:
     """Output the implementer prompt for a work item."""
+    from stack.commands.prompt import prompt_impl as prompt_impl_cmd
+
     prompt_impl_cmd(work_item)
 
 
+@standin_app.command("record")
+def standin_record(
+    cassette: Annotated[
+        str,
+        typer.Argument(help="Cassette name (under state/cassettes) or path"),
+    ],
+    upstream: Annotated[
+        str,
+        typer.Option("--upstream", help="Origin of the real PCP"),
+    ] = "http://localhost:8000",
+    port: Annotated[
+        int,
+        typer.Option("--port", "-p", help="Local port to listen on"),
+    ] = 8765,
+) -> None:
+    """Proxy to a running PCP and record its exchanges into a cassette."""
+    from stack.commands.standin import record
+
+    record(cassette, upstream=upstream, port=port)
+
+
+@standin_app.command("replay")
+def standin_replay(
+    cassette: Annotated[
+        str,
+        typer.Argument(help="Cassette name (under state/cassettes) or path"),
+    ],
+    speed: Annotated[
+        float,
+        typer.Option(
+            "--speed", min=0, help="Timing scale (2 = twice as fast, 0 = no delays)"
+        ),
+    ] = 1.0,
+    port: Annotated[
+        int,
+        typer.Option("--port", "-p", help="Local port to listen on"),
+    ] = 8765,
+) -> None:
+    """Replay a recorded cassette with faithful or scaled timing."""
+    from stack.commands.standin import replay
+
+    replay(cassette, speed=speed, port=port)
+
+
+@standin_app.command("synthetic")
+def standin_synthetic(
+    tokens_per_s: Annotated[
+        float,
+        typer.Option("--token-rate", min=0, help="Tokens per second (0 = no delay)"),
+    ] = 50.0,
+    tokens: Annotated[
+        int | None,
+        typer.Option("--tokens", min=1, help="Tokens per turn (default: the text)"),
+    ] = None,
+    ttft: Annotated[
+        float,
+        typer.Option("--ttft", min=0, help="Seconds before the first token"),
+    ] = 0.2,
+    text: Annotated[
+        str,
+        typer.Option("--text", help="Response text streamed token by token"),
+    ] = "The answer is 35.",
+    port: Annotated[
+        int,
+        typer.Option("--port", "-p", help="Local port to listen on"),
+    ] = 8765,
+) -> None:
+    """Serve generated token streams at a configurable rate."""
+    from stack.commands.standin import synthetic
+
+    synthetic(
+        tokens_per_s=tokens_per_s, tokens=tokens, ttft=ttft, text=text, port=port
+    )
+
+
 app.add_typer(prompt_app, name="prompt")
+app.add_typer(standin_app, name="standin")
 
 
 if __name__ == "__main__":
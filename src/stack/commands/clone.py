@@ -1,46 +1,195 @@
 """Clone command implementation."""
 
+import hashlib
+import os
+import re
 import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-import typer
 from rich.console import Console
+from rich.live import Live
+from rich.markup import escape
 from rich.table import Table
 
-from stack.config import get_repos_config, get_workspace_root
+from stack.config import get_repo_graph
 
 console = Console()
 
+# Default number of repositories cloned concurrently
+DEFAULT_CLONE_JOBS = 8
 
-def clone() -> None:
-    """Clone all repositories defined in repos.yaml."""
-    config = get_repos_config()
-    repos = config.get("repos", {})
-    workspace = get_workspace_root()
+# git separates progress updates on one line with carriage returns
+_PROGRESS_SEPARATOR = re.compile(rb"[\r\n]")
 
+_mirror_locks: dict[Path, threading.Lock] = {}
+_mirror_locks_guard = threading.Lock()
+
+
+def clone(
+    jobs: int | None = None,
+    partial: bool = False,
+    depth: int | None = None,
+    mirror_cache: Path | None = None,
+) -> None:
+    """Clone all repositories defined in repos.yaml that are not checked out.
+
+    Args:
+        jobs: Maximum number of concurrent clones. Defaults to DEFAULT_CLONE_JOBS.
+        partial: If True, make blobless partial clones (`--filter=blob:none`);
+            file contents are fetched on demand at checkout.
+        depth: If given, make shallow clones with this many commits of history.
+        mirror_cache: Directory of bare mirrors shared between workspaces.
+            Each repo's mirror is created or refreshed there and the clone
+            borrows its objects via `--reference`, so only objects missing
+            from the mirror cross the network. Clones depend on the mirror
+            staying in place afterwards.
+
+    Note:
+        git ignores `--depth` and `--filter` for plain local paths; use
+        `file://` URLs to exercise them against local bare repositories.
+    """
+    graph = get_repo_graph()
+    rows: dict[str, dict] = {}
+    to_clone = []
+
+    for repo_key, repo in graph.repos.items():
+        if repo.path.exists():
+            rows[repo_key] = {"status": "Already exists", "path": repo.path}
+        elif not repo.url:
+            rows[repo_key] = {
+                "status": "[red]No url in repos.yaml[/red]",
+                "path": repo.path,
+            }
+        else:
+            rows[repo_key] = {"status": "[yellow]Queued[/yellow]", "path": repo.path}
+            to_clone.append(repo_key)
+
+    if not to_clone:
+        console.print(_build_clone_table(rows))
+        return
+
+    lock = threading.Lock()
+
+    def update(repo_key: str, status: str) -> None:
+        with lock:
+            rows[repo_key]["status"] = status
+            live.update(_build_clone_table(rows))
+
+    def run(repo_key: str) -> bool:
+        repo = graph[repo_key]
+        start = time.monotonic()
+        cmd = ["git", "clone", "--progress"]
+        if partial:
+            cmd.append("--filter=blob:none")
+        if depth is not None:
+            cmd.append(f"--depth={depth}")
+
+        if mirror_cache is not None:
+            update(repo_key, "[yellow]Updating mirror...[/yellow]")
+            mirror, error = _update_mirror(
+                mirror_cache,
+                repo.url,
+                lambda line: update(repo_key, f"[dim]mirror: {escape(line)}[/dim]"),
+            )
+            if mirror is None:
+                update(repo_key, f"[red]Mirror failed: {escape(error)}[/red]")
+                return False
+            cmd.append(f"--reference={mirror}")
+
+        cmd.extend([repo.url, str(repo.path)])
+        returncode, error = _run_git(
+            cmd, lambda line: update(repo_key, f"[dim]{escape(line)}[/dim]")
+        )
+        elapsed = time.monotonic() - start
+        if returncode != 0:
+            update(repo_key, f"[red]Failed: {escape(error)}[/red]")
+            return False
+        update(repo_key, f"[green]Cloned[/green] [dim]({elapsed:.1f}s)[/dim]")
+        return True
+
+    max_workers = min(jobs or DEFAULT_CLONE_JOBS, len(to_clone))
+    with Live(_build_clone_table(rows), console=console) as live:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            cloned = list(pool.map(run, to_clone))
+
+    if not all(cloned):
+        raise SystemExit(1)
+
+
+def _build_clone_table(rows: dict[str, dict]) -> Table:
+    """Build the table of per-repo clone status."""
     table = Table(title="Repository Status")
     table.add_column("Repository", style="cyan")
     table.add_column("Status", style="green")
     table.add_column("Path", style="dim")
+    for repo_key, row in rows.items():
+        table.add_row(repo_key, row["status"], str(row["path"]))
+    return table
+
+
+def _run_git(cmd: list[str], on_progress) -> tuple[int, str]:
+    """Run a git command, reporting each progress update from its stderr.
+
+    Returns:
+        Tuple of (returncode, error message). The message is the first
+        `fatal:`/`error:` line, or else the last line git printed.
+    """
+    env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+    try:
+        proc = subprocess.Popen(
+            cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, env=env
+        )
+    except FileNotFoundError:
+        return 127, "git not found"
 
-    for repo_key, repo_config in repos.items():
-        url = repo_config.get("url")
-        relative_path = repo_config.get("path", f"../{repo_key}")
-        repo_path = (workspace / relative_path).resolve()
+    error = last_line = ""
+    buffer = b""
+    with proc:
+        while chunk := proc.stderr.read1(4096):
+            *lines, buffer = _PROGRESS_SEPARATOR.split(buffer + chunk)
+            for line in lines:
+                text = line.decode(errors="replace").strip()
+                if not text:
+                    continue
+                last_line = text
+                if not error and text.startswith(("fatal:", "error:")):
+                    error = text
+                on_progress(text)
+    if buffer.strip():
+        last_line = buffer.decode(errors="replace").strip()
+    return proc.returncode, error or last_line
 
-        if repo_path.exists():
-            table.add_row(repo_key, "Already exists", str(repo_path))
+
+def _mirror_path(mirror_cache: Path, url: str) -> Path:
+    """Get the bare mirror directory for a repository url."""
+    name = url.rstrip("/").rsplit("/", 1)[-1].removesuffix(".git") or "repo"
+    digest = hashlib.sha256(url.encode()).hexdigest()[:12]
+    return mirror_cache / f"{name}-{digest}.git"
+
+
+def _update_mirror(
+    mirror_cache: Path, url: str, on_progress
+) -> tuple[Path | None, str]:
+    """Create or refresh the bare mirror of url in mirror_cache.
+
+    Returns:
+        Tuple of (mirror path, or None on failure; error message).
+    """
+    mirror = _mirror_path(mirror_cache, url)
+    with _mirror_locks_guard:
+        mirror_lock = _mirror_locks.setdefault(mirror, threading.Lock())
+
+    with mirror_lock:
+        if (mirror / "HEAD").exists():
+            cmd = ["git", "--git-dir", str(mirror), "fetch", "--progress", "--prune"]
         else:
-            console.print(f"Cloning {repo_key}...", style="yellow")
-            try:
-                result = subprocess.run(
-                    ["git", "clone", url, str(repo_path)],
-                    capture_output=True,
-                    text=True,
-                    check=True,
-                )
-                table.add_row(repo_key, "Cloned", str(repo_path))
-            except subprocess.CalledProcessError as e:
-                table.add_row(repo_key, f"[red]Failed: {e.stderr.strip()}[/red]", str(repo_path))
-
-    console.print(table)
+            mirror_cache.mkdir(parents=True, exist_ok=True)
+            cmd = ["git", "clone", "--mirror", "--progress", url, str(mirror)]
+        returncode, error = _run_git(cmd, on_progress)
+
+    if returncode != 0:
+        return None, error
+    return mirror, ""
@@ -4,6 +4,7 @@ import subprocess
 
 from rich.console import Console
 
+from stack.commands.status import report_stack_state
 from stack.config import get_platform_stack_path
 
 console = Console()
@@ -42,24 +43,5 @@ def down() -> None:
         console.print(e.stderr)
         raise SystemExit(1)
 
-    _report_stack_state(stack_path)
+    report_stack_state(stack_path)
 
-
-def _report_stack_state(stack_path) -> None:
-    """Report the state of the docker compose stack."""
-    console.print("\n[bold]Stack State:[/bold]")
-    try:
-        result = subprocess.run(
-            ["docker", "compose", "-f", "compose.services.yaml", "ps"],
-            cwd=stack_path,
-            capture_output=True,
-            text=True,
-        )
-        if result.stdout:
-            console.print(result.stdout)
-        else:
-            console.print("No running containers.", style="dim")
-        if result.stderr:
-            console.print(result.stderr, style="dim")
-    except subprocess.CalledProcessError as e:
-        console.print(f"[yellow]Could not get stack state: {e}[/yellow]")
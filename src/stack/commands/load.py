@@ -0,0 +1,315 @@
+"""Load test command implementation."""
+
+import asyncio
+import time
+
+import httpx
+from rich.console import Console
+from rich.table import Table
+
+from stack import contracts, sse
+from stack.baseline import DEFAULT_THRESHOLD, stats
+from stack.commands.perf import (
+    ASSISTANT_ID,
+    BASE_URL,
+    check_baseline,
+    load_event_contract,
+)
+
+console = Console()
+
+DEFAULT_MESSAGE = "What is 7 * 5? Response only with the answer."
+TURN_TIMEOUT = 120.0
+
+
+class _RateLimiter:
+    """Spaces out acquisitions to at most `rate` per second across all tasks."""
+
+    def __init__(self, rate: float | None) -> None:
+        self._interval = 1 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if not self._interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self._interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def load(
+    sessions: int = 10,
+    turns: int = 1,
+    ramp_up: float = 0.0,
+    max_rps: float | None = None,
+    base_url: str = BASE_URL,
+    message: str = DEFAULT_MESSAGE,
+    save_baseline: bool = False,
+    compare_baseline: bool = False,
+    threshold: float = DEFAULT_THRESHOLD,
+) -> dict:
+    """Drive concurrent chat sessions through the turn path and report latencies.
+
+    Each of `sessions` virtual users creates a chat session and then sends
+    `turns` turns one after another, all over one shared connection pool.
+    Point `base_url` at a local stand-in server to exercise the client side
+    without the full stack. Events are validated against the AsyncAPI
+    contract when one is found; a violation counts as a turn error.
+
+    Args:
+        sessions: Number of concurrent sessions.
+        turns: Turns sent sequentially within each session.
+        ramp_up: Seconds over which session starts are spread evenly.
+        max_rps: Optional cap on turn requests started per second, across
+            sessions. Sessions still wait for each turn before sending the
+            next, so this limits the rate rather than driving it.
+        base_url: API base URL, e.g. http://localhost:8000/api/v1.
+        message: Message sent on every turn.
+        save_baseline: If True, save this run as the load baseline.
+        compare_baseline: If True, exit non-zero when a p95 metric regressed
+            against the saved baseline by more than threshold.
+        threshold: Allowed relative p95 regression, e.g. 0.25 for 25%.
+
+    Returns:
+        Summary dict with per-metric percentiles, counts and the error rate.
+    """
+    console.print(
+        f"[bold]Load test:[/bold] {sessions} session(s) × {turns} turn(s) "
+        f"against {base_url}"
+    )
+    contract = load_event_contract()
+    results = asyncio.run(
+        _run_load(sessions, turns, ramp_up, max_rps, base_url, message, contract)
+    )
+    summary = _summarize(results)
+    _report_load(summary)
+    passed = check_baseline(
+        "load", summary["metrics"], save_baseline, compare_baseline, threshold
+    )
+    if not passed:
+        raise SystemExit(1)
+    return summary
+
+
+async def _run_load(
+    sessions: int,
+    turns: int,
+    ramp_up: float,
+    max_rps: float | None,
+    base_url: str,
+    message: str,
+    contract: contracts.EventContract | None = None,
+) -> dict:
+    limiter = _RateLimiter(max_rps)
+    limits = httpx.Limits(
+        max_connections=sessions, max_keepalive_connections=sessions
+    )
+    results = {"sessions": [], "turns": [], "started": time.monotonic()}
+
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=TURN_TIMEOUT
+    ) as client:
+
+        async def user(index: int) -> None:
+            if ramp_up and sessions > 1:
+                await asyncio.sleep(ramp_up * index / (sessions - 1))
+            session = await _create_session(client)
+            results["sessions"].append(session)
+            if session["error"]:
+                return
+            for _ in range(turns):
+                await limiter.acquire()
+                results["turns"].append(
+                    await _send_turn(client, session["id"], message, contract)
+                )
+
+        await asyncio.gather(*(user(index) for index in range(sessions)))
+
+    results["duration"] = time.monotonic() - results["started"]
+    return results
+
+
+async def _create_session(client: httpx.AsyncClient) -> dict:
+    start = time.monotonic()
+    try:
+        response = await client.post(
+            "/chat/sessions",
+            json={"title": "Load Test Chat", "assistant_id": ASSISTANT_ID},
+        )
+    except httpx.HTTPError as e:
+        return {"id": None, "latency": None, "error": type(e).__name__}
+
+    latency = time.monotonic() - start
+    if response.status_code not in (200, 201):
+        error = f"HTTP {response.status_code}"
+        return {"id": None, "latency": latency, "error": error}
+    try:
+        session = response.json()
+    except ValueError:
+        session = None
+    if not isinstance(session, dict):
+        return {"id": None, "latency": latency, "error": "invalid JSON"}
+    return {"id": session.get("id"), "latency": latency, "error": None}
+
+
+async def _send_turn(
+    client: httpx.AsyncClient,
+    session_id: str,
+    message: str,
+    contract: contracts.EventContract | None = None,
+) -> dict:
+    """Send one turn and time its token stream.
+
+    Returns:
+        Dict with ttft, inter-token gaps, token count, total latency, the
+        server-reported turn time and an error (None on success).
+    """
+    start = time.monotonic()
+    token_times: list[float] = []
+    metrics_events: list[sse.Event] = []
+    turn = {
+        "ttft": None,
+        "gaps": [],
+        "tokens": 0,
+        "latency": None,
+        "server_time": None,
+        "error": None,
+    }
+
+    try:
+        async with client.stream(
+            "POST",
+            f"/chat/sessions/{session_id}/turns",
+            json={"message": message},
+        ) as response:
+            if response.status_code != 200:
+                turn["error"] = f"HTTP {response.status_code}"
+                return turn
+
+            done = False
+            async for event in sse.aiter_events(response.aiter_bytes()):
+                if contract is not None and contract.validate(event):
+                    turn["error"] = f"contract violation ({event.type})"
+                    break
+                if event.type == sse.METRICS:
+                    metrics_events.append(event)
+                if event.type == sse.ERROR:
+                    turn["error"] = "error event"
+                    break
+                if event.type == sse.DONE:
+                    done = True
+                    break
+                if event.content:
+                    token_times.append(event.received_at)
+            if not done and turn["error"] is None:
+                turn["error"] = "stream ended without done"
+    except httpx.HTTPError as e:
+        turn["error"] = type(e).__name__
+
+    turn["latency"] = time.monotonic() - start
+    turn["tokens"] = len(token_times)
+    turn["server_time"] = contracts.server_time(contracts.turn_metrics(metrics_events))
+    if token_times:
+        turn["ttft"] = token_times[0] - start
+        turn["gaps"] = [b - a for a, b in zip(token_times, token_times[1:])]
+        stream_time = token_times[-1] - token_times[0]
+        turn["tokens_per_s"] = (
+            (len(token_times) - 1) / stream_time if stream_time > 0 else None
+        )
+    return turn
+
+
+def _summarize(results: dict) -> dict:
+    """Reduce per-turn measurements to percentiles and counts."""
+    turns = results["turns"]
+    ok = [turn for turn in turns if turn["error"] is None]
+    sessions = results["sessions"]
+
+    failed_sessions = [s for s in sessions if s["error"]]
+    errors: dict[str, int] = {}
+    for item in [*failed_sessions, *turns]:
+        if item["error"]:
+            errors[item["error"]] = errors.get(item["error"], 0) + 1
+
+    requests = len(sessions) + len(turns)
+    return {
+        "duration": results["duration"],
+        "sessions": len(sessions),
+        "turns": len(turns),
+        "requests": requests,
+        "error_rate": sum(errors.values()) / requests if requests else 0.0,
+        "errors": errors,
+        "turns_per_s": len(ok) / results["duration"] if results["duration"] else 0.0,
+        "metrics": {
+            "session_create": stats(
+                [s["latency"] for s in sessions if not s["error"]]
+            ),
+            "ttft": stats([t["ttft"] for t in ok if t["ttft"] is not None]),
+            "inter_token": stats([gap for t in ok for gap in t["gaps"]]),
+            "tokens_per_s": stats(
+                [t["tokens_per_s"] for t in ok if t.get("tokens_per_s")]
+            ),
+            "turn_latency": stats([t["latency"] for t in ok]),
+            "server_time": stats(
+                [t["server_time"] for t in ok if t["server_time"] is not None]
+            ),
+            "overhead": stats(
+                [
+                    t["latency"] - t["server_time"]
+                    for t in ok
+                    if t["server_time"] is not None
+                ]
+            ),
+        },
+    }
+
+
+def _report_load(summary: dict) -> None:
+    """Print the load test summary as a table of percentiles."""
+    table = Table(title="Load Test Results")
+    table.add_column("Metric", style="cyan")
+    table.add_column("p50", justify="right")
+    table.add_column("p95", justify="right")
+    table.add_column("p99", justify="right")
+    table.add_column("Samples", justify="right", style="dim")
+
+    labels = {
+        "session_create": ("Session create", "ms"),
+        "ttft": ("Time to first token", "ms"),
+        "inter_token": ("Inter-token latency", "ms"),
+        "tokens_per_s": ("Tokens/s per turn", ""),
+        "turn_latency": ("Turn latency", "ms"),
+        "server_time": ("Server turn time", "ms"),
+        "overhead": ("Network/adapter overhead", "ms"),
+    }
+    for key, (label, unit) in labels.items():
+        metric = summary["metrics"][key]
+        if metric is None:
+            table.add_row(label, "-", "-", "-", "0")
+            continue
+        scale = 1000 if unit == "ms" else 1
+
+        def fmt(value: float) -> str:
+            return f"{value * scale:.1f}{unit}"
+
+        table.add_row(
+            label,
+            fmt(metric["p50"]),
+            fmt(metric["p95"]),
+            fmt(metric["p99"]),
+            str(metric["count"]),
+        )
+
+    console.print(table)
+    error_style = "red" if summary["errors"] else "green"
+    console.print(
+        f"\n[bold]Summary:[/bold] {summary['turns']} turn(s) in "
+        f"{summary['duration']:.1f}s ({summary['turns_per_s']:.1f} turns/s), "
+        f"[{error_style}]error rate {summary['error_rate']:.1%}[/{error_style}]"
+    )
+    for error, count in sorted(summary["errors"].items()):
+        console.print(f"  [red]{error}[/red]: {count}")
@@ -1,54 +1,259 @@
 """Logs command implementation."""
 
-import subprocess
-import sys
+import asyncio
+import time
+from datetime import datetime
+from pathlib import Path
 
 from rich.console import Console
+from rich.markup import escape
 
-from stack.config import get_platform_stack_path
+from stack import logarchive, logstream
+from stack.config import get_platform_stack_path, get_repo_graph
+from stack.services import SERVICE_MAP, resolve_services
 
-console = Console()
+console = Console(highlight=False)
 
-# Map short names to docker compose service names in platform-stack
-SERVICE_MAP = {
-    "pcp": "platform-api",
-    "aisp": "ai-orchestrator",
-    "uip": "web-app",
+_SERVICE_STYLES = ("cyan", "magenta", "blue", "green", "yellow")
+
+# Seconds between segment writes while capturing followed logs
+CAPTURE_FLUSH_INTERVAL = 10.0
+
+_LEVEL_STYLES = {
+    "trace": "dim",
+    "debug": "dim",
+    "warn": "yellow",
+    "error": "red",
+    "fatal": "bold red",
 }
 
 
-def logs(service: str, follow: bool = False) -> None:
-    """View docker compose logs for a service from platform-stack.
+def logs(
+    services: list[str] | None = None,
+    follow: bool = False,
+    request_id: str | None = None,
+    since: str | None = None,
+    level: str | None = None,
+    until: str | None = None,
+    capture: bool = False,
+    archive: Path | None = None,
+    max_bytes: int = logarchive.DEFAULT_MAX_BYTES,
+) -> None:
+    """View the docker compose logs of one or more services, interleaved.
 
     Args:
-        service: Service identifier (pcp, aisp, or uip)
-        follow: If True, follow the logs output
+        services: Service identifiers (pcp, aisp, uip, compose service names
+            or any repo key). Defaults to all of them.
+        follow: If True, keep streaming new log lines.
+        request_id: Only show lines whose request or trace id equals this.
+        since: Only show logs newer than this (e.g. 5m, 2h or a timestamp).
+        level: Only show lines at or above this level (e.g. warn).
+        until: Only show logs older than this.
+        capture: If True, also store every line (unfiltered) in the local
+            archive, resuming after the last captured line of each service.
+        archive: Archive directory. Defaults to state/logs.
+        max_bytes: Archive size limit; the oldest segments are deleted
+            after capturing.
     """
-    if service not in SERVICE_MAP:
-        console.print(f"[red]Unknown service: {service}[/red]")
-        console.print(f"Valid services: {', '.join(SERVICE_MAP.keys())}")
-        raise SystemExit(1)
+    compose_services = _resolve(services)
+    min_level = _resolve_level(level)
 
-    compose_service = SERVICE_MAP[service]
     stack_path = get_platform_stack_path()
-
     if not stack_path.exists():
         console.print(f"[red]Error: platform-stack not found at {stack_path}[/red]")
         console.print("Run 'stack clone' first to clone all repositories.")
         raise SystemExit(1)
 
-    cmd = ["docker", "compose", "-f", "compose.services.yaml", "logs"]
+    styles = _styles(compose_services)
+    width = max(len(service) for service in compose_services)
+    writer = logarchive.ArchiveWriter(archive) if capture else None
+    last_flush = time.monotonic()
 
-    if follow:
-        cmd.append("-f")
+    def store(record: logstream.LogRecord) -> None:
+        nonlocal last_flush
+        writer.add(record)
+        if follow and time.monotonic() - last_flush >= CAPTURE_FLUSH_INTERVAL:
+            writer.flush()
+            last_flush = time.monotonic()
 
-    cmd.append(compose_service)
+    async def run() -> int:
+        count = 0
+        async for record in logstream.stream_logs(
+            stack_path,
+            compose_services,
+            since=since,
+            follow=follow,
+            request_id=request_id,
+            min_level=min_level,
+            until=until,
+            resume=_resume_points(writer) if writer and not since else None,
+            sink=store if writer else None,
+        ):
+            _print_record(record, styles[record.service], width)
+            count += 1
+        return count
 
-    console.print(f"[dim]Running: {' '.join(cmd)} in {stack_path}[/dim]\n")
-
-    # Use subprocess with no capture to stream output directly
+    count = 0
     try:
-        subprocess.run(cmd, cwd=stack_path, check=False)
+        count = asyncio.run(run())
     except KeyboardInterrupt:
         # Graceful exit on Ctrl+C
-        sys.exit(0)
+        pass
+    finally:
+        if writer is not None:
+            _finish_capture(writer, max_bytes)
+    if count == 0 and (request_id or min_level):
+        console.print("[dim]No matching log lines.[/dim]")
+
+
+def logs_search(
+    services: list[str] | None = None,
+    request_id: str | None = None,
+    since: str | None = None,
+    level: str | None = None,
+    until: str | None = None,
+    archive: Path | None = None,
+) -> None:
+    """Search the captured log archive; no docker needed.
+
+    Args:
+        services: Service identifiers, as for logs(). Defaults to all.
+        request_id: Only lines whose request or trace id equals this.
+        since: Only lines newer than this (e.g. 5m, 2h or an ISO timestamp).
+        level: Only lines at or above this level.
+        until: Only lines older than this.
+        archive: Archive directory. Defaults to state/logs.
+    """
+    compose_services = _resolve(services) if services else None
+    min_level = _resolve_level(level)
+    try:
+        since_ts = logarchive.parse_time(since) if since else None
+        until_ts = logarchive.parse_time(until) if until else None
+    except ValueError as e:
+        console.print(f"[red]Invalid time: {e}[/red]")
+        raise SystemExit(1)
+
+    start = time.perf_counter()
+    records = logarchive.search(
+        archive,
+        request_id=request_id,
+        min_level=min_level,
+        services=compose_services,
+        since=since_ts,
+        until=until_ts,
+    )
+    elapsed = time.perf_counter() - start
+
+    found = sorted({record.service for record in records})
+    styles = _styles(found)
+    width = max((len(service) for service in found), default=0)
+    for record in records:
+        _print_record(record, styles[record.service], width)
+    console.print(
+        f"[dim]{len(records)} line(s) from {len(found)} service(s) "
+        f"in {elapsed * 1000:.1f}ms[/dim]"
+    )
+
+
+def capture_logs(stack_path: Path, archive: Path | None = None) -> int:
+    """Capture all services' logs since the last capture, without printing.
+
+    Returns:
+        Number of lines captured.
+    """
+    writer = logarchive.ArchiveWriter(archive)
+
+    async def run() -> None:
+        async for _ in logstream.stream_logs(
+            stack_path,
+            list(SERVICE_MAP.values()),
+            resume=_resume_points(writer),
+            sink=writer.add,
+        ):
+            pass
+
+    try:
+        asyncio.run(run())
+    finally:
+        writer.flush()
+        logarchive.enforce_retention(writer.root)
+    return writer.written
+
+
+def _resolve(services: list[str] | None) -> list[str]:
+    """Resolve service identifiers to compose service names, or exit."""
+    try:
+        repo_keys = (
+            resolve_services(get_repo_graph(), services)
+            if services
+            else list(SERVICE_MAP)
+        )
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
+        console.print(f"Valid services: {', '.join(SERVICE_MAP.keys())}")
+        raise SystemExit(1)
+    return [SERVICE_MAP[key] for key in repo_keys]
+
+
+def _resolve_level(level: str | None) -> str | None:
+    """Normalize a --level value, or exit if it is unknown."""
+    min_level = logstream.normalize_level(level) if level else None
+    if level and not min_level:
+        console.print(f"[red]Unknown level: {level}[/red]")
+        console.print(f"Valid levels: {', '.join(logstream.LEVELS)}")
+        raise SystemExit(1)
+    return min_level
+
+
+def _styles(services: list[str]) -> dict[str, str]:
+    return {
+        service: _SERVICE_STYLES[index % len(_SERVICE_STYLES)]
+        for index, service in enumerate(services)
+    }
+
+
+def _resume_points(writer: logarchive.ArchiveWriter) -> dict[str, str]:
+    return {
+        service: logarchive.format_since(timestamp)
+        for service, timestamp in writer.watermarks.items()
+    }
+
+
+def _finish_capture(writer: logarchive.ArchiveWriter, max_bytes: int) -> None:
+    """Write the remaining captured lines and apply the archive size limit."""
+    writer.flush()
+    removed = logarchive.enforce_retention(writer.root, max_bytes)
+    size = logarchive.archive_size(writer.root)
+    console.print(
+        f"[dim]Captured {writer.written} line(s) into {writer.root} "
+        f"({size / 1024 / 1024:.1f} MiB"
+        + (f", {removed} old segment(s) removed" if removed else "")
+        + ")[/dim]"
+    )
+
+
+def _print_record(record: logstream.LogRecord, style: str, width: int) -> None:
+    """Print one record as `time service LEVEL message [ids]`."""
+    when = (
+        datetime.fromtimestamp(record.timestamp).strftime("%H:%M:%S.%f")[:-3]
+        if record.timestamp is not None
+        else " " * 12
+    )
+    level_style = _LEVEL_STYLES.get(record.level, "")
+    level = f"{record.level.upper():<5}" if record.level else " " * 5
+    if level_style:
+        level = f"[{level_style}]{level}[/{level_style}]"
+    # Unstructured lines already show their ids in the message
+    ids = " ".join(
+        f"{name}={value}"
+        for name, value in (
+            ("request_id", record.request_id),
+            ("trace_id", record.trace_id),
+        )
+        if value and record.fields
+    )
+    console.print(
+        f"[dim]{when}[/dim] [{style}]{record.service:<{width}}[/{style}] {level} "
+        f"{escape(record.message)}" + (f" [dim]{escape(ids)}[/dim]" if ids else ""),
+        soft_wrap=True,
+    )
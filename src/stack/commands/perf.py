@@ -0,0 +1,103 @@
+"""Shared setup and baseline reporting for the smoke and load commands."""
+
+from rich.console import Console
+from rich.table import Table
+
+from stack import baseline, contracts
+
+console = Console()
+
+BASE_URL = "http://localhost:8000/api/v1"
+ASSISTANT_ID = "733750f6-66bb-4365-abcc-7ee1e989b339"
+
+
+def load_event_contract() -> contracts.EventContract | None:
+    """Load the event contract, or None (with a warning) if unavailable."""
+    try:
+        contract = contracts.load_contract()
+    except contracts.ContractError as e:
+        console.print(f"[yellow]Skipping event validation: {e}[/yellow]")
+        return None
+    names = ", ".join(path.name for path in contract.sources)
+    console.print(
+        f"[dim]Validating events against {len(contract.validators)} message "
+        f"schema(s) from {names}[/dim]"
+    )
+    return contract
+
+
+def check_baseline(
+    kind: str,
+    metrics: dict,
+    save: bool = False,
+    compare: bool = False,
+    threshold: float = baseline.DEFAULT_THRESHOLD,
+) -> bool:
+    """Record a run's metrics and optionally save or compare the baseline.
+
+    Returns:
+        False if compare is set and a metric regressed, True otherwise.
+    """
+    run = baseline.record_run(kind, metrics)
+    passed = True
+
+    if compare:
+        saved = baseline.load_baseline(kind)
+        if saved is None:
+            console.print(f"[yellow]No {kind} baseline saved yet.[/yellow]")
+        else:
+            passed = _report_comparison(saved, run, threshold)
+
+    if save:
+        path = baseline.save_baseline(run)
+        console.print(f"[green]Saved {kind} baseline to {path}[/green]")
+    return passed
+
+
+def _report_comparison(saved: dict, run: dict, threshold: float) -> bool:
+    """Print a p95 comparison against the baseline and the repos that changed."""
+    rows = baseline.compare(saved, run, threshold)
+    table = Table(title=f"p95 vs baseline from {saved['recorded_at']}")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Baseline", justify="right")
+    table.add_column("Current", justify="right")
+    table.add_column("Change", justify="right")
+
+    def fmt(metric: str, value: float) -> str:
+        if metric.endswith(("events", "per_s")):
+            return f"{value:.1f}"
+        return f"{value * 1000:.1f}ms"
+
+    for row in rows:
+        style = "red" if row["regressed"] else "dim"
+        change = f"[{style}]{row['change']:+.0%}[/{style}]"
+        if not row["gated"]:
+            change += " [dim](too few samples)[/dim]"
+        table.add_row(
+            row["metric"],
+            fmt(row["metric"], row["baseline"]),
+            fmt(row["metric"], row["current"]),
+            change,
+        )
+    console.print(table)
+    if not all(row["gated"] for row in rows):
+        console.print(
+            f"[yellow]Metrics with fewer than {baseline.MIN_GATE_SAMPLES} samples "
+            "aren't gated; use --repeat to collect more.[/yellow]"
+        )
+
+    changed = baseline.changed_repos(saved, run)
+    if changed:
+        console.print("[bold]Repos changed since the baseline:[/bold]")
+        for repo_key, before, after in changed:
+            console.print(f"  {repo_key}: {before} → {after}")
+    else:
+        console.print("[dim]No repos changed since the baseline.[/dim]")
+
+    regressed = [row["metric"] for row in rows if row["regressed"]]
+    if regressed:
+        console.print(
+            f"[red]{len(regressed)} metric(s) regressed by more than "
+            f"{threshold:.0%}: {', '.join(regressed)}[/red]"
+        )
+    return not regressed
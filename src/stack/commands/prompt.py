@@ -4,7 +4,6 @@ import re
 from pathlib import Path
 
 import typer
-from jinja2 import Template
 from rich.console import Console
 
 from stack.config import get_workspace_root
@@ -107,6 +106,9 @@ def prompt_impl(work_item: int) -> None:
         console.print(f"[red]Error: Could not read implementer template: {e}[/red]")
         raise typer.Exit(1)
 
+    # jinja2 is only needed here; importing it lazily keeps `prompt plan` fast
+    from jinja2 import Template
+
     try:
         template = Template(template_content)
         rendered = template.render(WI_NUMBER=work_item_number, REPO_NAME=repo_name)
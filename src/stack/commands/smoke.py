@@ -1,45 +1,99 @@
 """Smoke test command implementation."""
 
+import asyncio
+import statistics
 import subprocess
-import time
 
-import httpx
 from rich.console import Console
-
+from rich.live import Live
+from rich.markup import escape
+from rich.table import Table
+
+from stack import baseline, readiness
+from stack.commands.logs import capture_logs
+from stack.commands.perf import (
+    ASSISTANT_ID,
+    BASE_URL,
+    check_baseline,
+    load_event_contract,
+)
 from stack.config import get_platform_stack_path
+from stack.scenarios import (
+    ScenarioError,
+    get_scenarios_dir,
+    load_scenarios,
+    run_scenarios,
+)
 
 console = Console()
 
-BASE_URL = "http://localhost:8000/api/v1"
-ASSISTANT_ID = "733750f6-66bb-4365-abcc-7ee1e989b339"
-
-
-def smoke() -> None:
-    """Run a smoke test of the entire stack."""
+# Per-request timeout for scenario steps; streamed turns include LLM latency
+SCENARIO_TIMEOUT = 60.0
+
+
+def smoke(
+    scenarios: list[str] | None = None,
+    base_url: str | None = None,
+    save_baseline: bool = False,
+    compare_baseline: bool = False,
+    threshold: float = baseline.DEFAULT_THRESHOLD,
+    repeat: int | None = None,
+) -> None:
+    """Run a smoke test of the entire stack.
+
+    Streamed events are validated against the AsyncAPI contract in the apis
+    repo when one is found. Step latencies, TTFTs, event counts and the
+    server-reported turn time are recorded with the current commit of
+    every repo.
+
+    Args:
+        scenarios: Names of the scenarios to run. Defaults to all of them.
+        base_url: Run against this API base URL (e.g. a `stack standin`
+            server) instead of the local stack, which is then neither
+            started nor waited for.
+        save_baseline: If True, save this run as the smoke baseline.
+        compare_baseline: If True, fail when a p95 metric regressed against
+            the saved baseline by more than threshold.
+        threshold: Allowed relative p95 regression, e.g. 0.25 for 25%.
+        repeat: Number of times the scenarios run; metrics aggregate over all
+            runs. Defaults to baseline.MIN_GATE_SAMPLES when saving or
+            comparing a baseline, so its p95s can gate, and to 1 otherwise.
+    """
+    if repeat is None:
+        repeat = baseline.MIN_GATE_SAMPLES if save_baseline or compare_baseline else 1
     stack_path = get_platform_stack_path()
-
-    if not stack_path.exists():
-        console.print(f"[red]Error: platform-stack not found at {stack_path}[/red]")
-        console.print("Run 'stack clone' first to clone all repositories.")
-        raise SystemExit(1)
-
-    # Check if stack is up, bring it up if not
     stack_was_down = False
-    if not _is_stack_up(stack_path):
-        console.print("[yellow]Stack is not running. Starting it...[/yellow]")
-        stack_was_down = True
-        _bring_stack_up(stack_path)
-        _wait_for_stack_ready()
+    if base_url is None:
+        if not stack_path.exists():
+            console.print(f"[red]Error: platform-stack not found at {stack_path}[/red]")
+            console.print("Run 'stack clone' first to clone all repositories.")
+            raise SystemExit(1)
+
+        # Check if stack is up, bring it up if not
+        if not _is_stack_up(stack_path):
+            console.print("[yellow]Stack is not running. Starting it...[/yellow]")
+            stack_was_down = True
+            _bring_stack_up(stack_path)
+
+        if not _wait_for_stack_ready(stack_path):
+            console.print("\n[bold red]Stack did not become ready.[/bold red]")
+            console.print("[yellow]Leaving stack up for debugging.[/yellow]")
+            raise SystemExit(1)
 
     console.print("\n[bold]Running smoke test...[/bold]\n")
 
     success = False
     try:
-        success = _run_smoke_test()
+        success, metrics = _run_smoke_test(scenarios, base_url or BASE_URL, repeat)
     except Exception as e:
         console.print(f"[red]Smoke test error: {e}[/red]")
         success = False
 
+    if success:
+        success = check_baseline(
+            "smoke", metrics, save_baseline, compare_baseline, threshold
+        )
+
     if success:
         console.print("\n[bold green]Smoke test PASSED![/bold green]")
         if stack_was_down:
@@ -47,22 +101,25 @@ def smoke() -> None:
             _bring_stack_down(stack_path)
     else:
         console.print("\n[bold red]Smoke test FAILED![/bold red]")
-        console.print("[yellow]Leaving stack up for debugging.[/yellow]")
+        if base_url is None:
+            _capture_logs(stack_path)
+            console.print("[yellow]Leaving stack up for debugging.[/yellow]")
         raise SystemExit(1)
 
 
+def _capture_logs(stack_path) -> None:
+    """Archive the service logs, so they can be searched after teardown."""
+    count = capture_logs(stack_path)
+    console.print(
+        f"[dim]Captured {count} log line(s); "
+        "search them with `stack logs search --request-id <id>`.[/dim]"
+    )
+
+
 def _is_stack_up(stack_path) -> bool:
-    """Check if the docker compose stack is running."""
-    try:
-        result = subprocess.run(
-            ["docker", "compose", "-f", "compose.services.yaml", "ps", "-q"],
-            cwd=stack_path,
-            capture_output=True,
-            text=True,
-        )
-        return bool(result.stdout.strip())
-    except subprocess.CalledProcessError:
-        return False
+    """Check if any service of the docker compose stack is running."""
+    services = readiness.get_compose_services(stack_path) or {}
+    return any(service["state"] == "running" for service in services.values())
 
 
 def _bring_stack_up(stack_path) -> None:
@@ -93,99 +150,197 @@ def _bring_stack_down(stack_path) -> None:
     subprocess.run(cmd, cwd=stack_path, capture_output=True, text=True)
 
 
-def _wait_for_stack_ready(max_wait: int = 60) -> None:
-    """Wait for the stack to be ready to accept requests."""
-    console.print("Waiting for stack to be ready...", style="dim")
-
-    start = time.time()
-    while time.time() - start < max_wait:
-        try:
-            response = httpx.get(f"{BASE_URL}/health", timeout=5)
-            if response.status_code == 200:
-                console.print("[green]Stack is ready![/green]")
-                return
-        except httpx.RequestError:
-            pass
-        time.sleep(2)
-
-    console.print("[yellow]Warning: Stack may not be fully ready yet.[/yellow]")
-
+def _wait_for_stack_ready(stack_path, max_wait: int = 120) -> bool:
+    """Wait for every service to be ready and report each one's time to ready.
 
-def _run_smoke_test() -> bool:
-    """Execute the smoke test workflow."""
-    # Step 1: Create a new Chat Session
-    console.print("[cyan]Step 1:[/cyan] Creating chat session...")
+    Returns:
+        True if all services became ready within max_wait seconds.
+    """
+    console.print("Waiting for stack to be ready...", style="dim")
 
     try:
-        response = httpx.post(
-            f"{BASE_URL}/chat/sessions",
-            json={
-                "title": "Smoke Test Chat",
-                "assistant_id": ASSISTANT_ID,
-            },
-            timeout=30,
-        )
-    except httpx.RequestError as e:
-        console.print(f"[red]Failed to connect to API: {e}[/red]")
+        with Live(_build_readiness_table({}), console=console) as live:
+            services = readiness.wait_for_ready(
+                stack_path,
+                timeout=max_wait,
+                on_change=lambda services: live.update(
+                    _build_readiness_table(services)
+                ),
+            )
+            live.update(_build_readiness_table(services))
+    except RuntimeError as e:
+        console.print(f"[red]{e}[/red]")
         return False
 
-    if response.status_code != 200 and response.status_code != 201:
-        console.print(f"[red]Failed to create session: {response.status_code}[/red]")
-        console.print(response.text)
-        return False
+    if services and all(s["phase"] == "ready" for s in services.values()):
+        slowest = max(services, key=lambda name: services[name]["ready_at"])
+        console.print(
+            f"[green]Stack is ready![/green] [dim](slowest: {slowest}, "
+            f"{services[slowest]['ready_at']:.1f}s)[/dim]"
+        )
+        return True
+    return False
+
+
+def _build_readiness_table(services: dict[str, dict]) -> Table:
+    """Build the per-service time-to-ready table."""
+    table = Table(title="Stack Readiness")
+    table.add_column("Service", style="cyan")
+    table.add_column("Status", style="bold")
+    table.add_column("Healthy", justify="right")
+    table.add_column("Ready", justify="right")
+
+    def seconds(value: float | None) -> str:
+        return "-" if value is None else f"{value:.1f}s"
+
+    for name in sorted(services):
+        service = services[name]
+        if service["phase"] == "ready":
+            status = "[green]Ready[/green]"
+        elif service["phase"] == "failed":
+            status = "[red]Failed[/red]"
+        else:
+            status = "[yellow]Waiting[/yellow]"
+        if service["detail"]:
+            status += f" [dim]{escape(service['detail'])}[/dim]"
+        table.add_row(
+            name, status, seconds(service["healthy_at"]), seconds(service["ready_at"])
+        )
+    return table
 
-    session_data = response.json()
-    session_id = session_data.get("id")
-    console.print(f"  Session created: {session_id}")
 
-    # Step 2: Send a Chat Turn
-    console.print("[cyan]Step 2:[/cyan] Sending chat turn...")
+def _run_smoke_test(
+    names: list[str] | None = None, base_url: str = BASE_URL, repeat: int = 1
+) -> tuple[bool, dict]:
+    """Run the smoke scenarios concurrently and report each step.
 
+    Args:
+        names: If given, only run the scenarios with these names.
+        base_url: API base URL to run the scenarios against.
+        repeat: Number of rounds; each runs all scenarios concurrently, and
+            the rounds run one after another so they don't slow each other.
+
+    Returns:
+        Tuple of (whether all scenarios passed in every round, per-step
+        metrics over all rounds).
+    """
     try:
-        with httpx.stream(
-            "POST",
-            f"{BASE_URL}/chat/sessions/{session_id}/turns",
-            json={"message": "What is 7 * 5? Response only with the answer."},
-            timeout=60,
-        ) as response:
-            if response.status_code != 200:
-                console.print(f"[red]Failed to send turn: {response.status_code}[/red]")
-                return False
-
-            full_response = ""
-            for line in response.iter_lines():
-                if not line:
-                    continue
-
-                # Parse SSE format
-                if line.startswith("data:"):
-                    data = line[5:].strip()
-                    if data:
-                        try:
-                            import json
-
-                            event_data = json.loads(data)
-                            if "content" in event_data:
-                                full_response += event_data["content"]
-                        except json.JSONDecodeError:
-                            pass
-                elif line.startswith("event:"):
-                    event_type = line[6:].strip()
-                    if event_type == "Done":
-                        break
-
-            console.print(f"  Response received: {full_response.strip()}")
-
-            # Verify the response contains "35"
-            if "35" in full_response:
-                console.print("  [green]Response validation: PASSED[/green]")
-                return True
-            else:
-                console.print(
-                    f"  [red]Response validation: FAILED (expected '35')[/red]"
+        scenarios = load_scenarios(names=names)
+    except ScenarioError as e:
+        console.print(f"[red]{e}[/red]")
+        return False, {}
+    if not scenarios:
+        console.print(f"[red]No scenarios found in {get_scenarios_dir()}[/red]")
+        return False, {}
+
+    contract = load_event_contract()
+    variables = {"assistant_id": ASSISTANT_ID}
+    rounds = []
+    for index in range(repeat):
+        if repeat > 1:
+            console.print(f"[dim]Round {index + 1}/{repeat}[/dim]")
+        rounds.append(
+            asyncio.run(
+                run_scenarios(
+                    scenarios,
+                    base_url,
+                    variables,
+                    timeout=SCENARIO_TIMEOUT,
+                    contract=contract,
                 )
-                return False
+            )
+        )
 
-    except httpx.RequestError as e:
-        console.print(f"[red]Request failed: {e}[/red]")
-        return False
+    console.print(_build_scenario_table(rounds))
+    _report_turn_metrics(rounds[-1])
+
+    samples: dict[str, list[float]] = {}
+    for results in rounds:
+        for scenario in results:
+            for step in scenario["steps"]:
+                prefix = f"{scenario['name']}/{step['name']}"
+                samples.setdefault(f"{prefix}/latency", []).append(step["elapsed"])
+                if step.get("ttft") is not None:
+                    samples.setdefault(f"{prefix}/ttft", []).append(step["ttft"])
+                if "events" in step:
+                    samples.setdefault(f"{prefix}/events", []).append(
+                        len(step["events"])
+                    )
+                if step.get("server_time") is not None:
+                    server_time = step["server_time"]
+                    samples.setdefault(f"{prefix}/server_time", []).append(server_time)
+                    samples.setdefault(f"{prefix}/overhead", []).append(
+                        step["elapsed"] - server_time
+                    )
+    metrics = {name: baseline.stats(values) for name, values in samples.items()}
+
+    passed = all(scenario["passed"] for results in rounds for scenario in results)
+    return passed, metrics
+
+
+def _build_scenario_table(rounds: list[list[dict]]) -> Table:
+    """Summarize each step over all rounds: passes, median time, first failure."""
+    table = Table(title="Smoke Scenarios")
+    table.add_column("Scenario", style="cyan")
+    table.add_column("Step")
+    table.add_column("Result", style="bold")
+    table.add_column("Time", justify="right", style="dim")
+    table.add_column("Detail")
+    for position, scenario in enumerate(rounds[0]):
+        for index, step in enumerate(scenario["steps"]):
+            runs = [
+                results[position]["steps"][index]
+                for results in rounds
+                if index < len(results[position]["steps"])
+            ]
+            passes = sum(run["passed"] for run in runs)
+            if passes == len(runs):
+                result = "[green]✓[/green]"
+            else:
+                result = "[red]✗[/red]"
+            if len(rounds) > 1:
+                result += f" {passes}/{len(runs)}"
+            shown = next((run for run in runs if not run["passed"]), runs[-1])
+            elapsed = statistics.median(run["elapsed"] for run in runs)
+            table.add_row(
+                scenario["name"] if index == 0 else "",
+                step["name"],
+                result,
+                f"{elapsed * 1000:.0f}ms",
+                escape(shown["detail"]),
+            )
+    return table
+
+
+def _report_turn_metrics(results: list[dict]) -> None:
+    """Print server-reported metrics next to client timings for streamed steps."""
+    table = Table(title="Turn Metrics")
+    table.add_column("Step", style="cyan")
+    table.add_column("Client", justify="right")
+    table.add_column("TTFT", justify="right")
+    table.add_column("Server", justify="right")
+    table.add_column("Overhead", justify="right")
+    table.add_column("Reported", style="dim")
+
+    def ms(seconds: float | None) -> str:
+        return "-" if seconds is None else f"{seconds * 1000:.0f}ms"
+
+    for scenario in results:
+        for step in scenario["steps"]:
+            if not step.get("metrics"):
+                continue
+            server_time = step.get("server_time")
+            overhead = None if server_time is None else step["elapsed"] - server_time
+            reported = " ".join(
+                f"{key}={value:g}" for key, value in step["metrics"].items()
+            )
+            table.add_row(
+                f"{scenario['name']}/{step['name']}",
+                ms(step["elapsed"]),
+                ms(step.get("ttft")),
+                ms(server_time),
+                ms(overhead),
+                escape(reported),
+            )
+    if table.rows:
+        console.print(table)
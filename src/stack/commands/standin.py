@@ -0,0 +1,112 @@
+"""PCP stand-in server command implementation."""
+
+import asyncio
+from pathlib import Path
+
+from rich.console import Console
+
+from stack.config import get_workspace_root
+from stack.standin import (
+    API_PREFIX,
+    RecordingServer,
+    ReplayServer,
+    StandinServer,
+    SyntheticServer,
+    load_cassette,
+)
+
+console = Console()
+
+DEFAULT_PORT = 8765
+UPSTREAM_URL = "http://localhost:8000"
+
+
+def get_cassettes_dir() -> Path:
+    """Get the directory holding recorded cassettes."""
+    return get_workspace_root() / "state" / "cassettes"
+
+
+def resolve_cassette(name: str) -> Path:
+    """Resolve a cassette name or path; bare names live in get_cassettes_dir()."""
+    path = Path(name)
+    if path.suffix != ".json" and path.parent == Path("."):
+        return get_cassettes_dir() / f"{name}.json"
+    return path
+
+
+def record(cassette: str, upstream: str = UPSTREAM_URL, port: int = DEFAULT_PORT):
+    """Proxy to a running PCP and record every exchange into a cassette.
+
+    Args:
+        cassette: Cassette name (saved under state/cassettes) or path.
+        upstream: Origin of the real PCP, e.g. http://localhost:8000.
+        port: Local port to listen on.
+    """
+    path = resolve_cassette(cassette)
+    console.print(f"[bold]Recording[/bold] {upstream} into {path}")
+    _serve(RecordingServer(upstream, path), port)
+
+
+def replay(cassette: str, speed: float = 1.0, port: int = DEFAULT_PORT) -> None:
+    """Serve recorded exchanges from a cassette.
+
+    Args:
+        cassette: Cassette name (under state/cassettes) or path.
+        speed: Timing scale; 2.0 replays twice as fast, 0 without delays.
+        port: Local port to listen on.
+    """
+    path = resolve_cassette(cassette)
+    try:
+        server = ReplayServer(load_cassette(path), speed=speed)
+    except (OSError, ValueError, KeyError) as e:
+        console.print(f"[red]Cannot load cassette {path}: {e}[/red]")
+        raise SystemExit(1)
+
+    routes = ", ".join(
+        f"{route} ×{len(exchanges)}" for route, exchanges in server.routes.items()
+    )
+    console.print(f"[bold]Replaying[/bold] {path} at {speed:g}× ({routes})")
+    _serve(server, port)
+
+
+def synthetic(
+    tokens_per_s: float = 50.0,
+    tokens: int | None = None,
+    ttft: float = 0.2,
+    text: str = "The answer is 35.",
+    port: int = DEFAULT_PORT,
+) -> None:
+    """Serve generated token streams at a fixed rate.
+
+    Args:
+        tokens_per_s: Token emission rate per turn.
+        tokens: Tokens per turn; text is repeated or cut to fit.
+        ttft: Delay before the first token, in seconds.
+        text: Response text streamed as whitespace-delimited tokens.
+        port: Local port to listen on.
+    """
+    server = SyntheticServer(
+        text=text, tokens=tokens, tokens_per_s=tokens_per_s, ttft=ttft
+    )
+    console.print(
+        f"[bold]Synthetic streams:[/bold] {len(server.tokens)} token(s) at "
+        f"{tokens_per_s:g}/s after {ttft * 1000:.0f}ms"
+    )
+    _serve(server, port)
+
+
+def _serve(server: StandinServer, port: int) -> None:
+    def on_ready(address: tuple[str, int]) -> None:
+        host, bound_port = address
+        console.print(
+            f"Listening on [cyan]http://{host}:{bound_port}{API_PREFIX}[/cyan] "
+            "(pass as --base-url; Ctrl+C to stop)"
+        )
+
+    try:
+        asyncio.run(server.serve("127.0.0.1", port, on_ready=on_ready))
+    except KeyboardInterrupt:
+        console.print("\n[dim]Stopped.[/dim]")
+    except OSError as e:
+        console.print(f"[red]Cannot listen on port {port}: {e}[/red]")
+        raise SystemExit(1)
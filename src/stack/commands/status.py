@@ -0,0 +1,230 @@
+"""Status command implementation."""
+
+import json
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+
+from rich.console import Console
+from rich.live import Live
+from rich.table import Table
+
+from stack import containers
+from stack.config import get_platform_stack_path
+
+console = Console()
+
+_STATE_STYLES = {
+    "running": "green",
+    "created": "yellow",
+    "paused": "yellow",
+    "exited": "red",
+    "removed": "dim",
+}
+_HEALTH_STYLES = {"healthy": "green", "starting": "yellow", "unhealthy": "red"}
+
+
+def status(
+    live: bool = False,
+    interval: float = containers.STATS_INTERVAL,
+    json_output: bool = False,
+    duration: float | None = None,
+) -> None:
+    """Show container state and resource usage per compose service.
+
+    Args:
+        live: If True, keep the view current from `docker events` and sample
+            resources every `interval` seconds until interrupted.
+        interval: Seconds between resource samples in live mode.
+        json_output: If True, print a JSON snapshot instead of a table; in
+            live mode, one JSON snapshot per line on every change.
+        duration: Stop live mode after this many seconds.
+    """
+    stack_path = get_platform_stack_path()
+    if not stack_path.exists():
+        console.print(f"[red]Error: platform-stack not found at {stack_path}[/red]")
+        console.print("Run 'stack clone' first to clone all repositories.")
+        raise SystemExit(1)
+
+    model = containers.StackModel.from_compose(stack_path)
+    if model is None:
+        console.print("[red]Could not run docker compose ps.[/red]")
+        raise SystemExit(1)
+
+    if live:
+        _watch(model, interval, json_output, duration)
+        return
+
+    model.apply_stats(
+        containers.sample_stats(list(model.running_containers())), time.time()
+    )
+    if json_output:
+        _emit(model, "snapshot")
+    else:
+        console.print(build_status_table(model))
+
+
+def report_stack_state(stack_path: Path) -> None:
+    """Print the container state of every compose service (no resource sample)."""
+    console.print("\n[bold]Stack State:[/bold]")
+    model = containers.StackModel.from_compose(stack_path)
+    if model is None:
+        console.print("[yellow]Could not get stack state.[/yellow]")
+    elif not model.services:
+        console.print("No containers.", style="dim")
+    else:
+        console.print(build_status_table(model, usage=False))
+
+
+def _emit(model: containers.StackModel, reason: str) -> None:
+    """Write one JSON snapshot line to stdout."""
+    snapshot = {"reason": reason, "at": time.time(), **model.to_dict()}
+    sys.stdout.write(json.dumps(snapshot) + "\n")
+    sys.stdout.flush()
+
+
+def _watch(
+    model: containers.StackModel,
+    interval: float,
+    json_output: bool,
+    duration: float | None,
+) -> None:
+    """Apply events and stats samples to the model as they arrive.
+
+    A reader thread forwards `docker events` lines and a sampler thread
+    forwards `docker stats` results through one queue, so the view is only
+    redrawn when something changed.
+    """
+    updates: queue.Queue = queue.Queue()
+    stop = threading.Event()
+    lock = threading.Lock()
+    # Replays the events since the snapshot, so none in between are lost
+    events = containers.start_events(model.project, since=model.seeded_at)
+
+    def read_events() -> None:
+        for line in events.stdout:
+            try:
+                updates.put(("event", json.loads(line)))
+            except ValueError:
+                continue
+        updates.put(("events-ended", None))
+
+    def sample() -> None:
+        while not stop.is_set():
+            started = time.time()
+            with lock:
+                running = list(model.running_containers())
+            entries = containers.sample_stats(running)
+            updates.put(("stats", (entries, started)))
+            stop.wait(max(interval - (time.time() - started), 0))
+
+    threading.Thread(target=read_events, daemon=True).start()
+    threading.Thread(target=sample, daemon=True).start()
+    deadline = time.monotonic() + duration if duration is not None else None
+
+    live = None
+    if json_output:
+        _emit(model, "snapshot")
+    else:
+        live = Live(build_status_table(model), console=console, auto_refresh=False)
+        live.start()
+    try:
+        while deadline is None or time.monotonic() < deadline:
+            timeout = None if deadline is None else deadline - time.monotonic()
+            try:
+                kind, payload = updates.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if kind == "event":
+                with lock:
+                    changed = model.apply_event(payload)
+                reason = f"event:{changed}" if changed else None
+            elif kind == "stats":
+                with lock:
+                    updated = model.apply_stats(*payload)
+                reason = "stats" if updated else None
+            else:
+                console.print("[yellow]docker events stream ended.[/yellow]")
+                break
+            if reason is None:
+                continue
+            if live is not None:
+                live.update(build_status_table(model), refresh=True)
+            else:
+                _emit(model, reason)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        events.terminate()
+        if live is not None:
+            live.stop()
+
+
+def _format_bytes(value: int | None) -> str:
+    if value is None:
+        return "-"
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if value < 1024:
+            return f"{value:.0f}{unit}" if unit == "B" else f"{value:.1f}{unit}"
+        value /= 1024
+    return f"{value:.1f}TiB"
+
+
+def _format_age(timestamp: float | None) -> str:
+    if timestamp is None:
+        return "-"
+    seconds = max(time.time() - timestamp, 0)
+    if seconds < 60:
+        return f"{seconds:.0f}s ago"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f}m ago"
+    return f"{seconds / 3600:.1f}h ago"
+
+
+def build_status_table(model: containers.StackModel, usage: bool = True) -> Table:
+    """Build a table of service state and, if usage, the last resource sample."""
+    table = Table(title=f"Stack Status ({model.project})")
+    table.add_column("Service", style="cyan")
+    table.add_column("State")
+    table.add_column("Health")
+    # Change times are only known from events
+    changes = any(s.changed_at is not None for s in model.services.values())
+    if changes:
+        table.add_column("Changed", justify="right", style="dim")
+    if usage:
+        table.add_column("CPU", justify="right")
+        table.add_column("Memory", justify="right")
+        table.add_column("Net rx / tx", justify="right")
+
+    for service in model.services.values():
+        style = _STATE_STYLES.get(service.state, "")
+        state = service.state or "unknown"
+        if service.state == "exited" and service.exit_code is not None:
+            state += f" ({service.exit_code})"
+        health_style = _HEALTH_STYLES.get(service.health, "")
+        row = [
+            service.service,
+            f"[{style}]{state}[/{style}]" if style else state,
+            f"[{health_style}]{service.health}[/{health_style}]"
+            if health_style
+            else service.health or "-",
+        ]
+        if changes:
+            row.append(_format_age(service.changed_at))
+        if usage:
+            cpu = "-" if service.cpu_percent is None else f"{service.cpu_percent:.1f}%"
+            memory = _format_bytes(service.mem_bytes)
+            if service.mem_limit:
+                memory += f" / {_format_bytes(service.mem_limit)}"
+            network = (
+                "-"
+                if service.net_rx is None
+                else f"{_format_bytes(service.net_rx)} / "
+                f"{_format_bytes(service.net_tx)}"
+            )
+            row += [cpu, memory, network]
+        table.add_row(*row)
+    return table
@@ -0,0 +1,205 @@
+"""Sync command implementation."""
+
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from rich.console import Console
+from rich.markup import escape
+from rich.table import Table
+
+from stack.config import RepoGraph, get_repo_graph
+
+console = Console()
+
+# Default number of repositories fetched concurrently
+DEFAULT_SYNC_JOBS = 8
+
+
+def sync(jobs: int | None = None) -> None:
+    """Fetch every checked-out repository and fast-forward the clean ones.
+
+    Each repo is fetched concurrently, then inspected with a single
+    `git status --porcelain=v2 --branch`. Repos whose current branch is only
+    behind its upstream and have no tracked changes are fast-forwarded.
+    Everything else is left alone and reported.
+
+    Args:
+        jobs: Maximum number of repos synced concurrently. Defaults to
+            DEFAULT_SYNC_JOBS.
+    """
+    graph = get_repo_graph()
+    repo_paths = graph.existing()
+    results = {
+        repo_key: {"state": "missing", "details": "run 'stack clone' first"}
+        for repo_key in graph
+        if repo_key not in repo_paths
+    }
+
+    if repo_paths:
+        console.print(f"[bold]Syncing {len(repo_paths)} repositories...[/bold]")
+        max_workers = min(jobs or DEFAULT_SYNC_JOBS, len(repo_paths))
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            synced = dict(
+                zip(repo_paths, pool.map(_sync_repo, repo_paths.values()))
+            )
+        results.update(synced)
+
+    _report_sync(graph, results)
+
+
+def _git(repo_path: Path, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        ["git", *args],
+        cwd=repo_path,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+    )
+
+
+def _error_line(stderr: str) -> str:
+    lines = [line for line in stderr.splitlines() if line.strip()]
+    return lines[-1].strip() if lines else "unknown error"
+
+
+def _parse_branch_status(output: str) -> dict:
+    """Parse `git status --porcelain=v2 --branch` output.
+
+    Returns:
+        Dict with the branch name (None when detached), upstream (None when
+        there is none), ahead/behind counts, and the number of changed
+        tracked files and untracked files.
+    """
+    status = {
+        "branch": None,
+        "upstream": None,
+        "ahead": 0,
+        "behind": 0,
+        "changed": 0,
+        "untracked": 0,
+    }
+    for line in output.splitlines():
+        if line.startswith("# branch.head "):
+            head = line.split(" ", 2)[2]
+            status["branch"] = None if head == "(detached)" else head
+        elif line.startswith("# branch.upstream "):
+            status["upstream"] = line.split(" ", 2)[2]
+        elif line.startswith("# branch.ab "):
+            _, _, ahead, behind = line.split(" ")
+            status["ahead"] = int(ahead)
+            status["behind"] = -int(behind)
+        elif line.startswith("? "):
+            status["untracked"] += 1
+        elif line and not line.startswith(("#", "!")):
+            status["changed"] += 1
+    return status
+
+
+def _sync_repo(repo_path: Path) -> dict:
+    """Fetch a repo and fast-forward its current branch if that is safe.
+
+    Returns:
+        The parsed branch status plus the resulting state, details and the
+        time taken.
+    """
+    start = time.monotonic()
+
+    fetch = _git(repo_path, "fetch", "--prune", "--quiet")
+    status_run = _git(repo_path, "status", "--porcelain=v2", "--branch")
+    if status_run.returncode != 0:
+        return {
+            "state": "failed",
+            "details": _error_line(status_run.stderr),
+            "elapsed": time.monotonic() - start,
+        }
+
+    result = _parse_branch_status(status_run.stdout)
+    if fetch.returncode != 0:
+        result["state"] = "fetch-failed"
+        result["details"] = _error_line(fetch.stderr)
+    elif result["branch"] is None:
+        result["state"] = "detached"
+    elif result["upstream"] is None:
+        result["state"] = "no-upstream"
+    elif result["behind"] == 0:
+        result["state"] = "ahead" if result["ahead"] else "up-to-date"
+    elif result["ahead"]:
+        result["state"] = "diverged"
+    elif result["changed"]:
+        result["state"] = "dirty"
+    else:
+        merge = _git(repo_path, "merge", "--ff-only", "--quiet", "@{upstream}")
+        if merge.returncode == 0:
+            result["state"] = "fast-forwarded"
+            result["pulled"] = result["behind"]
+            result["behind"] = 0
+        else:
+            result["state"] = "failed"
+            result["details"] = _error_line(merge.stderr)
+
+    result["elapsed"] = time.monotonic() - start
+    return result
+
+
+def _report_sync(graph: RepoGraph, results: dict) -> None:
+    """Report sync results in a table and exit non-zero if any repo failed."""
+    table = Table(title="Sync Results")
+    table.add_column("Repository", style="cyan")
+    table.add_column("Branch")
+    table.add_column("Ahead", justify="right")
+    table.add_column("Behind", justify="right")
+    table.add_column("Changes", justify="right")
+    table.add_column("State", style="bold")
+    table.add_column("Time", justify="right", style="dim")
+
+    states = {
+        "up-to-date": "[green]Up to date[/green]",
+        "ahead": "[green]Ahead[/green]",
+        "dirty": "[yellow]Dirty, not updated[/yellow]",
+        "diverged": "[yellow]Diverged[/yellow]",
+        "detached": "[yellow]Detached HEAD[/yellow]",
+        "no-upstream": "[yellow]No upstream[/yellow]",
+        "missing": "[red]Missing[/red]",
+        "fetch-failed": "[red]Fetch failed[/red]",
+        "failed": "[red]Failed[/red]",
+    }
+
+    failed = 0
+    for repo_key in graph:
+        result = results[repo_key]
+        state = result["state"]
+        if state == "fast-forwarded":
+            label = f"[green]Fast-forwarded +{result['pulled']}[/green]"
+        else:
+            label = states[state]
+        if result.get("details"):
+            label += f" [dim]{escape(result['details'])}[/dim]"
+        if state in ("fetch-failed", "failed"):
+            failed += 1
+
+        branch = result.get("branch") or "-"
+        if result.get("upstream"):
+            branch += f" [dim]→ {result['upstream']}[/dim]"
+        changes = "-"
+        if "changed" in result:
+            changes = str(result["changed"])
+            if result["untracked"]:
+                changes += f" (+{result['untracked']} untracked)"
+        elapsed = f"{result['elapsed']:.1f}s" if "elapsed" in result else "-"
+
+        table.add_row(
+            repo_key,
+            branch,
+            str(result.get("ahead", "-")),
+            str(result.get("behind", "-")),
+            changes,
+            label,
+            elapsed,
+        )
+
+    console.print(table)
+    if failed:
+        raise SystemExit(1)
@@ -4,13 +4,37 @@ import subprocess
 
 from rich.console import Console
 
-from stack.config import get_platform_stack_path
+from stack import services as stack_services
+from stack.commands.status import report_stack_state
+from stack.config import COMPOSE_FILE, get_platform_stack_path, get_repo_graph
+from stack.readiness import get_compose_services
 
 console = Console()
 
+INFRA_COMPOSE_FILE = "compose.infra.yaml"
 
-def up(with_observability: bool = False) -> None:
-    """Start the stack using docker compose."""
+
+def up(
+    with_observability: bool = False,
+    services: list[str] | None = None,
+    changed: bool = False,
+) -> None:
+    """Start the stack using docker compose.
+
+    Without a selection the whole stack is started as is. With `services`
+    or `changed`, only the selected services are rebuilt and recreated
+    (with --no-deps, so running dependencies are left alone); dependencies
+    that aren't running are started first without recreating anything.
+
+    Args:
+        with_observability: If True, include the observability infrastructure.
+        services: Repo keys or compose service names to rebuild. A repo
+            without a service (e.g. apis) selects the services of every
+            repo depending on it.
+        changed: If True, only rebuild the selected services (all of them if
+            none are given) whose sources changed since their last rebuild
+            by `stack up`, or that aren't running.
+    """
     stack_path = get_platform_stack_path()
 
     if not stack_path.exists():
@@ -18,54 +42,120 @@ def up(with_observability: bool = False) -> None:
         console.print("Run 'stack clone' first to clone all repositories.")
         raise SystemExit(1)
 
+    compose_files = [COMPOSE_FILE]
     if with_observability:
-        console.print("Starting stack with observability...", style="yellow")
-        cmd = [
-            "docker", "compose",
-            "-f", "compose.services.yaml",
-            "-f", "compose.infra.yaml",
-            "up", "-d"
-        ]
+        compose_files.append(INFRA_COMPOSE_FILE)
+    base_cmd = ["docker", "compose"]
+    for compose_file in compose_files:
+        base_cmd += ["-f", compose_file]
+
+    if services is None and not changed:
+        if with_observability:
+            console.print("Starting stack with observability...", style="yellow")
+        else:
+            console.print("Starting stack...", style="yellow")
+        _compose(stack_path, [*base_cmd, "up", "-d"], "start stack")
+        console.print("[green]Stack started successfully![/green]")
     else:
-        console.print("Starting stack...", style="yellow")
-        cmd = [
-            "docker", "compose",
-            "-f", "compose.services.yaml",
-            "up", "-d"
-        ]
+        _up_services(stack_path, base_cmd, compose_files, services, changed)
+
+    report_stack_state(stack_path)
+
 
+def _up_services(
+    stack_path,
+    base_cmd: list[str],
+    compose_files: list[str],
+    names: list[str] | None,
+    changed: bool,
+) -> None:
+    """Rebuild and recreate the selected (or stale) services."""
+    graph = get_repo_graph()
     try:
-        result = subprocess.run(
-            cmd,
-            cwd=stack_path,
-            capture_output=True,
-            text=True,
-            check=True,
+        selected = (
+            stack_services.resolve_services(graph, names)
+            if names
+            else list(stack_services.SERVICE_MAP)
         )
-        console.print("[green]Stack started successfully![/green]")
-        if result.stdout:
-            console.print(result.stdout)
-    except subprocess.CalledProcessError as e:
-        console.print(f"[red]Failed to start stack:[/red]")
-        console.print(e.stderr)
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
+        valid = [*stack_services.SERVICE_MAP, *stack_services.SERVICE_MAP.values()]
+        console.print(f"Valid services: {', '.join(valid)} (or any repo key)")
         raise SystemExit(1)
 
-    _report_stack_state(stack_path)
+    states = stack_services.source_states(graph, selected)
+    recorded = stack_services.load_recorded()
+    running = {
+        name
+        for name, state in (get_compose_services(stack_path) or {}).items()
+        if state["state"] == "running"
+    }
+
+    targets = []
+    for repo_key in selected:
+        service = stack_services.SERVICE_MAP[repo_key]
+        diff = stack_services.changed_sources(states[repo_key], recorded.get(repo_key))
+        if diff is None:
+            reason = "no recorded build"
+        elif diff:
+            reason = f"{', '.join(diff)} changed"
+        elif service not in running:
+            reason = "not running"
+        else:
+            reason = None
+        if not changed:
+            reason = reason or "selected"
+        if reason is None:
+            console.print(f"  [dim]{service}: up to date[/dim]")
+            continue
+        console.print(f"  [yellow]{service}[/yellow]: {reason}")
+        targets.append(repo_key)
+
+    if not targets:
+        console.print("[green]All selected services are up to date.[/green]")
+        return
+
+    target_services = [stack_services.SERVICE_MAP[key] for key in targets]
+    dependencies = stack_services.compose_dependencies(stack_path, compose_files)
+    missing = [
+        dep
+        for dep in stack_services.dependency_closure(dependencies, target_services)
+        if dep not in running
+    ]
+    if missing:
+        console.print(f"Starting dependencies: {', '.join(missing)}", style="yellow")
+        _compose(
+            stack_path,
+            [*base_cmd, "up", "-d", "--no-recreate", *missing],
+            "start dependencies",
+        )
+
+    console.print(
+        f"Rebuilding and recreating: {', '.join(target_services)}", style="yellow"
+    )
+    _compose(
+        stack_path,
+        [*base_cmd, "up", "-d", "--build", "--no-deps", *target_services],
+        "rebuild services",
+    )
+    stack_services.record({key: states[key] for key in targets if states[key]["hash"]})
+    console.print("[green]Services rebuilt successfully![/green]")
 
 
-def _report_stack_state(stack_path) -> None:
-    """Report the state of the docker compose stack."""
-    console.print("\n[bold]Stack State:[/bold]")
+def _compose(stack_path, cmd: list[str], action: str) -> None:
+    """Run a docker compose command, exiting with its stderr on failure."""
     try:
         result = subprocess.run(
-            ["docker", "compose", "-f", "compose.services.yaml", "ps"],
+            cmd,
             cwd=stack_path,
             capture_output=True,
             text=True,
+            check=True,
         )
         if result.stdout:
             console.print(result.stdout)
-        if result.stderr:
-            console.print(result.stderr, style="dim")
     except subprocess.CalledProcessError as e:
-        console.print(f"[yellow]Could not get stack state: {e}[/yellow]")
+        console.print(f"[red]Failed to {action}:[/red]")
+        console.print(e.stderr)
+        raise SystemExit(1)
+
@@ -1,89 +1,316 @@
 """Validate command implementation."""
 
+import os
 import subprocess
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
 
 from rich.console import Console
+from rich.live import Live
+from rich.markup import escape
 from rich.table import Table
 
-from stack.config import get_repos_config, get_workspace_root
+from stack import cache, deps, impact, inotify, sharding, telemetry
+from stack.config import RepoGraph, get_repo_graph
+from stack.process import Cancellation, run_step
 
 console = Console()
 
 
-def validate(full: bool = False) -> None:
+STEP_NAMES = ("build", "format", "lint", "test")
+
+# Repo statuses that prevent downstream repos from being validated
+BLOCKING_STATUSES = {"failed", "blocked"}
+
+# Timeout for steps without enough recorded history
+STEP_TIMEOUT = 300
+
+# Adaptive timeouts are p99 of recorded durations times this factor, clamped
+# between the step's floor and TIMEOUT_CEILING. Floors are generous for
+# steps that can be much slower on a cold cache than in steady state.
+TIMEOUT_FACTOR = 3.0
+TIMEOUT_FLOORS = {"install": 300, "build": 300, "format": 15, "lint": 30, "test": 60}
+TIMEOUT_CEILING = 3600
+TIMEOUT_MIN_SAMPLES = 5
+
+# Branch that quick validation compares against to find committed changes
+DEFAULT_BASE_REF = "main"
+
+
+def validate(
+    full: bool = False,
+    jobs: int | None = None,
+    use_cache: bool = True,
+    fail_fast: bool = False,
+    report_json: Path | None = None,
+    report_junit: Path | None = None,
+    base_ref: str = DEFAULT_BASE_REF,
+    shards: int = 1,
+    use_impact: bool = False,
+) -> None:
     """Validate repositories by running build/format/lint/test.
 
+    Repos are scheduled along the `depends_on` edges in repos.yaml: independent
+    repos run concurrently, and a repo starts as soon as its upstreams pass.
+
     Args:
         full: If True, validate all repos. If False (default), only validate changed repos.
+        jobs: Maximum number of repos validated concurrently. Defaults to the core count.
+        use_cache: If True (default), replay step results cached from earlier
+            green runs on the same tree state.
+        fail_fast: If True, stream step output live and cancel all in-flight
+            steps in other repos on the first failure.
+        report_json: Optional path to write a JSON timing report to.
+        report_junit: Optional path to write a JUnit XML report to.
+        base_ref: Ref whose merge-base quick validation compares against.
+            Repos depending on a changed repo are validated as well.
+        shards: Number of partitions the pytest suite of uv repos is split into.
+        use_impact: If True, full runs record a per-test coverage map for uv
+            repos and quick runs only run the tests impacted by the changes.
     """
-    config = get_repos_config()
-    repos = config.get("repos", {})
-    workspace = get_workspace_root()
+    graph = get_repo_graph()
 
     if full:
         console.print("[bold]Running full validation on all repositories...[/bold]")
-        repos_to_validate = list(repos.keys())
+        repos_to_validate = list(graph)
+        changed_files = {}
     else:
         console.print(
             "[bold]Running quick validation on changed repositories...[/bold]"
         )
-        repos_to_validate = _get_changed_repos(repos, workspace)
+        changed_files = _get_changed_repos(graph, base_ref)
 
-        if not repos_to_validate:
+        if not changed_files:
             console.print(
                 "[green]No changed repositories found. Nothing to validate.[/green]"
             )
             return
 
+        repos_to_validate = graph.with_dependents(changed_files)
+        dependents = [key for key in repos_to_validate if key not in changed_files]
+
         console.print(
-            f"\n[cyan]Changed repositories:[/cyan] {', '.join(repos_to_validate)}\n"
+            f"\n[cyan]Changed repositories:[/cyan] {', '.join(changed_files)}"
         )
+        if dependents:
+            console.print(
+                f"[cyan]Dependent repositories:[/cyan] {', '.join(dependents)}"
+            )
+        console.print()
 
-    results = {}
-    for repo_key in repos_to_validate:
-        repo_config = repos.get(repo_key)
-        if not repo_config:
-            continue
+    dependencies = graph.upstreams(repos_to_validate)
+    max_workers = jobs or os.cpu_count() or 1
+    cancellation = Cancellation()
+    limits = _get_step_limits(graph)
 
-        relative_path = repo_config.get("path", f"../{repo_key}")
-        repo_path = (workspace / relative_path).resolve()
+    def run(repo_key: str) -> dict:
+        repo_path = graph[repo_key].path
 
         if not repo_path.exists():
-            results[repo_key] = {"status": "missing", "details": "Repository not found"}
-            continue
+            return {"status": "missing", "details": "Repository not found"}
+
+        # Dependents pulled in by an upstream change run their full suite
+        impact_mode = None
+        if use_impact:
+            impact_mode = "record" if full else None
+            if repo_key in changed_files:
+                impact_mode = "select"
 
         console.print(f"\n[bold cyan]Validating {repo_key}...[/bold cyan]")
-        results[repo_key] = _validate_repo(repo_path)
+        return _validate_repo(
+            repo_path,
+            repo_key,
+            use_cache=use_cache,
+            fail_fast=fail_fast,
+            cancellation=cancellation,
+            shards=shards,
+            impact_mode=impact_mode,
+            install=installs.get(repo_key),
+            limits=limits[repo_key],
+            sources=_source_paths(graph, repo_key),
+        )
+
+    started_at = time.time()
+    start = time.monotonic()
+    # Installs don't depend on upstream repos passing, so they all start right
+    # away (upstreams first) and overlap with the checks of repos earlier in
+    # the schedule
+    with ThreadPoolExecutor(max_workers=max_workers) as install_pool:
+        installs = {}
+        for repo_key in (key for key in graph.order if key in dependencies):
+            repo_path = graph[repo_key].path
+            if repo_path.exists():
+                installs[repo_key] = install_pool.submit(
+                    _install_dependencies,
+                    repo_path,
+                    repo_key,
+                    use_cache=use_cache,
+                    fail_fast=fail_fast,
+                    cancellation=cancellation,
+                    limits=_limits_for(limits[repo_key], "install"),
+                )
+        try:
+            results = _run_scheduled(
+                dependencies, run, max_workers, cancellation, order=graph.order
+            )
+        except KeyboardInterrupt:
+            # Steps run in their own process groups and don't see the
+            # terminal's SIGINT
+            cancellation.cancel()
+            raise
+    if use_cache:
+        cache.evict()
 
+    report = telemetry.build_report(results, started_at, time.monotonic() - start)
+    telemetry.append_history(report)
+    if report_json:
+        telemetry.write_json_report(report, report_json)
+    if report_junit:
+        telemetry.write_junit_report(report, report_junit)
     _report_results(results)
 
 
-def _get_changed_repos(repos: dict, workspace: Path) -> list[str]:
-    """Get list of repositories with uncommitted changes."""
-    changed = []
+def _run_scheduled(
+    dependencies: dict[str, list[str]],
+    run,
+    max_workers: int,
+    cancellation: Cancellation | None = None,
+    blocking_statuses: set[str] = BLOCKING_STATUSES,
+    order: tuple[str, ...] | None = None,
+) -> dict:
+    """Run `run(key)` for every node on a bounded pool, respecting dependencies.
 
-    for repo_key, repo_config in repos.items():
-        relative_path = repo_config.get("path", f"../{repo_key}")
-        repo_path = (workspace / relative_path).resolve()
+    Used both for repos and for the steps within a repo. A node is submitted
+    as soon as all of its dependencies have finished without a blocking
+    status. Nodes with a blocking dependency are not run and are reported as
+    blocked. Once `cancellation` is set, no further nodes are started and the
+    remaining ones are reported as cancelled.
 
-        if not repo_path.exists():
-            continue
+    Args:
+        order: Submission priority when several nodes are ready at once,
+            e.g. RepoGraph.order. Defaults to the order of `dependencies`.
+
+    Returns:
+        Mapping of key to result dict, in the order of `dependencies`.
+
+    Raises:
+        ValueError: If the dependencies contain a cycle.
+    """
+    results: dict[str, dict] = {}
+    if order is None:
+        pending = list(dependencies)
+    else:
+        pending = [key for key in order if key in dependencies]
+    running: dict[Future, str] = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            if cancellation is not None and cancellation.cancelled:
+                for key in pending:
+                    results[key] = {
+                        "status": "cancelled",
+                        "details": "Cancelled after an earlier failure",
+                    }
+                pending.clear()
+
+            for key in list(pending):
+                upstream = dependencies[key]
+                blockers = [
+                    dep
+                    for dep in upstream
+                    if results.get(dep, {}).get("status") in blocking_statuses
+                ]
+                if blockers:
+                    pending.remove(key)
+                    results[key] = {
+                        "status": "blocked",
+                        "details": f"Upstream failed: {', '.join(blockers)}",
+                    }
+                    console.print(
+                        f"\n[yellow]Skipping {key}: upstream "
+                        f"{', '.join(blockers)} did not pass[/yellow]"
+                    )
+                elif all(dep in results for dep in upstream):
+                    pending.remove(key)
+                    running[pool.submit(run, key)] = key
+
+            if not running:
+                if pending:
+                    # Nothing runs and nothing can start, so they wait on each other
+                    raise ValueError(f"Dependency cycle among: {', '.join(pending)}")
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+
+    return {key: results[key] for key in dependencies}
+
+
+def _get_changed_repos(
+    graph: RepoGraph, base_ref: str = DEFAULT_BASE_REF
+) -> dict[str, set[str]]:
+    """Get repositories with changes relative to the merge-base with base_ref.
 
+    Each repository is probed concurrently. Committed-but-unmerged work, staged
+    and unstaged edits, and untracked files all count as changes.
+
+    Returns:
+        Mapping of changed repo key to the set of changed paths (relative to
+        the repo root), in repos.yaml order.
+    """
+    repo_paths = graph.existing()
+    if not repo_paths:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=len(repo_paths)) as pool:
+        probes = {
+            repo_key: pool.submit(_probe_changed_files, repo_path, base_ref)
+            for repo_key, repo_path in repo_paths.items()
+        }
+        changed = {repo_key: probe.result() for repo_key, probe in probes.items()}
+
+    return {repo_key: files for repo_key, files in changed.items() if files}
+
+
+def _probe_changed_files(repo_path: Path, base_ref: str) -> set[str]:
+    """List files changed in a repo since its merge-base with base_ref.
+
+    Falls back to `origin/<base_ref>`, and then to uncommitted changes only,
+    when the base ref does not exist in the repository.
+    """
+
+    def git(*args: str) -> str | None:
         try:
             result = subprocess.run(
-                ["git", "status", "--porcelain"],
+                ["git", *args],
                 cwd=repo_path,
                 capture_output=True,
                 text=True,
                 check=True,
             )
-            if result.stdout.strip():
-                changed.append(repo_key)
         except subprocess.CalledProcessError:
-            continue
+            return None
+        return result.stdout
 
-    return changed
+    merge_base = None
+    for ref in (base_ref, f"origin/{base_ref}"):
+        merge_base = git("merge-base", "HEAD", ref)
+        if merge_base is not None:
+            break
+
+    # Diffing the working tree against the merge-base covers committed,
+    # staged and unstaged changes in one call
+    diff = git("diff", "--name-only", (merge_base or "HEAD").strip())
+    untracked = git("ls-files", "--others", "--exclude-standard")
+    if diff is None and untracked is None:
+        return set()
+
+    return {
+        line for line in ((diff or "") + (untracked or "")).splitlines() if line
+    }
 
 
 def _detect_repo_type(repo_path: Path) -> str | None:
@@ -110,7 +337,7 @@ def _get_validation_steps(repo_type: str) -> list[tuple[str, list[str] | None]]:
     """
     if repo_type == "uv":
         return [
-            ("build", ["uv", "sync"]),
+            ("build", None),  # `uv sync` runs in the dependency install phase
             ("format", ["uv", "run", "ruff", "format", "--check", "."]),
             ("lint", ["uv", "run", "ruff", "check", "."]),
             ("test", ["uv", "run", "pytest", "-q"]),
@@ -132,14 +359,255 @@ def _get_validation_steps(repo_type: str) -> list[tuple[str, list[str] | None]]:
     return []
 
 
-def _validate_repo(repo_path: Path) -> dict:
-    """Run validation steps on a repository."""
+def _get_step_dependencies(repo_type: str) -> dict[str, list[str]]:
+    """Get the step graph for a repository type.
+
+    Returns:
+        Mapping of step name to the steps that must finish before it starts.
+        Steps run regardless of whether their dependencies passed; the graph
+        only orders them.
+    """
+    if repo_type == "just":
+        # `just fmt` may rewrite sources, so nothing may run alongside it
+        return {
+            "build": [],
+            "format": ["build"],
+            "lint": ["format"],
+            "test": ["lint"],
+        }
+    # Format and lint are read-only checks, so they run alongside the tests
+    return {
+        "build": [],
+        "format": ["build"],
+        "lint": ["build"],
+        "test": ["build"],
+    }
+
+
+def _get_toolchain(repo_type: str) -> list[str]:
+    """Get the tools whose versions affect validation results for a repo type."""
+    if repo_type == "uv":
+        return ["uv"]
+    elif repo_type == "just":
+        return ["just", "cargo", "rustc"]
+    elif repo_type == "pnpm":
+        return ["pnpm", "node"]
+    return []
+
+
+def _get_step_limits(graph: RepoGraph) -> dict[str, dict[str, dict]]:
+    """Derive per-repo, per-step timeouts and duration envelopes.
+
+    The envelope is the p99 of a step's recorded wall times; a passing step
+    that takes longer is reported as slow. Timeouts scale the envelope (see
+    TIMEOUT_FACTOR). Both are derived separately for each variant a step
+    ran as (see telemetry.DEFAULT_VARIANT), since e.g. an impact-selected
+    test run says nothing about the full suite. Variants without enough
+    recorded runs fall back to STEP_TIMEOUT and no envelope. A `timeouts`
+    mapping on a repo in repos.yaml overrides the timeout of individual
+    steps.
+
+    Returns:
+        Mapping of repo key to step name to variant to {"timeout",
+        "envelope"}. The None variant holds the fallback; look limits up
+        with _limits_for().
+    """
+    durations = telemetry.step_durations(telemetry.load_history())
+    limits: dict[str, dict[str, dict]] = {}
+
+    for repo_key in graph:
+        overrides = graph[repo_key].timeouts
+        repo_limits = limits.setdefault(repo_key, {})
+        for step_name in ("install", *STEP_NAMES):
+            timeout = overrides.get(step_name, STEP_TIMEOUT)
+            repo_limits[step_name] = {None: {"timeout": timeout, "envelope": None}}
+        for (key, step_name, variant), walls in durations.items():
+            if key != repo_key or step_name not in repo_limits:
+                continue
+            if len(walls) < TIMEOUT_MIN_SAMPLES:
+                continue
+            envelope = telemetry.percentile(walls, 99)
+            timeout = min(
+                max(envelope * TIMEOUT_FACTOR, TIMEOUT_FLOORS[step_name]),
+                TIMEOUT_CEILING,
+            )
+            repo_limits[step_name][variant] = {
+                "timeout": overrides.get(step_name, timeout),
+                "envelope": envelope,
+            }
+
+    return limits
+
+
+def _limits_for(
+    limits: dict[str, dict] | None,
+    step_name: str,
+    variant: str = telemetry.DEFAULT_VARIANT,
+) -> dict:
+    """Look up the timeout and envelope of a step variant in a repo's limits."""
+    variants = (limits or {}).get(step_name, {})
+    return (
+        variants.get(variant)
+        or variants.get(None)
+        or {"timeout": STEP_TIMEOUT, "envelope": None}
+    )
+
+
+def _get_install_step(repo_type: str, repo_path: Path) -> dict | None:
+    """Get the dependency install step for a repository.
+
+    Returns:
+        Dict with the install `cmd`, the lockfile/manifest `inputs` it depends
+        on, the `tools` whose versions matter and the `marker` file the install
+        leaves behind, or None if the repo has no install step.
+    """
+    if repo_type == "uv":
+        return {
+            "cmd": ["uv", "sync"],
+            "inputs": ["pyproject.toml", "uv.lock", ".python-version"],
+            "tools": ["uv"],
+            # Records the interpreter version the venv was built with
+            "marker": ".venv/pyvenv.cfg",
+        }
+    elif repo_type == "pnpm":
+        return {
+            "cmd": ["pnpm", "install", "--frozen-lockfile"],
+            "inputs": ["package.json", "pnpm-lock.yaml"],
+            "tools": ["pnpm", "node"],
+            "marker": "node_modules/.modules.yaml",
+        }
+    elif repo_type == "just" and (repo_path / "Cargo.lock").exists():
+        return {
+            "cmd": ["cargo", "fetch", "--locked"],
+            "inputs": ["Cargo.toml", "Cargo.lock"],
+            "tools": ["cargo", "rustc"],
+            "marker": None,
+        }
+    return None
+
+
+def _install_dependencies(
+    repo_path: Path,
+    repo_key: str,
+    use_cache: bool = True,
+    fail_fast: bool = False,
+    cancellation: Cancellation | None = None,
+    limits: dict | None = None,
+) -> dict | None:
+    """Install a repository's dependencies unless its lockfiles are unchanged.
+
+    Args:
+        limits: Timeout and duration envelope for the install step.
+
+    Returns:
+        Step result dict, or None if the repo has no install step.
+    """
+    repo_type = _detect_repo_type(repo_path)
+    install = _get_install_step(repo_type, repo_path) if repo_type else None
+    if install is None:
+        return None
+
+    prefix = f"[cyan]{repo_key}:[/cyan]"
+
+    def fingerprint() -> str | None:
+        return deps.install_fingerprint(
+            repo_path, install["inputs"], install["tools"], install["marker"]
+        )
+
+    if use_cache and deps.is_current(repo_path, fingerprint()):
+        console.print(
+            f"  {prefix} Installing dependencies... [green]up to date[/green]",
+            style="dim",
+        )
+        return {"status": "cached"}
+
+    console.print(f"  {prefix} Installing dependencies...", style="dim")
+
+    def stream(line: str) -> None:
+        console.print(f"    {prefix} {escape(line)}", style="dim", highlight=False)
+
+    try:
+        step = _run_command_step(
+            install["cmd"],
+            repo_path,
+            cancellation,
+            stream if fail_fast else None,
+            timeout=(limits or {}).get("timeout", STEP_TIMEOUT),
+        )
+    except FileNotFoundError:
+        console.print(
+            f"    {prefix} [yellow]install skipped (command not found)[/yellow]"
+        )
+        return {"status": "skipped"}
+
+    if step["status"] == "passed":
+        deps.record_install(repo_path, fingerprint())
+        if _is_slow(step, limits):
+            step["status"] = "slow"
+            console.print(f"    {prefix} [yellow]install passed but was slow[/yellow]")
+        return step
+
+    deps.forget_install(repo_path)
+    if step["status"] == "cancelled":
+        console.print(f"    {prefix} [yellow]install cancelled[/yellow]")
+    else:
+        console.print(f"    {prefix} [red]install failed[/red]")
+        if step.get("stdout") and not fail_fast:
+            console.print(step["stdout"], style="dim", markup=False)
+        if step.get("stderr"):
+            console.print(step["stderr"], style="dim red", markup=False)
+        if fail_fast and cancellation is not None:
+            cancellation.cancel()
+    return step
+
+
+def _validate_repo(
+    repo_path: Path,
+    repo_key: str,
+    use_cache: bool = True,
+    fail_fast: bool = False,
+    cancellation: Cancellation | None = None,
+    shards: int = 1,
+    impact_mode: str | None = None,
+    install: Future | None = None,
+    steps: set[str] | None = None,
+    limits: dict[str, dict] | None = None,
+    sources: dict[str, Path] | None = None,
+) -> dict:
+    """Run validation steps on a repository.
+
+    Steps are scheduled along the repo type's step graph, so independent
+    checks run concurrently once the build has finished. Output lines are
+    prefixed with the repo key since repos validate concurrently. Steps whose
+    cache key matches an earlier passing run are replayed from the cache
+    instead of being executed. In fail-fast mode step output is streamed
+    live, and the first failing step cancels `cancellation`.
+
+    Args:
+        shards: Number of pytest partitions the test step of uv repos is
+            split into, balanced by recorded per-file durations.
+        impact_mode: For uv repos, "record" stores a per-test coverage map and
+            "select" runs only the tests impacted by changes since then.
+            Impact runs are not sharded.
+        install: Future of this repo's dependency install, started ahead of
+            the repo schedule. Every step waits for it to finish.
+        steps: If given, only these steps run; the others are left as None.
+        limits: Per-step timeouts and duration envelopes; steps that pass but
+            exceed their envelope are reported as slow.
+        sources: Paths of the repo and of every repo it transitively depends
+            on. Their tree state is part of each step's cache key, so a change
+            upstream re-runs the steps of its dependents. Defaults to the repo
+            alone.
+    """
+    prefix = f"[cyan]{repo_key}:[/cyan]"
     results = {
         "status": "success",
+        "install": None,
         "build": None,
         "format": None,
         "lint": None,
         "test": None,
+        "timings": {},
     }
 
     repo_type = _detect_repo_type(repo_path)
@@ -148,55 +616,673 @@ def _validate_repo(repo_path: Path) -> dict:
         results["details"] = "Unknown project type"
         return results
 
-    validation_steps = _get_validation_steps(repo_type)
-    console.print(f"  Detected [bold]{repo_type}[/bold] project")
+    validation_steps = {
+        step_name: cmd
+        for step_name, cmd in _get_validation_steps(repo_type)
+        if steps is None or step_name in steps
+    }
+    step_dependencies = {
+        step_name: [dep for dep in deps if dep in validation_steps]
+        for step_name, deps in _get_step_dependencies(repo_type).items()
+        if step_name in validation_steps
+    }
+    if install is not None:
+        step_dependencies = {
+            "install": [],
+            **{
+                step_name: upstream or ["install"]
+                for step_name, upstream in step_dependencies.items()
+            },
+        }
+    console.print(f"  {prefix} Detected [bold]{repo_type}[/bold] project")
+    if cancellation is None:
+        cancellation = Cancellation()
 
-    for step_name, cmd in validation_steps:
+    def stream(line: str) -> None:
+        console.print(f"    {prefix} {escape(line)}", style="dim", highlight=False)
+
+    def run(step_name: str) -> dict:
+        if step_name == "install":
+            return install.result() or {"status": "skipped"}
+
+        cmd = validation_steps[step_name]
         if cmd is None:
-            results[step_name] = "skipped"
             console.print(
-                f"  Running {step_name}... [yellow]skipped[/yellow]", style="dim"
+                f"  {prefix} Running {step_name}... [yellow]skipped[/yellow]",
+                style="dim",
             )
-            continue
+            return {"status": "skipped"}
+
+        run_cmd = cmd
+        sharded = step_name == "test" and repo_type == "uv" and shards > 1
+        recording = False
+        variant = telemetry.DEFAULT_VARIANT
+        if step_name == "test" and repo_type == "uv" and impact_mode == "select":
+            selection, reason = impact.select_tests(repo_key, repo_path)
+            if selection is None:
+                console.print(f"  {prefix} Impact analysis: full suite ({reason})")
+            elif not selection:
+                console.print(
+                    f"  {prefix} Running {step_name}... "
+                    f"[yellow]skipped[/yellow] (no impacted tests)",
+                    style="dim",
+                )
+                return {"status": "skipped"}
+            else:
+                console.print(f"  {prefix} Impact analysis: {reason}")
+                run_cmd = [*cmd, *selection]
+                sharded = False
+                variant = "impact-select"
+        elif step_name == "test" and repo_type == "uv" and impact_mode == "record":
+            run_cmd = impact.record_command(cmd)
+            sharded = False
+            recording = True
+            variant = "impact-record"
+        if sharded:
+            variant = f"shards-{shards}"
 
-        console.print(f"  Running {step_name}...", style="dim")
+        key = None
+        if use_cache:
+            fingerprints = _source_fingerprints(sources or {repo_key: repo_path})
+            if fingerprints is not None:
+                key = cache.step_key(
+                    repo_key, fingerprints, _get_toolchain(repo_type), run_cmd
+                )
+                if cache.load_result(key) is not None:
+                    console.print(
+                        f"  {prefix} Running {step_name}... [green]cached[/green]",
+                        style="dim",
+                    )
+                    return {"status": "cached"}
+
+        console.print(f"  {prefix} Running {step_name}...", style="dim")
+        on_line = stream if fail_fast else None
+        step_limits = _limits_for(limits, step_name, variant)
+        timeout = step_limits["timeout"]
         try:
-            result = subprocess.run(
-                cmd,
-                cwd=repo_path,
-                capture_output=True,
-                text=True,
-                timeout=300,
-            )
-            if result.returncode == 0:
-                results[step_name] = "passed"
+            if sharded:
+                step = _run_sharded_tests(
+                    cmd, repo_path, repo_key, shards, cancellation, on_line, timeout
+                )
+            elif recording:
+                step = _run_recording_tests(
+                    run_cmd, repo_path, repo_key, cancellation, on_line, timeout
+                )
             else:
-                results[step_name] = "failed"
-                results["status"] = "failed"
-                console.print(f"    [red]{step_name} failed[/red]")
-                if result.stdout:
-                    console.print(result.stdout, style="dim")
-                if result.stderr:
-                    console.print(result.stderr, style="dim red")
+                step = _run_command_step(
+                    run_cmd, repo_path, cancellation, on_line, timeout=timeout
+                )
         except FileNotFoundError:
-            results[step_name] = "skipped"
             console.print(
-                f"    [yellow]{step_name} skipped (command not found)[/yellow]"
+                f"    {prefix} [yellow]{step_name} skipped (command not found)[/yellow]"
             )
-        except subprocess.TimeoutExpired:
-            results[step_name] = "timeout"
-            results["status"] = "failed"
-            console.print(f"    [red]{step_name} timed out[/red]")
+            return {"status": "skipped"}
+        # A sharded run falls back to one process when there's one test file
+        step["variant"] = (
+            telemetry.DEFAULT_VARIANT if sharded and "shards" not in step else variant
+        )
 
+        if step["status"] == "cancelled":
+            console.print(f"    {prefix} [yellow]{step_name} cancelled[/yellow]")
+        elif step["status"] == "timeout":
+            console.print(
+                f"    {prefix} [red]{step_name} timed out after {timeout:.0f}s[/red]"
+            )
+        elif step["status"] == "passed":
+            if key is not None:
+                cache.store_result(key, {"status": "passed", "cmd": run_cmd})
+            if _is_slow(step, step_limits):
+                step["status"] = "slow"
+                console.print(
+                    f"    {prefix} [yellow]{step_name} passed but took "
+                    f"{step['timing']['wall']:.1f}s (usually under "
+                    f"{step_limits['envelope']:.1f}s)[/yellow]"
+                )
+        else:
+            console.print(f"    {prefix} [red]{step_name} failed[/red]")
+            if step.get("stdout") and not fail_fast:
+                console.print(step["stdout"], style="dim", markup=False)
+            if step.get("stderr"):
+                console.print(step["stderr"], style="dim red", markup=False)
+
+        if fail_fast and step["status"] in ("failed", "timeout"):
+            cancellation.cancel()
+        return step
+
+    step_results = _run_scheduled(
+        step_dependencies,
+        run,
+        max_workers=len(step_dependencies) or 1,
+        cancellation=cancellation,
+        blocking_statuses=set(),
+    )
+
+    for step_name, step in step_results.items():
+        results[step_name] = step["status"]
+        if "timing" in step:
+            results["timings"][step_name] = step["timing"]
+        if "shards" in step:
+            results[f"{step_name}_shards"] = step["shards"]
+        if "variant" in step:
+            results[f"{step_name}_variant"] = step["variant"]
+
+    statuses = {step["status"] for step in step_results.values()}
+    if statuses & {"failed", "timeout"}:
+        results["status"] = "failed"
+    elif "cancelled" in statuses:
+        results["status"] = "cancelled"
     return results
 
 
-def _report_results(results: dict) -> None:
-    """Report validation results in a table."""
-    console.print("\n")
+def _source_paths(graph: RepoGraph, repo_key: str) -> dict[str, Path]:
+    """Paths of the repo and of every repo it transitively depends on."""
+    return {key: graph[key].path for key in graph.sources(repo_key)}
+
+
+def _source_fingerprints(sources: dict[str, Path]) -> dict[str, str] | None:
+    """Fingerprint each source repo, or None if any can't be fingerprinted."""
+    fingerprints = {}
+    for key, path in sources.items():
+        fingerprint = cache.tree_fingerprint(path) if path.exists() else None
+        if fingerprint is None:
+            return None
+        fingerprints[key] = fingerprint
+    return fingerprints
+
+
+def _run_command_step(
+    cmd: list[str],
+    repo_path: Path,
+    cancellation: Cancellation,
+    on_line=None,
+    env: dict[str, str] | None = None,
+    timeout: float = STEP_TIMEOUT,
+) -> dict:
+    """Run a single step command and summarize its outcome.
+
+    Returns:
+        Dict with the step status, its timing and captured output.
+    """
+    run = run_step(
+        cmd,
+        repo_path,
+        timeout=timeout,
+        cancellation=cancellation,
+        on_line=on_line,
+        env=env,
+    )
+    if run.cancelled:
+        status = "cancelled"
+    elif run.timed_out:
+        status = "timeout"
+    elif run.returncode == 0:
+        status = "passed"
+    else:
+        status = "failed"
+
+    return {
+        "status": status,
+        "timing": {
+            "wall": round(run.wall_time, 3),
+            "cpu": None if run.cpu_time is None else round(run.cpu_time, 3),
+            "max_rss_kb": run.max_rss_kb,
+        },
+        "stdout": run.stdout,
+        "stderr": run.stderr,
+        "returncode": run.returncode,
+    }
+
+
+def _is_slow(step: dict, limits: dict | None) -> bool:
+    """Check whether a step took noticeably longer than its duration envelope.
+
+    Overruns below telemetry.TREND_MIN_DELTA are ignored so jitter on
+    sub-second steps isn't reported.
+    """
+    envelope = (limits or {}).get("envelope")
+    wall = step.get("timing", {}).get("wall")
+    if envelope is None or wall is None:
+        return False
+    return wall - envelope >= telemetry.TREND_MIN_DELTA
+
+
+def _run_recording_tests(
+    cmd: list[str],
+    repo_path: Path,
+    repo_key: str,
+    cancellation: Cancellation,
+    on_line=None,
+    timeout: float = STEP_TIMEOUT,
+) -> dict:
+    """Run a coverage-recording pytest command and store its coverage map.
+
+    The map is only stored when the suite passes, so it reflects a green tree.
+    """
+    with tempfile.TemporaryDirectory(prefix="stack-impact-") as tmp_dir:
+        data_file = Path(tmp_dir) / ".coverage"
+        step = _run_command_step(
+            cmd,
+            repo_path,
+            cancellation,
+            on_line,
+            env={"COVERAGE_FILE": str(data_file)},
+            timeout=timeout,
+        )
+        if step["status"] == "passed":
+            impact.save_map(
+                repo_key, repo_path, impact.read_coverage(data_file, repo_path)
+            )
+    return step
+
+
+def _run_sharded_tests(
+    cmd: list[str],
+    repo_path: Path,
+    repo_key: str,
+    shards: int,
+    cancellation: Cancellation,
+    on_line=None,
+    timeout: float = STEP_TIMEOUT,
+) -> dict:
+    """Run a pytest command split into shards by historical per-file duration.
+
+    Falls back to a single unsharded run when collection fails or yields a
+    single file. The merged timing uses the slowest shard's wall time, the
+    summed CPU time and the largest peak RSS.
+    """
+    files = sharding.collect_test_files(cmd, repo_path)
+    partitions = sharding.partition(files, sharding.load_durations(repo_key), shards)
+    if len(partitions) < 2:
+        return _run_command_step(
+            cmd, repo_path, cancellation, on_line, timeout=timeout
+        )
+
+    with tempfile.TemporaryDirectory(prefix="stack-shards-") as tmp_dir:
+        junit_paths = [
+            Path(tmp_dir) / f"shard-{index}.xml" for index in range(len(partitions))
+        ]
+        with ThreadPoolExecutor(max_workers=len(partitions)) as pool:
+            runs = list(
+                pool.map(
+                    lambda args: _run_command_step(
+                        sharding.shard_command(cmd, *args),
+                        repo_path,
+                        cancellation,
+                        on_line,
+                        timeout=timeout,
+                    ),
+                    zip(partitions, junit_paths),
+                )
+            )
+
+        durations = {}
+        for junit_path in junit_paths:
+            durations.update(sharding.read_junit_durations(junit_path))
+        sharding.save_durations(repo_key, durations)
+
+    shard_results = []
+    for members, run in zip(partitions, runs):
+        # pytest exits with 5 when a shard collects no tests
+        if run["status"] == "failed" and run["returncode"] == 5:
+            run["status"] = "passed"
+        shard_results.append(
+            {"status": run["status"], "files": len(members), **run["timing"]}
+        )
+
+    statuses = {run["status"] for run in runs}
+    for status in ("failed", "timeout", "cancelled"):
+        if status in statuses:
+            break
+    else:
+        status = "passed"
+
+    cpu_times = [run["timing"]["cpu"] for run in runs]
+    rss = [run["timing"]["max_rss_kb"] for run in runs]
+    return {
+        "status": status,
+        "timing": {
+            "wall": max(run["timing"]["wall"] for run in runs),
+            "cpu": None if None in cpu_times else round(sum(cpu_times), 3),
+            "max_rss_kb": None if None in rss else max(rss),
+        },
+        "stdout": "\n".join(run["stdout"] for run in runs if run["stdout"]),
+        "stderr": "\n".join(run["stderr"] for run in runs if run["stderr"]),
+        "shards": shard_results,
+    }
+
+
+def watch(
+    jobs: int | None = None,
+    use_cache: bool = True,
+    debounce: float = 0.3,
+    fail_fast: bool = False,
+    shards: int = 1,
+    use_impact: bool = False,
+) -> None:
+    """Re-validate repositories incrementally as their files change.
+
+    Runs a full validation once, then watches every repo path from repos.yaml
+    with inotify. Bursts of writes are debounced, each changed file is mapped
+    to its repo and the steps it affects, and only those steps (plus the
+    dependent repos) are re-run. Gitignored files and directories are ignored.
+
+    Args:
+        jobs: Maximum number of repos validated concurrently.
+        use_cache: If True, replay cached step results.
+        debounce: Seconds of quiet that end a burst of file events.
+        fail_fast: If True, stream step output live and cancel the rest of a
+            re-validation on its first failure.
+        shards: Number of partitions the pytest suite of uv repos is split into.
+        use_impact: If True, the initial run records a coverage map for uv
+            repos, and re-runs of changed repos only run the impacted tests.
+            Dependents of a changed repo run their full suite.
+    """
+    graph = get_repo_graph()
+    max_workers = jobs or os.cpu_count() or 1
+    repo_paths = graph.existing()
+
+    results = {repo_key: {"status": "missing"} for repo_key in graph}
+    limits = _get_step_limits(graph)
+
+    def merge(repo_key: str, result: dict) -> dict:
+        """Overlay the steps that just ran onto the repo's previous results."""
+        if result.get("status") in ("skipped", "missing"):
+            return result
+        previous = results.get(repo_key, {})
+        merged = {**previous, "timings": dict(previous.get("timings", {}))}
+        for step_name in ("install", *STEP_NAMES):
+            if result.get(step_name) is not None:
+                merged[step_name] = result[step_name]
+                merged["timings"].pop(step_name, None)
+        merged["timings"].update(result.get("timings", {}))
+
+        statuses = {merged.get(step_name) for step_name in ("install", *STEP_NAMES)}
+        if statuses & {"failed", "timeout"}:
+            merged["status"] = "failed"
+        elif "cancelled" in statuses:
+            merged["status"] = "cancelled"
+        else:
+            merged["status"] = "success"
+        return merged
+
+    def revalidate(
+        affected: dict[str, set[str] | None], changed: set[str] | None = None
+    ) -> None:
+        """Run the affected steps of the given repos and merge their results.
+
+        Args:
+            affected: Steps to run per repo; None runs all of them.
+            changed: Repos whose own files changed. None for a run that
+                isn't triggered by changes, which records coverage maps when
+                use_impact is set.
+        """
+        cancellation = Cancellation()
+
+        def run(repo_key: str) -> dict:
+            impact_mode = None
+            if use_impact:
+                if changed is None:
+                    impact_mode = "record"
+                elif repo_key in changed:
+                    impact_mode = "select"
+            repo_path = repo_paths[repo_key]
+            steps = affected[repo_key]
+            install = None
+            if steps is None or "install" in steps:
+                install = Future()
+                install.set_result(
+                    _install_dependencies(
+                        repo_path,
+                        repo_key,
+                        use_cache=use_cache,
+                        fail_fast=fail_fast,
+                        cancellation=cancellation,
+                        limits=_limits_for(limits[repo_key], "install"),
+                    )
+                )
+            result = _validate_repo(
+                repo_path,
+                repo_key,
+                use_cache=use_cache,
+                fail_fast=fail_fast,
+                cancellation=cancellation,
+                shards=shards,
+                impact_mode=impact_mode,
+                install=install,
+                steps=steps,
+                limits=limits[repo_key],
+                sources=_source_paths(graph, repo_key),
+            )
+            return merge(repo_key, result)
+
+        dependencies = graph.upstreams(list(affected))
+        try:
+            results.update(
+                _run_scheduled(
+                    dependencies, run, max_workers, cancellation, order=graph.order
+                )
+            )
+        except KeyboardInterrupt:
+            cancellation.cancel()
+            raise
+
+    console.print("[bold]Running initial validation...[/bold]")
+    try:
+        revalidate({repo_key: None for repo_key in repo_paths})
+    except KeyboardInterrupt:
+        return
+
+    ignored_dirs: dict[str, set[Path]] = {
+        repo_key: _list_ignored_dirs(repo_path)
+        for repo_key, repo_path in repo_paths.items()
+    }
+    watching = False
+
+    def skip_dir(path: Path) -> bool:
+        if path.name == ".git":
+            return True
+        repo_key = _find_repo(repo_paths, path)
+        if repo_key is None or path in ignored_dirs[repo_key]:
+            return True
+        # New directories aren't in the startup listing, so ask git directly
+        return watching and bool(_filter_ignored(repo_paths[repo_key], [path]))
+
+    def on_changes(changed_paths: set[Path] | None) -> None:
+        """Re-validate after a burst of changes; None means events were lost."""
+        if changed_paths is None:
+            console.print(
+                "[yellow]Missed file events; re-validating all repos[/yellow]"
+            )
+            revalidate({repo_key: None for repo_key in repo_paths})
+            return
+
+        affected = _map_changes(repo_paths, changed_paths)
+        if not affected:
+            return
+
+        summary = ", ".join(
+            f"{repo_key} ({len(files)} file(s))" for repo_key, files in affected.items()
+        )
+        console.print(f"\n[cyan]Changed:[/cyan] {summary}")
+
+        affected_steps: dict[str, set[str] | None] = {
+            repo_key: _get_affected_steps(repo_paths[repo_key], files)
+            for repo_key, files in affected.items()
+        }
+        for repo_key in graph.with_dependents(affected):
+            if repo_key in repo_paths:
+                affected_steps.setdefault(repo_key, None)
+        revalidate(affected_steps, changed=set(affected))
+
+    try:
+        with inotify.Inotify(skip_dir=skip_dir) as watcher:
+            for repo_path in repo_paths.values():
+                watcher.add_tree(repo_path)
+            watching = True
+
+            with Live(_build_results_table(results), console=console) as live:
+                while True:
+                    try:
+                        changed_paths = watcher.wait(debounce)
+                    except inotify.Overflow:
+                        changed_paths = None
+                    on_changes(changed_paths)
+                    live.update(_build_results_table(results))
+    except KeyboardInterrupt:
+        console.print("\n[dim]Stopped watching.[/dim]")
+
+
+def _find_repo(repo_paths: dict[str, Path], path: Path) -> str | None:
+    """Find the repo containing path."""
+    for repo_key, repo_path in repo_paths.items():
+        if path == repo_path or path.is_relative_to(repo_path):
+            return repo_key
+    return None
+
+
+def _list_ignored_dirs(repo_path: Path) -> set[Path]:
+    """List the gitignored directories of a repo (e.g. node_modules, target)."""
+    try:
+        result = subprocess.run(
+            [
+                "git",
+                "ls-files",
+                "--others",
+                "--ignored",
+                "--exclude-standard",
+                "--directory",
+                "-z",
+            ],
+            cwd=repo_path,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return set()
+    return {
+        repo_path / entry.rstrip("/")
+        for entry in result.stdout.split("\0")
+        if entry.endswith("/")
+    }
+
+
+def _filter_ignored(repo_path: Path, paths: list[Path]) -> set[Path]:
+    """Return the subset of paths that the repo's .gitignore rules ignore."""
+    if not paths:
+        return set()
+    try:
+        result = subprocess.run(
+            ["git", "check-ignore", "--stdin", "-z"],
+            cwd=repo_path,
+            input="\0".join(str(path) for path in paths),
+            capture_output=True,
+            text=True,
+        )
+    except FileNotFoundError:
+        return set()
+    # check-ignore exits with 1 when none of the paths are ignored
+    return {Path(entry) for entry in result.stdout.split("\0") if entry}
+
+
+def _map_changes(
+    repo_paths: dict[str, Path], changed_paths: set[Path]
+) -> dict[str, set[str]]:
+    """Group changed paths by repo, dropping gitignored and .git paths.
+
+    Returns:
+        Mapping of repo key to changed paths relative to the repo root.
+    """
+    by_repo: dict[str, list[Path]] = {}
+    for path in changed_paths:
+        repo_key = _find_repo(repo_paths, path)
+        if repo_key is not None and ".git" not in path.parts:
+            by_repo.setdefault(repo_key, []).append(path)
+
+    affected = {}
+    for repo_key, paths in by_repo.items():
+        repo_path = repo_paths[repo_key]
+        ignored = _filter_ignored(repo_path, paths)
+        files = {
+            path.relative_to(repo_path).as_posix()
+            for path in paths
+            if path not in ignored
+        }
+        if files:
+            affected[repo_key] = files
+    return affected
+
+
+def _get_affected_steps(repo_path: Path, files: set[str]) -> set[str] | None:
+    """Map changed files to the validation steps they affect.
+
+    Returns:
+        Set of step names, or None if every step (including the dependency
+        install) must run.
+    """
+    repo_type = _detect_repo_type(repo_path)
+    install = _get_install_step(repo_type, repo_path) if repo_type else None
+    if repo_type is None or (install and files & set(install["inputs"])):
+        return None
+
+    if repo_type == "uv":
+        # Non-Python files (fixtures, data) can only affect the tests
+        if any(name.endswith(".py") for name in files):
+            return {"format", "lint", "test"}
+        return {"test"}
+    return {"build", "format", "lint", "test"}
+
+
+def show_trends() -> None:
+    """Show per-repo/per-step duration medians from the validation history."""
+    rows = telemetry.compute_trends(telemetry.load_history())
+    if not rows:
+        console.print("[yellow]No validation history recorded yet.[/yellow]")
+        return
+
+    table = Table(title="Validation Step Trends")
+    table.add_column("Repository", style="cyan")
+    table.add_column("Step")
+    table.add_column("Runs", justify="right")
+    table.add_column("Median", justify="right")
+    table.add_column(f"Last {telemetry.TREND_WINDOW}", justify="right")
+    table.add_column("Baseline", justify="right")
+    table.add_column("Trend")
+
+    for row in rows:
+        baseline = row["baseline_median"]
+        trend = "[red]slower[/red]" if row["regressed"] else "[dim]-[/dim]"
+        step = row["step"]
+        if row["variant"] != telemetry.DEFAULT_VARIANT:
+            step += f" ({row['variant']})"
+        table.add_row(
+            row["repo"],
+            step,
+            str(row["runs"]),
+            f"{row['median']:.1f}s",
+            f"{row['recent_median']:.1f}s",
+            "-" if baseline is None else f"{baseline:.1f}s",
+            trend,
+        )
+
+    console.print(table)
+
+    regressed = [
+        f"{r['repo']}/{r['step']}"
+        + ("" if r["variant"] == telemetry.DEFAULT_VARIANT else f" ({r['variant']})")
+        for r in rows
+        if r["regressed"]
+    ]
+    if regressed:
+        console.print(f"\n[red]Slower than baseline:[/red] {', '.join(regressed)}")
+
+
+def _build_results_table(results: dict) -> Table:
+    """Build the table of per-repo, per-step validation results."""
     table = Table(title="Validation Results")
     table.add_column("Repository", style="cyan")
     table.add_column("Status", style="bold")
+    table.add_column("Deps")
     table.add_column("Build")
     table.add_column("Format")
     table.add_column("Lint")
@@ -205,12 +1291,18 @@ def _report_results(results: dict) -> None:
     def status_style(status: str | None) -> str:
         if status == "passed":
             return "[green]✓[/green]"
+        elif status == "cached":
+            return "[green]↺[/green]"
+        elif status == "slow":
+            return "[yellow]✓[/yellow]"
         elif status == "failed":
             return "[red]✗[/red]"
         elif status == "skipped":
             return "[yellow]-[/yellow]"
         elif status == "timeout":
             return "[red]⏱[/red]"
+        elif status == "cancelled":
+            return "[yellow]⊘[/yellow]"
         return "[dim]-[/dim]"
 
     for repo_key, result in results.items():
@@ -223,26 +1315,52 @@ def _report_results(results: dict) -> None:
             status_col = "[red]Missing[/red]"
         elif overall == "skipped":
             status_col = "[yellow]Skipped[/yellow]"
+        elif overall == "blocked":
+            status_col = "[yellow]Blocked[/yellow]"
+        elif overall == "cancelled":
+            status_col = "[yellow]Cancelled[/yellow]"
         else:
             status_col = overall
 
         table.add_row(
             repo_key,
             status_col,
+            status_style(result.get("install")),
             status_style(result.get("build")),
             status_style(result.get("format")),
             status_style(result.get("lint")),
             status_style(result.get("test")),
         )
 
-    console.print(table)
+    return table
+
+
+def _report_results(results: dict) -> None:
+    """Report validation results in a table."""
+    console.print("\n")
+    console.print(_build_results_table(results))
 
     # Summary
     total = len(results)
     success = sum(1 for r in results.values() if r.get("status") == "success")
     failed = sum(1 for r in results.values() if r.get("status") == "failed")
+    blocked = sum(1 for r in results.values() if r.get("status") == "blocked")
+    cancelled = sum(1 for r in results.values() if r.get("status") == "cancelled")
+    slow = sum(
+        1
+        for r in results.values()
+        for step_name in ("install", *STEP_NAMES)
+        if r.get(step_name) == "slow"
+    )
 
-    console.print(f"\n[bold]Summary:[/bold] {success}/{total} passed, {failed} failed")
+    summary = f"{success}/{total} passed, {failed} failed"
+    if blocked:
+        summary += f", {blocked} blocked"
+    if cancelled:
+        summary += f", {cancelled} cancelled"
+    if slow:
+        summary += f", {slow} slow step(s)"
+    console.print(f"\n[bold]Summary:[/bold] {summary}")
 
     if failed > 0:
         raise SystemExit(1)
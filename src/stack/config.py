@@ -2,7 +2,11 @@
 
 from pathlib import Path
 
-import yaml
+# Compose file in platform-stack defining the platform services
+COMPOSE_FILE = "compose.services.yaml"
+
+# Parsed repo graph and the (mtime, size) of repos.yaml it was built from
+_graph_cache: tuple[tuple[int, int], "RepoGraph"] | None = None
 
 
 def get_workspace_root() -> Path:
@@ -14,6 +18,8 @@ def get_workspace_root() -> Path:
 
 def get_repos_config() -> dict:
     """Load and return the repos.yaml configuration."""
+    import yaml
+
     workspace = get_workspace_root()
     repos_yaml = workspace / "repos.yaml"
 
@@ -24,19 +30,196 @@ def get_repos_config() -> dict:
         return yaml.safe_load(f)
 
 
+class Repo:
+    """A repository entry from repos.yaml with its path resolved."""
+
+    __slots__ = ("key", "url", "path", "role", "depends_on", "timeouts")
+
+    def __init__(
+        self,
+        key: str,
+        url: str | None,
+        path: Path,
+        role: str | None,
+        depends_on: tuple[str, ...],
+        timeouts: dict[str, float],
+    ) -> None:
+        self.key = key
+        self.url = url
+        self.path = path
+        self.role = role
+        self.depends_on = depends_on
+        self.timeouts = timeouts
+
+    def __repr__(self) -> str:
+        return f"Repo({self.key!r}, path={str(self.path)!r})"
+
+
+class RepoGraph:
+    """The repositories from repos.yaml and the dependencies between them.
+
+    Iterating yields repo keys in repos.yaml order. The topological order
+    (every repo after its upstreams) and the reverse-dependency index are
+    computed once when the graph is built.
+    """
+
+    __slots__ = ("repos", "order", "dependents")
+
+    def __init__(self, repos: dict[str, Repo]) -> None:
+        self.repos = repos
+        self.dependents: dict[str, tuple[str, ...]] = {key: () for key in repos}
+        for repo in repos.values():
+            for dep in repo.depends_on:
+                self.dependents[dep] += (repo.key,)
+        self.order = self._topological_order()
+
+    def __contains__(self, repo_key: str) -> bool:
+        return repo_key in self.repos
+
+    def __getitem__(self, repo_key: str) -> Repo:
+        return self.repos[repo_key]
+
+    def __iter__(self):
+        return iter(self.repos)
+
+    def __len__(self) -> int:
+        return len(self.repos)
+
+    def _topological_order(self) -> tuple[str, ...]:
+        order = []
+        state: dict[str, str] = {}
+
+        def visit(repo_key: str, path: list[str]) -> None:
+            if state.get(repo_key) == "done":
+                return
+            if state.get(repo_key) == "visiting":
+                cycle = " -> ".join(path[path.index(repo_key) :] + [repo_key])
+                raise ValueError(f"Dependency cycle in repos.yaml: {cycle}")
+            state[repo_key] = "visiting"
+            for dep in self.repos[repo_key].depends_on:
+                visit(dep, path + [repo_key])
+            state[repo_key] = "done"
+            order.append(repo_key)
+
+        for repo_key in self.repos:
+            visit(repo_key, [])
+        return tuple(order)
+
+    def existing(self) -> dict[str, Path]:
+        """Map the keys of repos that are checked out to their paths."""
+        return {
+            key: repo.path for key, repo in self.repos.items() if repo.path.exists()
+        }
+
+    def with_dependents(self, repo_keys) -> list[str]:
+        """Expand repo keys with every repo that transitively depends on them.
+
+        Returns:
+            The expanded repo keys, in repos.yaml order.
+        """
+        selected = set(repo_keys)
+        stack = list(selected)
+        while stack:
+            for dependent in self.dependents.get(stack.pop(), ()):
+                if dependent not in selected:
+                    selected.add(dependent)
+                    stack.append(dependent)
+        return [key for key in self.repos if key in selected]
+
+    def sources(self, repo_key: str) -> list[str]:
+        """The repo and every repo it transitively depends on, in graph order."""
+        selected = {repo_key}
+        stack = [repo_key]
+        while stack:
+            for dep in self.repos[stack.pop()].depends_on:
+                if dep not in selected:
+                    selected.add(dep)
+                    stack.append(dep)
+        return [key for key in self.order if key in selected]
+
+    def upstreams(self, repo_keys: list[str]) -> dict[str, list[str]]:
+        """Build the upstream graph restricted to a selection of repos.
+
+        Dependencies on repos outside `repo_keys` are followed transitively,
+        so a repo still depends on a selected upstream even if the repo in
+        between is not selected.
+
+        Returns:
+            Mapping of repo key to the selected repos it depends on, in
+            `repo_keys` order.
+        """
+        selected = set(repo_keys)
+        graph = {}
+        for repo_key in repo_keys:
+            upstream = []
+            seen = set()
+            stack = list(self.repos[repo_key].depends_on)
+            while stack:
+                dep = stack.pop()
+                if dep in seen:
+                    continue
+                seen.add(dep)
+                if dep in selected:
+                    upstream.append(dep)
+                else:
+                    stack.extend(self.repos[dep].depends_on)
+            graph[repo_key] = sorted(upstream, key=repo_keys.index)
+        return graph
+
+
+def _build_repo_graph(config: dict) -> RepoGraph:
+    workspace = get_workspace_root()
+    entries = config.get("repos") or {}
+    repos = {}
+    for repo_key, repo_config in entries.items():
+        repo_config = repo_config or {}
+        relative_path = repo_config.get("path", f"../{repo_key}")
+        repos[repo_key] = Repo(
+            key=repo_key,
+            url=repo_config.get("url"),
+            path=(workspace / relative_path).resolve(),
+            role=repo_config.get("role"),
+            # Dependencies on repos that aren't declared are ignored
+            depends_on=tuple(
+                dep for dep in repo_config.get("depends_on") or [] if dep in entries
+            ),
+            timeouts={
+                step: float(seconds)
+                for step, seconds in (repo_config.get("timeouts") or {}).items()
+            },
+        )
+    return RepoGraph(repos)
+
+
+def get_repo_graph() -> RepoGraph:
+    """Get the repository graph, re-reading repos.yaml only when it changed.
+
+    Raises:
+        FileNotFoundError: If repos.yaml does not exist.
+        ValueError: If the dependencies in repos.yaml contain a cycle.
+    """
+    global _graph_cache
+
+    repos_yaml = get_workspace_root() / "repos.yaml"
+    try:
+        stat = repos_yaml.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"repos.yaml not found at {repos_yaml}") from None
+
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    if _graph_cache is None or _graph_cache[0] != stamp:
+        _graph_cache = (stamp, _build_repo_graph(get_repos_config()))
+    return _graph_cache[1]
+
+
 def get_repo_path(repo_key: str) -> Path:
     """Get the absolute path for a repository."""
-    config = get_repos_config()
-    repos = config.get("repos", {})
+    graph = get_repo_graph()
 
-    if repo_key not in repos:
+    if repo_key not in graph:
         raise ValueError(f"Unknown repository: {repo_key}")
 
-    repo_config = repos[repo_key]
-    relative_path = repo_config.get("path", f"../{repo_key}")
-
-    workspace = get_workspace_root()
-    return (workspace / relative_path).resolve()
+    return graph[repo_key].path
 
 
 def get_platform_stack_path() -> Path:
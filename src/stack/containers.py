@@ -0,0 +1,284 @@
+"""In-memory model of the compose stack's containers.
+
+The model is seeded once from `docker compose ps` and then kept current
+by applying `docker events` as they arrive, instead of polling. The event
+stream starts from just before the snapshot was taken, so no transition
+is lost in between; events replayed from before the snapshot leave the
+model in the state they ended in. CPU, memory and network usage are
+sampled separately from `docker stats --no-stream`. Every docker
+invocation goes through the `docker` binary on PATH, so a fake one can
+stand in for tests.
+"""
+
+import json
+import re
+import subprocess
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from stack.readiness import get_compose_services
+
+# Seconds between resource samples
+STATS_INTERVAL = 5.0
+
+# Seconds of events before the snapshot that are replayed, covering clock
+# differences between the CLI and the docker daemon
+EVENTS_OVERLAP = 1.0
+
+_SIZE = re.compile(r"^\s*([\d.]+)\s*([A-Za-z]*)\s*$")
+_SIZE_UNITS = {
+    "": 1,
+    "b": 1,
+    "kb": 1000,
+    "mb": 1000**2,
+    "gb": 1000**3,
+    "tb": 1000**4,
+    "kib": 1024,
+    "mib": 1024**2,
+    "gib": 1024**3,
+    "tib": 1024**4,
+}
+
+# Container state after each lifecycle event
+_EVENT_STATES = {
+    "create": "created",
+    "start": "running",
+    "restart": "running",
+    "unpause": "running",
+    "pause": "paused",
+    "die": "exited",
+    "stop": "exited",
+    "destroy": "removed",
+}
+
+
+def parse_size(text: str) -> int | None:
+    """Parse a docker size such as `12.5MiB` or `3.4kB` into bytes."""
+    match = _SIZE.match(text)
+    if not match:
+        return None
+    unit = _SIZE_UNITS.get(match.group(2).lower())
+    if unit is None:
+        return None
+    return int(float(match.group(1)) * unit)
+
+
+def _parse_pair(text: str) -> tuple[int | None, int | None]:
+    """Parse a docker `used / total` or `rx / tx` pair of sizes."""
+    first, _, second = (text or "").partition("/")
+    return parse_size(first), parse_size(second)
+
+
+@dataclass(slots=True)
+class ServiceState:
+    """Last known state and resource usage of one service's container.
+
+    Attributes:
+        service: Compose service name.
+        container: Container name.
+        state: created, running, paused, exited or removed.
+        health: Healthcheck status, or "" if the service defines none.
+        exit_code: Exit code of the last run, if it exited.
+        changed_at: Wall-clock time of the last state or health change.
+        cpu_percent: CPU usage from the last stats sample.
+        mem_bytes: Memory usage from the last stats sample.
+        mem_limit: Memory limit from the last stats sample.
+        net_rx: Bytes received, from the last stats sample.
+        net_tx: Bytes sent, from the last stats sample.
+        sampled_at: Wall-clock time of the last stats sample.
+    """
+
+    service: str
+    container: str = ""
+    state: str = ""
+    health: str = ""
+    exit_code: int | None = None
+    changed_at: float | None = None
+    cpu_percent: float | None = None
+    mem_bytes: int | None = None
+    mem_limit: int | None = None
+    net_rx: int | None = None
+    net_tx: int | None = None
+    sampled_at: float | None = None
+
+    def clear_usage(self) -> None:
+        self.cpu_percent = self.mem_bytes = self.mem_limit = None
+        self.net_rx = self.net_tx = self.sampled_at = None
+
+
+class StackModel:
+    """Container state per compose service, updated from events and stats.
+
+    Attributes:
+        project: Compose project name.
+        services: State per compose service name.
+        seeded_at: Wall-clock time just before the seeding snapshot, if the
+            model was seeded from `docker compose ps`.
+    """
+
+    def __init__(
+        self,
+        project: str,
+        services: dict[str, ServiceState],
+        seeded_at: float | None = None,
+    ) -> None:
+        self.project = project
+        self.services = services
+        self.seeded_at = seeded_at
+
+    @classmethod
+    def from_compose(cls, stack_path: Path) -> "StackModel | None":
+        """Seed the model from `docker compose ps`, or None if it can't run."""
+        seeded_at = time.time()
+        states = get_compose_services(stack_path)
+        if states is None:
+            return None
+        project = next(
+            (s["project"] for s in states.values() if s.get("project")),
+            # Compose's default project name
+            re.sub(r"[^a-z0-9_-]", "", stack_path.name.lower()),
+        )
+        services = {
+            name: ServiceState(
+                service=name,
+                container=state.get("name", ""),
+                state=state["state"],
+                health=state["health"],
+                exit_code=state["exit_code"] if state["state"] == "exited" else None,
+            )
+            for name, state in sorted(states.items())
+        }
+        return cls(project, services, seeded_at)
+
+    def running_containers(self) -> dict[str, str]:
+        """Map the container names of running services to their services."""
+        return {
+            s.container: s.service
+            for s in self.services.values()
+            if s.state == "running" and s.container
+        }
+
+    def apply_event(self, event: dict) -> str | None:
+        """Apply a `docker events` container event.
+
+        Returns:
+            The service whose state or health changed, or None if the
+            event didn't change anything the model tracks.
+        """
+        if event.get("Type", "container") != "container":
+            return None
+        attributes = (event.get("Actor") or {}).get("Attributes") or {}
+        name = attributes.get("com.docker.compose.service")
+        if not name:
+            return None
+        action = event.get("Action") or event.get("status") or ""
+        service = self.services.setdefault(name, ServiceState(service=name))
+        if attributes.get("name"):
+            service.container = attributes["name"]
+        before = (service.state, service.health, service.exit_code)
+
+        if action.startswith("health_status"):
+            service.health = action.partition(":")[2].strip()
+        elif action in _EVENT_STATES:
+            service.state = _EVENT_STATES[action]
+            if action == "die":
+                code = attributes.get("exitCode")
+                service.exit_code = int(code) if code and code.isdigit() else None
+            elif service.state == "running":
+                service.exit_code = None
+                if service.health:
+                    service.health = "starting"
+            if service.state != "running":
+                service.clear_usage()
+
+        if (service.state, service.health, service.exit_code) == before:
+            return None
+        time_nano = event.get("timeNano")
+        service.changed_at = time_nano / 1e9 if time_nano else time.time()
+        return name
+
+    def apply_stats(self, entries: list[dict], sampled_at: float) -> list[str]:
+        """Apply `docker stats` entries.
+
+        Returns:
+            The services that were updated.
+        """
+        by_container = self.running_containers()
+        updated = []
+        for entry in entries:
+            name = by_container.get(entry.get("Name", ""))
+            if name is None:
+                continue
+            service = self.services[name]
+            try:
+                service.cpu_percent = float(entry.get("CPUPerc", "").rstrip("%"))
+            except ValueError:
+                service.cpu_percent = None
+            service.mem_bytes, service.mem_limit = _parse_pair(entry.get("MemUsage"))
+            service.net_rx, service.net_tx = _parse_pair(entry.get("NetIO"))
+            service.sampled_at = sampled_at
+            updated.append(name)
+        return updated
+
+    def to_dict(self) -> dict:
+        """JSON-serializable snapshot of the model."""
+        return {
+            "project": self.project,
+            "services": {name: asdict(s) for name, s in self.services.items()},
+        }
+
+
+def start_events(project: str, since: float | None = None) -> subprocess.Popen:
+    """Start `docker events` for the project's containers, one JSON per line.
+
+    Args:
+        project: Compose project name.
+        since: If set, first replay the events since this Unix time (minus
+            EVENTS_OVERLAP), e.g. the time a snapshot was taken.
+    """
+    cmd = [
+        "docker",
+        "events",
+        "--format",
+        "{{json .}}",
+        "--filter",
+        "type=container",
+        "--filter",
+        f"label=com.docker.compose.project={project}",
+    ]
+    if since is not None:
+        cmd += ["--since", f"{since - EVENTS_OVERLAP:.3f}"]
+    return subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+
+
+def sample_stats(containers: list[str], timeout: float = 30.0) -> list[dict]:
+    """Take one `docker stats` sample of the given containers.
+
+    Returns:
+        One entry per container (with Name, CPUPerc, MemUsage, NetIO, ...),
+        or an empty list if docker could not be run.
+    """
+    if not containers:
+        return []
+    try:
+        result = subprocess.run(
+            ["docker", "stats", "--no-stream", "--format", "{{json .}}", *containers],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return []
+    entries = []
+    for line in result.stdout.splitlines():
+        try:
+            entries.append(json.loads(line))
+        except ValueError:
+            continue
+    return entries
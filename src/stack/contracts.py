@@ -0,0 +1,327 @@
+"""Chat turn event contract from the platform-apis AsyncAPI definitions.
+
+The AsyncAPI documents in the `apis` repo (path from repos.yaml) declare
+one message per SSE event type. Each message payload schema is compiled
+once into a tree of closures, so checking an event as it arrives costs a
+few dict lookups and isinstance checks rather than a schema walk.
+
+jsonschema is not a dependency, so the compiler covers the JSON Schema
+subset AsyncAPI payloads use: type (including `nullable`), properties,
+required, additionalProperties, items, enum, const, numeric and length
+bounds, allOf/anyOf/oneOf, and local `$ref`s. Other keywords (format,
+pattern, ...) are ignored.
+
+Server-reported `metrics` payloads are flattened to dotted numeric fields
+so they can be shown and compared next to client-observed latencies.
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Any, Callable
+
+from stack import sse
+from stack.config import get_repo_graph
+
+CONTRACTS_REPO = "apis"
+
+# Fields of a metrics payload holding the server-side turn duration in
+# milliseconds, in order of preference
+SERVER_TIME_FIELDS = ("total_ms", "duration_ms", "latency_ms", "total_time_ms")
+
+# Directories never searched for documents: VCS data, installed dependencies
+# (which may vendor AsyncAPI files of their own) and build output
+_SKIP_DIRS = {".git", "node_modules", ".venv", "venv", "target", "__pycache__"}
+_ASYNCAPI_KEY = re.compile(r'^(asyncapi\s*:|\{\s*"asyncapi"\s*:)', re.MULTILINE)
+
+_Check = Callable[[Any, str], list[str]]
+
+_TYPES = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "boolean": lambda v: isinstance(v, bool),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "null": lambda v: v is None,
+}
+
+
+class ContractError(Exception):
+    """An AsyncAPI document is missing, malformed or has an unresolvable $ref."""
+
+
+def find_asyncapi_documents(repo_path: Path) -> list[Path]:
+    """Find AsyncAPI documents (YAML or JSON with a top-level `asyncapi` key)."""
+    documents = []
+    for dirpath, dirnames, filenames in os.walk(repo_path):
+        # Pruned in place, so os.walk never descends into them
+        dirnames[:] = [name for name in dirnames if name not in _SKIP_DIRS]
+        for filename in filenames:
+            if not filename.endswith((".yaml", ".yml", ".json")):
+                continue
+            path = Path(dirpath) / filename
+            try:
+                with open(path, encoding="utf-8", errors="replace") as f:
+                    head = f.read(4096)
+            except OSError:
+                continue
+            if _ASYNCAPI_KEY.search(head):
+                documents.append(path)
+    return sorted(documents)
+
+
+def _resolve(root: dict, ref: str) -> Any:
+    if not ref.startswith("#/"):
+        raise ContractError(f"Only local $refs are supported: {ref}")
+    value = root
+    for part in ref[2:].split("/"):
+        part = part.replace("~1", "/").replace("~0", "~")
+        if not isinstance(value, dict) or part not in value:
+            raise ContractError(f"Unresolvable $ref: {ref}")
+        value = value[part]
+    return value
+
+
+def _compile(schema: Any, root: dict, refs: dict[str, _Check | None]) -> _Check:
+    """Compile a schema into a function returning error messages for a value."""
+    if schema is True or schema == {}:
+        return lambda value, path: []
+    if schema is False:
+        return lambda value, path: [f"{path}: not allowed"]
+    if not isinstance(schema, dict):
+        raise ContractError(f"Invalid schema: {schema!r}")
+
+    if "$ref" in schema:
+        ref = schema["$ref"]
+        if ref not in refs:
+            # Placeholder first, so recursive schemas compile
+            refs[ref] = None
+            refs[ref] = _compile(_resolve(root, ref), root, refs)
+        return lambda value, path: refs[ref](value, path)
+
+    checks: list[_Check] = []
+
+    types = schema.get("type")
+    if types is not None:
+        types = [types] if isinstance(types, str) else list(types)
+        if schema.get("nullable"):
+            types.append("null")
+        tests = [_TYPES[t] for t in types if t in _TYPES]
+        expected = " or ".join(types)
+
+        def check_type(value, path):
+            if any(test(value) for test in tests):
+                return []
+            return [f"{path}: expected {expected}, got {type(value).__name__}"]
+
+        checks.append(check_type)
+
+    if "enum" in schema:
+        enum = schema["enum"]
+        checks.append(
+            lambda value, path: [] if value in enum else [f"{path}: not in {enum}"]
+        )
+    if "const" in schema:
+        const = schema["const"]
+        checks.append(
+            lambda value, path: [] if value == const else [f"{path}: != {const!r}"]
+        )
+
+    bounds = [
+        (key, schema[key], test)
+        for key, test in (
+            ("minimum", lambda v, b: v >= b),
+            ("maximum", lambda v, b: v <= b),
+            ("exclusiveMinimum", lambda v, b: v > b),
+            ("exclusiveMaximum", lambda v, b: v < b),
+        )
+        if isinstance(schema.get(key), (int, float))
+    ]
+    if bounds:
+
+        def check_bounds(value, path):
+            if not _TYPES["number"](value):
+                return []
+            return [
+                f"{path}: {value} violates {key} {bound}"
+                for key, bound, test in bounds
+                if not test(value, bound)
+            ]
+
+        checks.append(check_bounds)
+
+    min_length, max_length = schema.get("minLength"), schema.get("maxLength")
+    if min_length is not None or max_length is not None:
+
+        def check_length(value, path):
+            if not isinstance(value, str):
+                return []
+            if min_length is not None and len(value) < min_length:
+                return [f"{path}: shorter than {min_length}"]
+            if max_length is not None and len(value) > max_length:
+                return [f"{path}: longer than {max_length}"]
+            return []
+
+        checks.append(check_length)
+
+    properties = {
+        name: _compile(subschema, root, refs)
+        for name, subschema in (schema.get("properties") or {}).items()
+    }
+    required = schema.get("required") or []
+    additional = schema.get("additionalProperties", True)
+    additional = None if additional is True else _compile(additional, root, refs)
+    if properties or required or additional is not None:
+
+        def check_object(value, path):
+            if not isinstance(value, dict):
+                return []
+            errors = [
+                f"{path}: missing {name!r}" for name in required if name not in value
+            ]
+            for name, item in value.items():
+                check = properties.get(name, additional)
+                if check is not None:
+                    errors.extend(check(item, f"{path}.{name}"))
+            return errors
+
+        checks.append(check_object)
+
+    if isinstance(schema.get("items"), (dict, bool)):
+        check_item = _compile(schema["items"], root, refs)
+
+        def check_items(value, path):
+            if not isinstance(value, list):
+                return []
+            errors = []
+            for index, item in enumerate(value):
+                errors.extend(check_item(item, f"{path}[{index}]"))
+            return errors
+
+        checks.append(check_items)
+
+    for keyword in ("allOf", "anyOf", "oneOf"):
+        if keyword not in schema:
+            continue
+        branches = [_compile(s, root, refs) for s in schema[keyword]]
+        if keyword == "allOf":
+            checks.extend(branches)
+            continue
+
+        def check_branches(value, path, branches=branches, keyword=keyword):
+            matched = sum(not branch(value, path) for branch in branches)
+            if matched == 0 or (keyword == "oneOf" and matched > 1):
+                return [f"{path}: matches {matched} of the {keyword} schemas"]
+            return []
+
+        checks.append(check_branches)
+
+    if len(checks) == 1:
+        return checks[0]
+
+    def check_all(value, path):
+        errors = []
+        for check in checks:
+            errors.extend(check(value, path))
+        return errors
+
+    return check_all
+
+
+class EventContract:
+    """Compiled payload validators for each declared event type.
+
+    Attributes:
+        sources: AsyncAPI documents the messages were loaded from.
+        validators: Normalized event type to compiled payload validator.
+    """
+
+    def __init__(self, sources: list[Path], validators: dict[str, _Check]) -> None:
+        self.sources = sources
+        self.validators = validators
+
+    def validate(self, event: sse.Event) -> list[str]:
+        """Check an event against its message schema.
+
+        Returns:
+            Error messages prefixed with the event type; empty if it conforms.
+        """
+        check = self.validators.get(event.type)
+        if check is None:
+            return [f"{event.type}: event type not declared in the contract"]
+        if event.payload is None and event.data.strip() not in ("null", ""):
+            return [f"{event.type}: data is not JSON"]
+        return [f"{event.type}: {error}" for error in check(event.payload, "$")]
+
+
+def load_contract(documents: list[Path] | None = None) -> EventContract:
+    """Load and compile the chat event payload schemas.
+
+    Messages are read from `components.messages` of every document. The
+    event type of a message is its `name`, or its key if unnamed, in
+    normalized snake_case.
+
+    Args:
+        documents: AsyncAPI documents to load. Defaults to those found in
+            the apis repo.
+
+    Raises:
+        ContractError: If no document is found or one cannot be compiled.
+    """
+    import yaml
+
+    if documents is None:
+        graph = get_repo_graph()
+        if CONTRACTS_REPO not in graph:
+            raise ContractError(f"No {CONTRACTS_REPO!r} repo in repos.yaml")
+        repo_path = graph[CONTRACTS_REPO].path
+        if not repo_path.exists():
+            raise ContractError(f"{repo_path} not found; run 'stack clone'")
+        documents = find_asyncapi_documents(repo_path)
+        if not documents:
+            raise ContractError(f"No AsyncAPI documents found in {repo_path}")
+
+    validators: dict[str, _Check] = {}
+    for path in documents:
+        try:
+            root = yaml.safe_load(path.read_text())
+        except (OSError, yaml.YAMLError) as e:
+            raise ContractError(f"{path.name}: {e}") from e
+        messages = ((root or {}).get("components") or {}).get("messages") or {}
+        refs: dict[str, _Check | None] = {}
+        for key, message in messages.items():
+            if "$ref" in message:
+                message = _resolve(root, message["$ref"])
+            event_type = sse.normalize_type(message.get("name") or key)
+            validators[event_type] = _compile(message.get("payload", {}), root, refs)
+
+    if not validators:
+        raise ContractError("The AsyncAPI documents declare no messages")
+    return EventContract(documents, validators)
+
+
+def _flatten(value: Any, prefix: str, out: dict[str, float]) -> None:
+    if isinstance(value, dict):
+        for key, item in value.items():
+            _flatten(item, f"{prefix}.{key}" if prefix else key, out)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        out[prefix] = value
+
+
+def turn_metrics(events: list[sse.Event]) -> dict[str, float]:
+    """Merge the numeric fields of a turn's metrics events, keyed by dotted path."""
+    metrics: dict[str, float] = {}
+    for event in events:
+        if event.type == sse.METRICS:
+            _flatten(event.payload, "", metrics)
+    return metrics
+
+
+def server_time(metrics: dict[str, float]) -> float | None:
+    """Server-reported turn duration in seconds, if the metrics include one."""
+    for field in SERVER_TIME_FIELDS:
+        for key, value in metrics.items():
+            if key == field or key.endswith(f".{field}"):
+                return value / 1000
+    return None
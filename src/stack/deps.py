@@ -0,0 +1,96 @@
+"""Lockfile-gated dependency installs.
+
+An install is skipped when the hash of a repo's lockfiles, its toolchain
+versions and the installed environment's marker file all match what was
+recorded after the last successful install. Unlike the validation result
+cache, only the most recent install per repo is remembered, since the
+environment on disk reflects the last install rather than any earlier one.
+"""
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+
+from stack.cache import tool_version
+from stack.config import get_workspace_root
+
+_state_lock = threading.Lock()
+
+
+def get_state_path() -> Path:
+    """Get the path of the recorded install state."""
+    return get_workspace_root() / "state" / "cache" / "deps.json"
+
+
+def install_fingerprint(
+    repo_path: Path, inputs: list[str], tools: list[str], marker: str | None
+) -> str | None:
+    """Hash everything an install depends on.
+
+    Args:
+        repo_path: Repository root.
+        inputs: Lockfiles and manifests, relative to repo_path.
+        tools: Tools whose versions affect the install.
+        marker: File written by the install (e.g. `.venv/pyvenv.cfg`); its
+            absence means the environment is gone and must be reinstalled.
+
+    Returns:
+        Hex digest, or None if the marker file is missing.
+    """
+    digest = hashlib.sha256()
+    for name in [*inputs, *([marker] if marker else [])]:
+        path = repo_path / name
+        try:
+            content = path.read_bytes()
+        except OSError:
+            if name == marker:
+                return None
+            content = b""
+        digest.update(name.encode() + b"\0" + content + b"\0")
+    for tool in sorted(tools):
+        digest.update(f"{tool}\0{tool_version(tool)}\0".encode())
+    return digest.hexdigest()
+
+
+def _load_state() -> dict:
+    try:
+        return json.loads(get_state_path().read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def is_current(repo_path: Path, fingerprint: str | None) -> bool:
+    """Check whether the last successful install in repo_path matches fingerprint."""
+    if fingerprint is None:
+        return False
+    with _state_lock:
+        return _load_state().get(str(repo_path)) == fingerprint
+
+
+def record_install(repo_path: Path, fingerprint: str | None) -> None:
+    """Record a successful install. Write failures are ignored."""
+    if fingerprint is None:
+        return
+    path = get_state_path()
+    with _state_lock:
+        state = _load_state()
+        state[str(repo_path)] = fingerprint
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(state, indent=2, sort_keys=True))
+        except OSError:
+            pass
+
+
+def forget_install(repo_path: Path) -> None:
+    """Drop the recorded install for repo_path, e.g. after a failed install."""
+    path = get_state_path()
+    with _state_lock:
+        state = _load_state()
+        if state.pop(str(repo_path), None) is None:
+            return
+        try:
+            path.write_text(json.dumps(state, indent=2, sort_keys=True))
+        except OSError:
+            pass
@@ -0,0 +1,190 @@
+"""Test impact analysis for uv repositories.
+
+Full validation runs record which source files each test covers (via
+pytest-cov's per-test coverage contexts). Quick runs then select only the
+tests whose covered files intersect the files changed since the map was
+recorded, falling back to the full suite whenever the map can't be trusted,
+including when a changed file (a new module, data file or template) isn't
+in the map at all.
+"""
+
+import json
+import sqlite3
+import subprocess
+from pathlib import Path, PurePosixPath
+
+from stack.config import get_workspace_root
+
+# Bump when the map format changes so older maps are treated as stale
+IMPACT_VERSION = 1
+
+# Changes to these files can affect any test, so they force the full suite
+CONFIG_FILES = {
+    "pyproject.toml",
+    "uv.lock",
+    ".python-version",
+    "conftest.py",
+    "pytest.ini",
+    "setup.cfg",
+    "tox.ini",
+    ".coveragerc",
+}
+
+# Above this many selected tests, select whole files to keep the command short
+MAX_NODE_IDS = 500
+
+
+def get_map_path(repo_key: str) -> Path:
+    """Get the path of the recorded coverage map for a repo."""
+    impact_dir = get_workspace_root() / "state" / "cache" / "impact"
+    return impact_dir / f"{repo_key}.json"
+
+
+def record_command(cmd: list[str]) -> list[str]:
+    """Turn a `uv run pytest` command into one recording per-test coverage."""
+    if cmd[:2] == ["uv", "run"]:
+        cmd = [*cmd[:2], "--with", "pytest-cov", *cmd[2:]]
+    return [*cmd, "--cov=.", "--cov-context=test", "--cov-report="]
+
+
+def read_coverage(data_file: Path, repo_path: Path) -> dict[str, list[str]]:
+    """Read a coverage database into a map of test node id to covered files.
+
+    Returns:
+        Mapping of node id to repo-relative file paths, or an empty mapping
+        if the database can't be read.
+    """
+    query = """
+        SELECT DISTINCT context.context, file.path
+        FROM {table}
+        JOIN context ON context.id = {table}.context_id
+        JOIN file ON file.id = {table}.file_id
+    """
+    tests: dict[str, set[str]] = {}
+    try:
+        with sqlite3.connect(f"file:{data_file}?mode=ro", uri=True) as conn:
+            # Line coverage is stored in line_bits, branch coverage in arc
+            rows = []
+            for table in ("line_bits", "arc"):
+                rows.extend(conn.execute(query.format(table=table)).fetchall())
+    except sqlite3.Error:
+        return {}
+
+    root = repo_path.resolve()
+    for context, path in rows:
+        # Contexts look like "tests/test_x.py::test_a|run"; "" is import time
+        node_id = context.rsplit("|", 1)[0]
+        if not node_id:
+            continue
+        try:
+            relative = Path(path).resolve().relative_to(root).as_posix()
+        except ValueError:
+            continue
+        tests.setdefault(node_id, set()).add(relative)
+
+    return {node_id: sorted(files) for node_id, files in tests.items()}
+
+
+def _git(repo_path: Path, *args: str) -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", *args],
+            cwd=repo_path,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+    return result.stdout
+
+
+def save_map(repo_key: str, repo_path: Path, tests: dict[str, list[str]]) -> None:
+    """Store a coverage map along with the commit it was recorded at."""
+    commit = _git(repo_path, "rev-parse", "HEAD")
+    if commit is None or not tests:
+        return
+
+    path = get_map_path(repo_key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps(
+                {"version": IMPACT_VERSION, "commit": commit.strip(), "tests": tests}
+            )
+        )
+    except OSError:
+        pass
+
+
+def _is_test_file(path: str) -> bool:
+    name = PurePosixPath(path).name
+    return name.endswith(".py") and (
+        name.startswith("test_") or name.endswith("_test.py")
+    )
+
+
+def select_tests(repo_key: str, repo_path: Path) -> tuple[list[str] | None, str]:
+    """Select the tests impacted by changes since the coverage map was recorded.
+
+    Returns:
+        Tuple of (selection, reason). Selection is a list of pytest node ids
+        or test files, or None when the full suite must run. It is only
+        empty when every changed file is in the coverage map and no test
+        covers any of them.
+    """
+    try:
+        recorded = json.loads(get_map_path(repo_key).read_text())
+    except (OSError, ValueError):
+        return None, "no coverage map recorded"
+
+    if recorded.get("version") != IMPACT_VERSION:
+        return None, "coverage map format is outdated"
+
+    commit = recorded.get("commit", "")
+    if _git(repo_path, "merge-base", "--is-ancestor", commit, "HEAD") is None:
+        return None, "coverage map was recorded on another branch"
+
+    diff = _git(repo_path, "diff", "--name-only", commit)
+    untracked = _git(repo_path, "ls-files", "--others", "--exclude-standard")
+    if diff is None or untracked is None:
+        return None, "could not diff against the coverage map"
+    changed = set((diff + untracked).splitlines())
+
+    config_changes = sorted(
+        p for p in changed if PurePosixPath(p).name in CONFIG_FILES
+    )
+    if config_changes:
+        return None, f"config changed: {', '.join(config_changes)}"
+
+    tests = recorded.get("tests", {})
+    known_files = {node_id.split("::", 1)[0] for node_id in tests}
+
+    # Coverage can't tell which tests read a file it never saw executed
+    covered = known_files.union(*tests.values())
+    unmapped = sorted(p for p in changed if p not in covered and not _is_test_file(p))
+    if unmapped:
+        shown = ", ".join(unmapped[:3]) + (", ..." if len(unmapped) > 3 else "")
+        return None, f"not in the coverage map: {shown}"
+
+    # Changed test files run whole, so tests added to them since the map was
+    # recorded are included; deleted ones are dropped
+    changed_test_files = sorted(
+        p
+        for p in changed
+        if (_is_test_file(p) or p in known_files) and (repo_path / p).exists()
+    )
+    selected = []
+    for node_id, files in tests.items():
+        test_file = node_id.split("::", 1)[0]
+        if test_file in changed or not (repo_path / test_file).exists():
+            continue
+        if changed.intersection(files):
+            selected.append(node_id)
+
+    if len(selected) > MAX_NODE_IDS:
+        selected = sorted({node_id.split("::", 1)[0] for node_id in selected})
+    selection = changed_test_files + selected
+    return selection, (
+        f"{len(selection)} impacted test(s)/file(s) for {len(changed)} changed file(s)"
+    )
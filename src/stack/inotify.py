@@ -0,0 +1,144 @@
+"""Minimal recursive inotify watcher (Linux only), built on ctypes."""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_ONLYDIR
+)
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class Overflow(Exception):
+    """The kernel event queue overflowed; some changes were lost."""
+
+
+class Inotify:
+    """Recursive directory watcher yielding changed file paths.
+
+    Directories are watched individually; `skip_dir` decides which ones are
+    left out (e.g. `.git` or gitignored build output). Directories created
+    after the initial walk are watched as they appear.
+    """
+
+    def __init__(self, skip_dir=None) -> None:
+        if not sys.platform.startswith("linux"):
+            raise RuntimeError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._skip_dir = skip_dir or (lambda path: False)
+        self._dirs: dict[int, Path] = {}
+
+    def __enter__(self) -> "Inotify":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def add_tree(self, root: Path) -> None:
+        """Watch root and every directory below it that is not skipped."""
+        for dirpath, dirnames, _ in os.walk(root):
+            path = Path(dirpath)
+            self._add_watch(path)
+            dirnames[:] = [d for d in dirnames if not self._skip_dir(path / d)]
+
+    def _add_watch(self, path: Path) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            # Directories can vanish between the walk and the watch
+            if err in (errno.ENOENT, errno.ENOTDIR):
+                return
+            raise OSError(err, f"inotify_add_watch failed for {path}")
+        self._dirs[wd] = path
+
+    def _read(self, timeout: float | None) -> list[Path]:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        changed = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                raise Overflow()
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            parent = self._dirs.get(wd)
+            if parent is None or not name:
+                continue
+
+            path = parent / os.fsdecode(name)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                if self._skip_dir(path):
+                    continue
+                self.add_tree(path)
+            changed.append(path)
+        return changed
+
+    def wait(self, debounce: float, max_delay: float = 2.0) -> set[Path]:
+        """Block until files change, then collect changes until a quiet period.
+
+        Args:
+            debounce: Seconds without new events that end a burst.
+            max_delay: Upper bound on how long a continuous burst is collected.
+
+        Raises:
+            Overflow: If the kernel dropped events.
+        """
+        changed = set(self._read(None))
+        while not changed:
+            changed.update(self._read(None))
+
+        deadline = time.monotonic() + max_delay
+        while (remaining := deadline - time.monotonic()) > 0:
+            batch = self._read(min(debounce, remaining))
+            if not batch:
+                break
+            changed.update(batch)
+        return changed
@@ -0,0 +1,386 @@
+"""Local archive of captured service logs.
+
+Captured records are written to immutable gzip segments, partitioned by
+UTC hour, each partition with a small inverted index:
+
+    state/logs/
+        watermarks.json                 last captured timestamp per service
+        20261017T10/
+            index.json                  segment metadata and postings
+            platform-api-<ns>.jsonl.gz  one {"ts", "line"} object per line
+
+The index maps `request_id:<id>`, `trace_id:<id>` and `level:<level>`
+terms to the line numbers holding them in each segment. A search only
+opens the partitions in its time range, and only the segments with a
+posting for its terms. Retention deletes the oldest segments once the
+archive outgrows its size limit.
+
+A service's watermark only advances once all of its buffered records are
+on disk, so an interrupted capture is repeated rather than lost. Captures
+resume at the watermark itself, and the lines already captured at that
+exact timestamp are skipped, so distinct lines sharing it are all kept.
+"""
+
+import gzip
+import json
+import math
+import os
+import re
+import shutil
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from stack.config import get_workspace_root
+from stack.logstream import LEVELS, LogRecord, parse_line
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Records buffered per service before a segment is written
+SEGMENT_RECORDS = 5000
+
+_PARTITION_FORMAT = "%Y%m%dT%H"
+_DURATION = re.compile(r"^(\d+(?:\.\d+)?)([smhd])$")
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def get_archive_dir() -> Path:
+    """Get the directory holding captured logs."""
+    return get_workspace_root() / "state" / "logs"
+
+
+def parse_time(text: str, now: float | None = None) -> float:
+    """Parse a relative duration (30s, 5m, 2h, 1d) or an ISO timestamp.
+
+    Durations count back from now. Timestamps without a zone are UTC.
+
+    Raises:
+        ValueError: If text is neither.
+    """
+    match = _DURATION.match(text.strip())
+    if match:
+        seconds = float(match.group(1)) * _DURATION_UNITS[match.group(2)]
+        return (time.time() if now is None else now) - seconds
+    moment = datetime.fromisoformat(text.strip().replace("Z", "+00:00"))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def _partition_name(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime(_PARTITION_FORMAT)
+
+
+def _partition_start(name: str) -> float:
+    moment = datetime.strptime(name, _PARTITION_FORMAT)
+    return moment.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _terms(record: LogRecord) -> list[str]:
+    terms = []
+    if record.request_id:
+        terms.append(f"request_id:{record.request_id}")
+    if record.trace_id:
+        terms.append(f"trace_id:{record.trace_id}")
+    if record.level:
+        terms.append(f"level:{record.level}")
+    return terms
+
+
+def _load_json(path: Path, default):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return default
+
+
+def _write_json(path: Path, data) -> None:
+    """Write JSON atomically, so a concurrent search never sees a partial file."""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(data, separators=(",", ":")))
+    os.replace(tmp_path, path)
+
+
+def _empty_index() -> dict:
+    return {"segments": {}, "terms": {}}
+
+
+class ArchiveWriter:
+    """Buffer records and write them out as indexed segments.
+
+    Records before a service's watermark (the last captured timestamp), and
+    records at it whose line was already captured, are skipped, so
+    capturing the same logs twice is harmless.
+
+    Attributes:
+        root: Archive directory.
+        watermarks: Last captured timestamp per service.
+        written: Number of records written so far.
+    """
+
+    def __init__(self, root: Path | None = None) -> None:
+        self.root = root or get_archive_dir()
+        self.watermarks: dict[str, float] = {}
+        # Lines captured at the watermark, or None if unknown (all of them)
+        self._seen: dict[str, set[str] | None] = {}
+        saved = _load_json(self.root / "watermarks.json", {})
+        for service, mark in saved.items():
+            if isinstance(mark, dict):
+                self.watermarks[service] = mark["ts"]
+                self._seen[service] = set(mark["lines"])
+            else:
+                self.watermarks[service] = mark
+                self._seen[service] = None
+        self.written = 0
+        self._buffers: dict[tuple[str, str], list[LogRecord]] = {}
+        # Latest buffered timestamp per service and the lines at it
+        self._latest: dict[str, tuple[float, set[str]]] = {}
+
+    def _captured(self, record: LogRecord) -> bool:
+        mark = self.watermarks.get(record.service, float("-inf"))
+        if record.timestamp != mark:
+            return record.timestamp < mark
+        seen = self._seen.get(record.service)
+        return seen is None or record.line in seen
+
+    def add(self, record: LogRecord) -> None:
+        """Buffer a record, writing a segment once the buffer is full."""
+        if record.timestamp is None or self._captured(record):
+            return
+        latest = self._latest.get(record.service)
+        if latest is None or record.timestamp > latest[0]:
+            self._latest[record.service] = (record.timestamp, {record.line})
+        elif record.timestamp == latest[0]:
+            latest[1].add(record.line)
+
+        key = (_partition_name(record.timestamp), record.service)
+        buffer = self._buffers.setdefault(key, [])
+        buffer.append(record)
+        if len(buffer) >= SEGMENT_RECORDS:
+            self._write_segment(*key, self._buffers.pop(key))
+
+    def flush(self) -> None:
+        """Write every buffered record, then advance the watermarks."""
+        for key, records in self._buffers.items():
+            self._write_segment(*key, records)
+        self._buffers = {}
+
+        for service, (timestamp, lines) in self._latest.items():
+            mark = self.watermarks.get(service, float("-inf"))
+            if timestamp > mark:
+                self.watermarks[service] = timestamp
+                self._seen[service] = lines
+            elif timestamp == mark and self._seen.get(service) is not None:
+                self._seen[service] |= lines
+        self._latest = {}
+        self._save_watermarks()
+
+    def _write_segment(
+        self, partition: str, service: str, records: list[LogRecord]
+    ) -> None:
+        partition_dir = self.root / partition
+        partition_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"{service}-{int(records[0].timestamp * 1e9)}"
+        name = f"{stem}.jsonl.gz"
+        # A later capture can start at the same timestamp as an earlier one
+        suffix = 1
+        while (partition_dir / name).exists():
+            name = f"{stem}-{suffix}.jsonl.gz"
+            suffix += 1
+        payload = "".join(
+            json.dumps({"ts": r.timestamp, "line": r.line}) + "\n" for r in records
+        )
+        tmp_path = partition_dir / f".{name}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp_path, partition_dir / name)
+
+        index_path = partition_dir / "index.json"
+        index = _load_json(index_path, _empty_index())
+        index["segments"][name] = {
+            "service": service,
+            "start": records[0].timestamp,
+            "end": max(r.timestamp for r in records),
+            "count": len(records),
+            "bytes": (partition_dir / name).stat().st_size,
+        }
+        for line_number, record in enumerate(records):
+            for term in _terms(record):
+                postings = index["terms"].setdefault(term, {})
+                postings.setdefault(name, []).append(line_number)
+        _write_json(index_path, index)
+        self.written += len(records)
+
+    def _save_watermarks(self) -> None:
+        if not self.watermarks:
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        _write_json(
+            self.root / "watermarks.json",
+            {
+                service: {"ts": mark, "lines": sorted(self._seen.get(service) or ())}
+                for service, mark in self.watermarks.items()
+            },
+        )
+
+
+def _partitions(root: Path, since: float | None, until: float | None) -> list[Path]:
+    """Partition directories overlapping [since, until], oldest first."""
+    partitions = []
+    if not root.is_dir():
+        return partitions
+    for path in sorted(root.iterdir()):
+        try:
+            start = _partition_start(path.name)
+        except ValueError:
+            continue
+        if since is not None and start + 3600 <= since:
+            continue
+        if until is not None and start > until:
+            continue
+        partitions.append(path)
+    return partitions
+
+
+def search(
+    root: Path | None = None,
+    request_id: str | None = None,
+    min_level: str | None = None,
+    services: list[str] | None = None,
+    since: float | None = None,
+    until: float | None = None,
+) -> list[LogRecord]:
+    """Find archived records, in timestamp order.
+
+    Args:
+        root: Archive directory. Defaults to get_archive_dir().
+        request_id: Only records whose request or trace id equals this.
+        min_level: Only records at or above this level (one of LEVELS).
+        services: Only records of these compose services.
+        since: Only records at or after this Unix timestamp.
+        until: Only records at or before this Unix timestamp.
+    """
+    root = root or get_archive_dir()
+    wanted_levels = LEVELS[LEVELS.index(min_level) :] if min_level else None
+    results = []
+
+    for partition in _partitions(root, since, until):
+        index = _load_json(partition / "index.json", _empty_index())
+        terms = index["terms"]
+
+        def lines_for(term_names: list[str]) -> dict[str, set[int]]:
+            found: dict[str, set[int]] = {}
+            for term in term_names:
+                for segment, lines in terms.get(term, {}).items():
+                    found.setdefault(segment, set()).update(lines)
+            return found
+
+        selections = []
+        if request_id is not None:
+            selections.append(
+                lines_for([f"request_id:{request_id}", f"trace_id:{request_id}"])
+            )
+        if wanted_levels is not None:
+            selections.append(lines_for([f"level:{level}" for level in wanted_levels]))
+
+        for segment, meta in index["segments"].items():
+            if services and meta["service"] not in services:
+                continue
+            if since is not None and meta["end"] < since:
+                continue
+            if until is not None and meta["start"] > until:
+                continue
+            wanted = None
+            for selection in selections:
+                lines = selection.get(segment, set())
+                wanted = lines if wanted is None else wanted & lines
+            if wanted is not None and not wanted:
+                continue
+
+            try:
+                with gzip.open(partition / segment, "rt", encoding="utf-8") as f:
+                    entries = f.read().splitlines()
+            except OSError:
+                continue
+            numbers = sorted(wanted) if wanted is not None else range(len(entries))
+            for number in numbers:
+                if number >= len(entries):
+                    continue
+                entry = json.loads(entries[number])
+                if since is not None and entry["ts"] < since:
+                    continue
+                if until is not None and entry["ts"] > until:
+                    continue
+                record = parse_line(meta["service"], entry["line"])
+                record.timestamp = entry["ts"]
+                results.append(record)
+
+    results.sort(key=lambda record: record.timestamp)
+    return results
+
+
+def archive_size(root: Path | None = None) -> int:
+    """Total size in bytes of the archived segments."""
+    root = root or get_archive_dir()
+    return sum(
+        meta["bytes"]
+        for partition in _partitions(root, None, None)
+        for meta in _load_json(partition / "index.json", _empty_index())[
+            "segments"
+        ].values()
+    )
+
+
+def enforce_retention(
+    root: Path | None = None, max_bytes: int = DEFAULT_MAX_BYTES
+) -> int:
+    """Delete the oldest segments until the archive fits in max_bytes.
+
+    Returns:
+        Number of segments deleted.
+    """
+    root = root or get_archive_dir()
+    segments = []
+    indexes = {}
+    for partition in _partitions(root, None, None):
+        index = _load_json(partition / "index.json", _empty_index())
+        indexes[partition] = index
+        for name, meta in index["segments"].items():
+            segments.append((meta["start"], partition, name, meta["bytes"]))
+    total = sum(size for *_, size in segments)
+    if total <= max_bytes:
+        return 0
+
+    removed = 0
+    changed = set()
+    for _, partition, name, size in sorted(segments):
+        if total <= max_bytes:
+            break
+        (partition / name).unlink(missing_ok=True)
+        index = indexes[partition]
+        del index["segments"][name]
+        for term in list(index["terms"]):
+            index["terms"][term].pop(name, None)
+            if not index["terms"][term]:
+                del index["terms"][term]
+        changed.add(partition)
+        total -= size
+        removed += 1
+
+    for partition in changed:
+        if indexes[partition]["segments"]:
+            _write_json(partition / "index.json", indexes[partition])
+        else:
+            shutil.rmtree(partition, ignore_errors=True)
+    return removed
+
+
+def format_since(timestamp: float) -> str:
+    """Format a timestamp for `docker compose logs --since`.
+
+    Rounds down to the microsecond, so a resumed capture includes the lines
+    at the timestamp itself.
+    """
+    epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    moment = epoch + timedelta(microseconds=math.floor(timestamp * 1e6))
+    return moment.isoformat(timespec="microseconds").replace("+00:00", "Z")
@@ -0,0 +1,347 @@
+"""Multiplexed, structured log streaming for compose services.
+
+Each service's logs are read from its own `docker compose logs --timestamps`
+process over an asyncio pipe and parsed line by line. Lines that are JSON
+objects (structlog, tracing-subscriber and similar formatters) have their
+level, message and correlation ids extracted, searching nested objects
+such as `fields` and `span`; other lines fall back to pattern matching.
+
+Records from all services are interleaved by their docker timestamp. A
+record is emitted once every still-open stream has produced a later one,
+which merges exactly when replaying history; while following, a record
+is also emitted after waiting REORDER_WINDOW seconds, so an idle service
+can't hold the others back.
+"""
+
+import asyncio
+import heapq
+import json
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable
+
+from stack.config import COMPOSE_FILE
+
+LEVELS = ("trace", "debug", "info", "warn", "error", "fatal")
+
+# Seconds a followed record may wait for slower streams before it is emitted
+REORDER_WINDOW = 0.5
+
+_LEVEL_ALIASES = {
+    "warning": "warn",
+    "err": "error",
+    "critical": "fatal",
+    "crit": "fatal",
+    "panic": "fatal",
+}
+_LEVEL_KEYS = ("level", "severity", "levelname", "lvl", "log.level")
+_MESSAGE_KEYS = ("message", "msg", "event")
+_REQUEST_ID_KEYS = ("request_id", "requestId", "x_request_id", "req_id")
+_TRACE_ID_KEYS = ("trace_id", "traceId", "otelTraceID", "trace.id")
+# Nested objects that formatters put fields and span context into
+_NESTED_KEYS = ("fields", "span", "spans", "extra", "context", "attributes")
+
+_DOCKER_TIMESTAMP = re.compile(
+    r"^(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)(\.\d+)?(Z|[+-]\d\d:\d\d)? "
+)
+_TEXT_LEVEL = re.compile(
+    r"\b(TRACE|DEBUG|INFO|WARN(?:ING)?|ERROR|FATAL|CRITICAL)\b", re.IGNORECASE
+)
+_TEXT_REQUEST_ID = re.compile(r"request[_-]?id[\"']?\s*[=:]\s*[\"']?([\w.-]+)", re.I)
+_TEXT_TRACE_ID = re.compile(r"trace[_-]?id[\"']?\s*[=:]\s*[\"']?([0-9a-fA-F-]+)", re.I)
+
+
+@dataclass(slots=True)
+class LogRecord:
+    """One parsed log line.
+
+    Attributes:
+        service: Compose service that wrote the line.
+        timestamp: Docker receive time as a Unix timestamp, or None.
+        level: Normalized level (one of LEVELS), or "" if unknown.
+        message: Log message, or the whole line if it isn't structured.
+        request_id: Request correlation id, if present.
+        trace_id: Trace id, if present.
+        fields: The parsed JSON object for structured lines, else empty.
+        line: The original line without the docker timestamp.
+    """
+
+    service: str
+    timestamp: float | None
+    level: str
+    message: str
+    request_id: str | None = None
+    trace_id: str | None = None
+    fields: dict = field(default_factory=dict)
+    line: str = ""
+
+
+def normalize_level(level: Any) -> str:
+    """Map a level name (WARNING, Err, ...) to one of LEVELS, or ""."""
+    if not isinstance(level, str):
+        return ""
+    level = level.strip().lower()
+    level = _LEVEL_ALIASES.get(level, level)
+    return level if level in LEVELS else ""
+
+
+def parse_timestamp(text: str) -> float | None:
+    """Parse an RFC 3339 timestamp with up to nanosecond precision."""
+    match = _DOCKER_TIMESTAMP.match(text + " ")
+    if not match:
+        return None
+    base, fraction, zone = match.groups()
+    zone = "+00:00" if zone in (None, "Z") else zone
+    try:
+        seconds = datetime.fromisoformat(base + zone).timestamp()
+    except ValueError:
+        return None
+    return seconds + (float(fraction) if fraction else 0.0)
+
+
+def _find(obj: dict, keys: tuple[str, ...], depth: int = 2) -> Any:
+    """Find the first of keys in obj or its nested context objects."""
+    for key in keys:
+        value = obj.get(key)
+        if value not in (None, ""):
+            return value
+    if depth == 0:
+        return None
+    for nested_key in _NESTED_KEYS:
+        nested = obj.get(nested_key)
+        for item in nested if isinstance(nested, list) else [nested]:
+            if isinstance(item, dict):
+                value = _find(item, keys, depth - 1)
+                if value is not None:
+                    return value
+    return None
+
+
+def parse_line(service: str, line: str) -> LogRecord:
+    """Parse a `docker compose logs --timestamps --no-log-prefix` line."""
+    line = line.rstrip("\r\n")
+    timestamp = None
+    match = _DOCKER_TIMESTAMP.match(line)
+    if match:
+        timestamp = parse_timestamp(line[: match.end() - 1])
+        line = line[match.end() :]
+
+    fields: dict = {}
+    if line.startswith("{"):
+        try:
+            parsed = json.loads(line)
+        except ValueError:
+            parsed = None
+        if isinstance(parsed, dict):
+            fields = parsed
+
+    if fields:
+        message = _find(fields, _MESSAGE_KEYS)
+        request_id = _find(fields, _REQUEST_ID_KEYS)
+        trace_id = _find(fields, _TRACE_ID_KEYS)
+        return LogRecord(
+            service=service,
+            timestamp=timestamp,
+            level=normalize_level(_find(fields, _LEVEL_KEYS, depth=0)),
+            message=str(message) if message is not None else line,
+            request_id=str(request_id) if request_id is not None else None,
+            trace_id=str(trace_id) if trace_id is not None else None,
+            fields=fields,
+            line=line,
+        )
+
+    level = _TEXT_LEVEL.search(line)
+    request_id = _TEXT_REQUEST_ID.search(line)
+    trace_id = _TEXT_TRACE_ID.search(line)
+    return LogRecord(
+        service=service,
+        timestamp=timestamp,
+        level=normalize_level(level.group(1)) if level else "",
+        message=line,
+        request_id=request_id.group(1) if request_id else None,
+        trace_id=trace_id.group(1) if trace_id else None,
+        line=line,
+    )
+
+
+def matches(
+    record: LogRecord, request_id: str | None = None, min_level: str | None = None
+) -> bool:
+    """Check a record against the correlation id and minimum level filters.
+
+    The correlation id matches the record's request or trace id. Records
+    without a known level pass the level filter only when it is unset.
+    """
+    if request_id is not None and request_id not in (
+        record.request_id,
+        record.trace_id,
+    ):
+        return False
+    if min_level is not None:
+        if record.level not in LEVELS:
+            return False
+        if LEVELS.index(record.level) < LEVELS.index(min_level):
+            return False
+    return True
+
+
+class Interleaver:
+    """Merge per-service record streams in timestamp order.
+
+    Args:
+        services: Names of the streams to merge.
+        window: If set, emit a record after it has waited this many seconds
+            even if some stream hasn't caught up with it.
+    """
+
+    def __init__(self, services: list[str], window: float | None = None) -> None:
+        self._open = set(services)
+        self._latest: dict[str, float] = {}
+        self._heap: list[tuple[float, int, float, LogRecord]] = []
+        self._seq = 0
+        self._window = window
+
+    def push(self, record: LogRecord, arrived: float) -> None:
+        timestamp = record.timestamp if record.timestamp is not None else time.time()
+        self._latest[record.service] = timestamp
+        heapq.heappush(self._heap, (timestamp, self._seq, arrived, record))
+        self._seq += 1
+
+    def push_watermark(self, service: str, timestamp: float | None) -> None:
+        """Record that a stream has reached timestamp without adding a record."""
+        if timestamp is not None:
+            self._latest[service] = timestamp
+
+    def close(self, service: str) -> None:
+        self._open.discard(service)
+
+    def pop_ready(self, now: float) -> list[LogRecord]:
+        """Pop the records that can be emitted without breaking the order."""
+        ready = []
+        while self._heap:
+            timestamp, _, arrived, record = self._heap[0]
+            caught_up = all(
+                self._latest.get(service, float("-inf")) >= timestamp
+                for service in self._open
+            )
+            waited = self._window is not None and now - arrived >= self._window
+            if not (caught_up or waited):
+                break
+            heapq.heappop(self._heap)
+            ready.append(record)
+        return ready
+
+
+async def _read_service(
+    stack_path: Path,
+    service: str,
+    since: str | None,
+    until: str | None,
+    follow: bool,
+    records: asyncio.Queue,
+) -> None:
+    """Parse one service's logs onto the queue, then put (service, None)."""
+    cmd = [
+        "docker",
+        "compose",
+        "-f",
+        COMPOSE_FILE,
+        "logs",
+        "--no-color",
+        "--no-log-prefix",
+        "--timestamps",
+    ]
+    if since:
+        cmd += ["--since", since]
+    if until:
+        cmd += ["--until", until]
+    if follow:
+        cmd.append("--follow")
+    cmd.append(service)
+
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=stack_path,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+    except OSError:
+        await records.put((service, None))
+        return
+    try:
+        while line := await process.stdout.readline():
+            text = line.decode("utf-8", errors="replace")
+            await records.put((service, parse_line(service, text)))
+        await process.wait()
+    finally:
+        if process.returncode is None:
+            process.terminate()
+            await process.wait()
+        await records.put((service, None))
+
+
+async def stream_logs(
+    stack_path: Path,
+    services: list[str],
+    since: str | None = None,
+    follow: bool = False,
+    request_id: str | None = None,
+    min_level: str | None = None,
+    until: str | None = None,
+    resume: dict[str, str] | None = None,
+    sink: Callable[[LogRecord], None] | None = None,
+) -> AsyncIterator[LogRecord]:
+    """Stream the matching log records of several services, interleaved.
+
+    Args:
+        stack_path: platform-stack checkout holding the compose file.
+        services: Compose service names.
+        since: Only logs newer than this (docker syntax: 5m, 2h, a timestamp).
+        follow: Keep streaming new lines until cancelled.
+        request_id: Only records whose request or trace id equals this.
+        min_level: Only records at or above this level (one of LEVELS).
+        until: Only logs older than this (same syntax as since).
+        resume: Per-service `since` values overriding since.
+        sink: Called with every parsed record, before filtering.
+    """
+    records: asyncio.Queue = asyncio.Queue()
+    interleaver = Interleaver(services, window=REORDER_WINDOW if follow else None)
+    resume = resume or {}
+    readers = [
+        asyncio.create_task(
+            _read_service(
+                stack_path, s, resume.get(s, since), until, follow, records
+            )
+        )
+        for s in services
+    ]
+    remaining = len(services)
+    try:
+        while remaining:
+            try:
+                service, record = await asyncio.wait_for(
+                    records.get(), timeout=REORDER_WINDOW if follow else None
+                )
+            except TimeoutError:
+                service = record = None
+            else:
+                if record is not None and sink is not None:
+                    sink(record)
+                if record is None:
+                    remaining -= 1
+                    interleaver.close(service)
+                elif matches(record, request_id, min_level):
+                    interleaver.push(record, time.monotonic())
+                else:
+                    # A filtered record still shows how far its stream got
+                    interleaver.push_watermark(service, record.timestamp)
+            for ready in interleaver.pop_ready(time.monotonic()):
+                yield ready
+    finally:
+        for reader in readers:
+            reader.cancel()
+        await asyncio.gather(*readers, return_exceptions=True)
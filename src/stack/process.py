@@ -0,0 +1,196 @@
+"""Subprocess helpers for running validation steps in their own process groups."""
+
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+# Seconds a cancelled process group gets to exit after SIGTERM before SIGKILL
+TERMINATE_GRACE = 5.0
+
+
+@dataclass
+class StepRun:
+    """Outcome of a single step subprocess."""
+
+    returncode: int | None
+    stdout: str = ""
+    stderr: str = ""
+    timed_out: bool = False
+    cancelled: bool = False
+    wall_time: float = 0.0
+    cpu_time: float | None = None
+    max_rss_kb: int | None = None
+
+
+class Cancellation:
+    """Shared cancellation flag that also terminates registered process groups."""
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._procs: set[subprocess.Popen] = set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        """Set the flag and terminate every running process group."""
+        with self._lock:
+            self._event.set()
+            procs = list(self._procs)
+        for proc in procs:
+            terminate_group(proc)
+
+    def register(self, proc: subprocess.Popen) -> None:
+        with self._lock:
+            self._procs.add(proc)
+            cancelled = self._event.is_set()
+        # A step started after cancellation is terminated right away
+        if cancelled:
+            terminate_group(proc)
+
+    def unregister(self, proc: subprocess.Popen) -> None:
+        with self._lock:
+            self._procs.discard(proc)
+
+
+def terminate_group(proc: subprocess.Popen, grace: float = TERMINATE_GRACE) -> None:
+    """Send SIGTERM to a process group, escalating to SIGKILL after grace seconds."""
+    # Check returncode rather than poll() so the child is left for run_step to reap
+    if proc.returncode is not None:
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+
+    def kill() -> None:
+        if proc.returncode is None:
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+    timer = threading.Timer(grace, kill)
+    timer.daemon = True
+    timer.start()
+
+
+def run_step(
+    cmd: list[str],
+    cwd: Path,
+    timeout: float,
+    cancellation: Cancellation | None = None,
+    on_line: Callable[[str], None] | None = None,
+    env: dict[str, str] | None = None,
+) -> StepRun:
+    """Run a command in a new process group.
+
+    The child is reaped with wait4 so its CPU time and peak RSS (including
+    descendants it waited for) are recorded alongside the wall time.
+
+    Args:
+        cmd: Command to run.
+        cwd: Working directory.
+        timeout: Seconds before the process group is killed.
+        cancellation: Optional shared cancellation the process registers with.
+        on_line: If given, stdout and stderr are merged and each line is passed
+            to it as soon as it is read. Otherwise output is captured separately.
+        env: Extra environment variables for the command.
+
+    Raises:
+        FileNotFoundError: If the command does not exist.
+    """
+    start = time.monotonic()
+    proc = subprocess.Popen(
+        cmd,
+        cwd=cwd,
+        env={**os.environ, **env} if env else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT if on_line else subprocess.PIPE,
+        text=True,
+        errors="replace",
+        start_new_session=True,
+    )
+    if cancellation is not None:
+        cancellation.register(proc)
+
+    timed_out = threading.Event()
+
+    def on_timeout() -> None:
+        timed_out.set()
+        terminate_group(proc, grace=0)
+
+    timer = threading.Timer(timeout, on_timeout)
+    timer.daemon = True
+    timer.start()
+    try:
+        with proc:
+            stdout, stderr = _read_output(proc, on_line)
+            usage = _wait_with_usage(proc)
+    finally:
+        timer.cancel()
+        if cancellation is not None:
+            cancellation.unregister(proc)
+    wall_time = time.monotonic() - start
+
+    cpu_time = max_rss_kb = None
+    if usage is not None:
+        cpu_time = usage.ru_utime + usage.ru_stime
+        # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+        max_rss_kb = usage.ru_maxrss
+        if sys.platform == "darwin":
+            max_rss_kb //= 1024
+
+    return StepRun(
+        returncode=proc.returncode,
+        stdout=stdout,
+        stderr=stderr,
+        timed_out=timed_out.is_set(),
+        cancelled=cancellation is not None
+        and cancellation.cancelled
+        and proc.returncode != 0,
+        wall_time=wall_time,
+        cpu_time=cpu_time,
+        max_rss_kb=max_rss_kb,
+    )
+
+
+def _read_output(
+    proc: subprocess.Popen, on_line: Callable[[str], None] | None
+) -> tuple[str, str]:
+    """Read a process's output until EOF without waiting for it to exit."""
+    if on_line:
+        lines = []
+        for line in proc.stdout:
+            line = line.rstrip("\n")
+            lines.append(line)
+            on_line(line)
+        return "\n".join(lines), ""
+
+    stderr_chunks: list[str] = []
+    reader = threading.Thread(
+        target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True
+    )
+    reader.start()
+    stdout = proc.stdout.read()
+    reader.join()
+    return stdout, "".join(stderr_chunks)
+
+
+def _wait_with_usage(proc: subprocess.Popen):
+    """Reap proc and return its resource usage, or None if unavailable."""
+    try:
+        _, status, usage = os.wait4(proc.pid, 0)
+    except (AttributeError, ChildProcessError):
+        proc.wait()
+        return None
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return usage
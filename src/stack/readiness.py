@@ -0,0 +1,242 @@
+"""Stack readiness: docker compose health states plus per-service probes.
+
+Every compose service is tracked independently. A service is ready once
+its container is running, its healthcheck (if it defines one) reports
+healthy, and its probe from SERVICE_PROBES (if any) succeeds from the host.
+Services are re-checked with exponential backoff and jitter, and the time
+each one took to become ready is recorded.
+"""
+
+import json
+import random
+import socket
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from stack.config import COMPOSE_FILE
+
+# Probes run from the host once a service's container is healthy: either
+# ("http", url) expecting a 2xx, or ("tcp", host, port) expecting a connect.
+# AISP's gRPC port is only reachable inside the compose network, so its
+# compose healthcheck is what gates it.
+SERVICE_PROBES = {
+    "platform-api": ("http", "http://localhost:8000/api/v1/health"),
+}
+
+INITIAL_DELAY = 0.1
+MAX_DELAY = 1.0
+PROBE_TIMEOUT = 2.0
+
+
+def get_compose_services(stack_path: Path) -> dict[str, dict] | None:
+    """Read container state and health for every compose service.
+
+    Handles both output formats of `docker compose ps --format json`: a
+    single JSON array (older releases) and one JSON object per line.
+
+    Returns:
+        Mapping of service name to {"state", "health", "exit_code", "name",
+        "project"} (name being the container's), or None if docker compose
+        could not be run or its output could not be read.
+    """
+    try:
+        result = subprocess.run(
+            [
+                "docker",
+                "compose",
+                "-f",
+                COMPOSE_FILE,
+                "ps",
+                "--all",
+                "--format",
+                "json",
+            ],
+            cwd=stack_path,
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+
+    return _parse_ps_output(result.stdout)
+
+
+def _parse_ps_output(output: str) -> dict[str, dict] | None:
+    """Parse `docker compose ps --format json` output.
+
+    Empty output (no containers) yields an empty mapping. Lines that aren't
+    a JSON object, such as warnings compose mixes into its output, are
+    skipped; a JSON array that doesn't parse yields None.
+    """
+    output = output.strip()
+    if output.startswith("["):
+        try:
+            entries = json.loads(output)
+        except ValueError:
+            return None
+    else:
+        entries = []
+        for line in output.splitlines():
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+
+    return {
+        entry["Service"]: {
+            "state": entry.get("State", ""),
+            "health": entry.get("Health", ""),
+            "exit_code": entry.get("ExitCode", 0),
+            "name": entry.get("Name", ""),
+            "project": entry.get("Project", ""),
+        }
+        for entry in entries
+        if isinstance(entry, dict) and entry.get("Service")
+    }
+
+
+def probe(spec: tuple) -> str | None:
+    """Run a readiness probe.
+
+    Returns:
+        None if the probe succeeded, otherwise a short reason.
+    """
+    import httpx
+
+    kind = spec[0]
+    try:
+        if kind == "http":
+            response = httpx.get(spec[1], timeout=PROBE_TIMEOUT)
+            if response.is_success:
+                return None
+            return f"HTTP {response.status_code}"
+        if kind == "tcp":
+            with socket.create_connection((spec[1], spec[2]), timeout=PROBE_TIMEOUT):
+                return None
+    except (httpx.HTTPError, OSError) as e:
+        return type(e).__name__
+    raise ValueError(f"Unknown probe kind: {kind}")
+
+
+def _backoff(attempt: int) -> float:
+    """Exponential backoff with equal jitter: half fixed, half random."""
+    delay = min(MAX_DELAY, INITIAL_DELAY * 2**attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def wait_for_ready(
+    stack_path: Path, timeout: float = 120.0, on_change=None
+) -> dict[str, dict]:
+    """Wait until every compose service is ready, or until timeout.
+
+    Args:
+        stack_path: platform-stack checkout holding the compose file.
+        timeout: Seconds to wait before giving up on services not yet ready.
+        on_change: Optional callback receiving the per-service status dict
+            whenever a service changes phase.
+
+    Returns:
+        Mapping of service name to a dict with its final "phase" (ready,
+        failed or waiting), "detail", and "healthy_at"/"ready_at" in seconds
+        since the wait started (None if never reached).
+
+    Raises:
+        RuntimeError: If docker compose can't be queried.
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    services: dict[str, dict] = {}
+    next_check: dict[str, float] = {}
+    attempts: dict[str, int] = {}
+    states: dict[str, dict] = {}
+    lock = threading.Lock()
+
+    def set_phase(name: str, phase: str, detail: str = "") -> None:
+        with lock:
+            service = services[name]
+            if (service["phase"], service["detail"]) != (phase, detail):
+                service["phase"], service["detail"] = phase, detail
+                if on_change is not None:
+                    on_change(services)
+
+    def check(name: str) -> None:
+        _check(name, states.get(name), services[name], set_phase, start)
+        attempts[name] += 1
+        next_check[name] = time.monotonic() + _backoff(attempts[name])
+
+    def pending() -> list[str]:
+        return [
+            name
+            for name, service in services.items()
+            if service["phase"] not in ("ready", "failed")
+        ]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        while True:
+            now = time.monotonic()
+            due = [name for name in pending() if next_check[name] <= now]
+            if not services or due:
+                states = get_compose_services(stack_path)
+                if states is None:
+                    raise RuntimeError("Could not query docker compose")
+                for name in states.keys() - services.keys():
+                    services[name] = {
+                        "phase": "waiting",
+                        "detail": "",
+                        "healthy_at": None,
+                        "ready_at": None,
+                    }
+                    attempts[name] = 0
+                    due.append(name)
+                # Services are checked concurrently so a slow probe of one
+                # doesn't delay the others
+                list(pool.map(check, due))
+
+            waiting = pending()
+            if not waiting or time.monotonic() >= deadline:
+                return services
+
+            wake = min(min(next_check[name] for name in waiting), deadline)
+            time.sleep(max(0.0, wake - time.monotonic()))
+
+
+def _check(
+    name: str, state: dict | None, service: dict, set_phase, start: float
+) -> None:
+    """Advance one service through container, health and probe checks."""
+    if state is None:
+        set_phase(name, "waiting", "no container")
+        return
+    if state["state"] in ("exited", "dead"):
+        if state["exit_code"]:
+            set_phase(name, "failed", f"exited with code {state['exit_code']}")
+        else:
+            # One-shot jobs such as migrations count as ready once they finish
+            elapsed = time.monotonic() - start
+            service["healthy_at"] = service["healthy_at"] or elapsed
+            service["ready_at"] = service["ready_at"] or elapsed
+            set_phase(name, "ready", "completed")
+        return
+    if state["state"] != "running":
+        set_phase(name, "waiting", state["state"])
+        return
+    if state["health"] not in ("", "healthy"):
+        set_phase(name, "waiting", state["health"])
+        return
+
+    if service["healthy_at"] is None:
+        service["healthy_at"] = time.monotonic() - start
+
+    spec = SERVICE_PROBES.get(name)
+    failure = probe(spec) if spec is not None else None
+    if failure is not None:
+        set_phase(name, "waiting", f"probe: {failure}")
+        return
+    service["ready_at"] = time.monotonic() - start
+    set_phase(name, "ready")
@@ -0,0 +1,289 @@
+"""Declarative smoke scenarios.
+
+A scenario is a YAML file with a name and a list of steps. Each step sends
+one HTTP request, optionally reading the response as an SSE stream, checks
+its expectations and captures values for later steps:
+
+    name: chat-turn
+    steps:
+      - name: create session
+        request:
+          method: POST
+          path: /chat/sessions
+          json: {title: Smoke Test Chat, assistant_id: "${assistant_id}"}
+        expect:
+          status: [200, 201]
+        capture:
+          session_id: id
+      - name: send turn
+        request:
+          method: POST
+          path: /chat/sessions/${session_id}/turns
+          json: {message: "What is 7 * 5? Response only with the answer."}
+          stream: true
+        expect:
+          status: 200
+          events: [token_delta, done]
+          content_contains: "35"
+
+Strings may reference variables as `${name}`. Supported expectations:
+
+- `status`: status code or list of accepted codes.
+- `json`: mapping the JSON response body must contain (recursively).
+- `events`: event types that must appear in this order (other events may
+  appear in between).
+- `content_contains`: text the concatenated token content must contain.
+
+`capture` maps variable names to dotted paths into the JSON response body.
+
+With an EventContract, every streamed event is validated against its
+AsyncAPI schema as it arrives and a violation fails the step. An `error`
+event fails the step unless `events` expects it.
+"""
+
+import asyncio
+import string
+import time
+from pathlib import Path
+from typing import Any
+
+import httpx
+import yaml
+
+from stack import contracts, sse
+from stack.config import get_workspace_root
+
+
+class ScenarioError(Exception):
+    """A scenario file is malformed or references an undefined variable."""
+
+
+def get_scenarios_dir() -> Path:
+    """Get the directory holding the smoke scenario files."""
+    return get_workspace_root() / "scenarios"
+
+
+def load_scenarios(
+    directory: Path | None = None, names: list[str] | None = None
+) -> list[dict]:
+    """Load scenarios from YAML files, sorted by file name.
+
+    Args:
+        directory: Directory of `*.yaml` scenario files. Defaults to
+            get_scenarios_dir().
+        names: If given, only load scenarios with these names.
+
+    Raises:
+        ScenarioError: If a file is malformed or a requested name is unknown.
+    """
+    directory = directory or get_scenarios_dir()
+    scenarios = []
+    for path in sorted(directory.glob("*.yaml")):
+        try:
+            scenario = yaml.safe_load(path.read_text())
+        except (OSError, yaml.YAMLError) as e:
+            raise ScenarioError(f"{path.name}: {e}") from e
+        if not isinstance(scenario, dict) or not isinstance(
+            scenario.get("steps"), list
+        ):
+            raise ScenarioError(f"{path.name}: expected a mapping with a steps list")
+        scenario.setdefault("name", path.stem)
+        scenarios.append(scenario)
+
+    if names:
+        unknown = set(names) - {scenario["name"] for scenario in scenarios}
+        if unknown:
+            raise ScenarioError(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+        scenarios = [s for s in scenarios if s["name"] in names]
+    return scenarios
+
+
+def _substitute(value: Any, variables: dict[str, str]) -> Any:
+    """Replace `${name}` references in all strings within value."""
+    if isinstance(value, str):
+        try:
+            return string.Template(value).substitute(variables)
+        except KeyError as e:
+            raise ScenarioError(f"Undefined variable: {e.args[0]}") from None
+    if isinstance(value, list):
+        return [_substitute(item, variables) for item in value]
+    if isinstance(value, dict):
+        return {key: _substitute(item, variables) for key, item in value.items()}
+    return value
+
+
+def _lookup(body: Any, path: str) -> Any:
+    """Follow a dotted path (keys or list indexes) into a JSON value."""
+    value = body
+    for part in path.split("."):
+        if isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        elif isinstance(value, dict) and part in value:
+            value = value[part]
+        else:
+            raise KeyError(path)
+    return value
+
+
+def _contains(actual: Any, expected: Any) -> bool:
+    """Check that actual contains expected: mappings recursively, else equality."""
+    if isinstance(expected, dict):
+        return isinstance(actual, dict) and all(
+            key in actual and _contains(actual[key], value)
+            for key, value in expected.items()
+        )
+    return actual == expected
+
+
+def _is_subsequence(expected: list[str], actual: list[str]) -> bool:
+    remaining = iter(actual)
+    return all(item in remaining for item in expected)
+
+
+async def run_step(
+    client: httpx.AsyncClient,
+    step: dict,
+    variables: dict[str, str],
+    contract: contracts.EventContract | None = None,
+) -> dict:
+    """Run one scenario step, updating variables with its captures.
+
+    Returns:
+        Dict with the step name, "passed", the elapsed time, a detail message
+        and, for streamed steps, the received event types and timings, the
+        server-reported metrics and any contract violations.
+    """
+    name = step.get("name", "step")
+    request = _substitute(step.get("request") or {}, variables)
+    expect = _substitute(step.get("expect") or {}, variables)
+    result = {"name": name, "passed": False, "elapsed": 0.0, "detail": ""}
+
+    start = time.monotonic()
+    failures = []
+    body = None
+    try:
+        if request.get("stream"):
+            events = []
+            violations = []
+            async with client.stream(
+                request.get("method", "GET"),
+                request["path"],
+                json=request.get("json"),
+                headers=request.get("headers"),
+            ) as response:
+                status = response.status_code
+                if response.is_success:
+                    async for event in sse.aiter_events(response.aiter_bytes()):
+                        events.append(event)
+                        if contract is not None:
+                            violations.extend(contract.validate(event))
+                        if event.type in (sse.DONE, sse.ERROR):
+                            break
+                else:
+                    await response.aread()
+            result["events"] = [event.type for event in events]
+            token_times = [e.received_at for e in events if e.content is not None]
+            result["ttft"] = token_times[0] - start if token_times else None
+            content = "".join(e.content for e in events if e.content is not None)
+            result["violations"] = violations
+            result["metrics"] = contracts.turn_metrics(events)
+            result["server_time"] = contracts.server_time(result["metrics"])
+            errors = [e.data for e in events if e.type == sse.ERROR]
+        else:
+            response = await client.request(
+                request.get("method", "GET"),
+                request["path"],
+                json=request.get("json"),
+                headers=request.get("headers"),
+            )
+            status = response.status_code
+            content = None
+            errors = []
+            try:
+                body = response.json()
+            except ValueError:
+                body = None
+    except httpx.HTTPError as e:
+        result["elapsed"] = time.monotonic() - start
+        result["detail"] = f"{type(e).__name__}: {e}"
+        return result
+    except KeyError as e:
+        raise ScenarioError(f"Step {name!r} is missing request.{e.args[0]}") from None
+    result["elapsed"] = time.monotonic() - start
+
+    accepted = expect.get("status")
+    if accepted is not None:
+        accepted = accepted if isinstance(accepted, list) else [accepted]
+        if status not in accepted:
+            failures.append(f"status {status}, expected {accepted}")
+    if "json" in expect and not _contains(body, expect["json"]):
+        failures.append(f"body {body!r} does not contain {expect['json']!r}")
+    if "events" in expect and not _is_subsequence(
+        expect["events"], result.get("events", [])
+    ):
+        failures.append(
+            f"events {result.get('events', [])} do not include {expect['events']} "
+            "in order"
+        )
+    if errors and sse.ERROR not in expect.get("events", []):
+        failures.append(f"error event: {errors[0]}")
+    if result.get("violations"):
+        extra = len(result["violations"]) - 1
+        failures.append(
+            f"contract: {result['violations'][0]}"
+            + (f" (+{extra} more)" if extra else "")
+        )
+    if "content_contains" in expect and expect["content_contains"] not in (
+        content or ""
+    ):
+        failures.append(
+            f"content {content!r} does not contain {expect['content_contains']!r}"
+        )
+
+    for variable, path in (step.get("capture") or {}).items():
+        try:
+            variables[variable] = str(_lookup(body, path))
+        except KeyError:
+            failures.append(f"could not capture {variable} from {path!r}")
+
+    result["passed"] = not failures
+    result["detail"] = "; ".join(failures) or (content or "").strip()[:60]
+    return result
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: dict,
+    variables: dict[str, str],
+    contract: contracts.EventContract | None = None,
+) -> dict:
+    """Run a scenario's steps in order, stopping at the first failed step.
+
+    Returns:
+        Dict with the scenario name, "passed", and the per-step results.
+    """
+    variables = dict(variables)
+    steps = []
+    for step in scenario["steps"]:
+        result = await run_step(client, step, variables, contract)
+        steps.append(result)
+        if not result["passed"]:
+            break
+    passed = len(steps) == len(scenario["steps"]) and all(s["passed"] for s in steps)
+    return {"name": scenario["name"], "passed": passed, "steps": steps}
+
+
+async def run_scenarios(
+    scenarios: list[dict],
+    base_url: str,
+    variables: dict[str, str],
+    timeout: float,
+    contract: contracts.EventContract | None = None,
+) -> list[dict]:
+    """Run scenarios concurrently over one keep-alive client."""
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout) as client:
+        return list(
+            await asyncio.gather(
+                *(run_scenario(client, s, variables, contract) for s in scenarios)
+            )
+        )
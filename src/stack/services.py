@@ -0,0 +1,157 @@
+"""Compose services built from workspace repos.
+
+Each service in SERVICE_MAP is built from one repo, and its image also
+depends on that repo's upstreams in repos.yaml (e.g. generated code from
+apis). A service's source hash covers the tree fingerprints of all of
+them. `stack up --changed` compares it with the hash recorded at the last
+rebuild to find stale services.
+"""
+
+import hashlib
+import json
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from stack.cache import tree_fingerprint
+from stack.config import RepoGraph, get_workspace_root
+
+# Map repo keys to the docker compose service built from them in platform-stack
+SERVICE_MAP = {
+    "pcp": "platform-api",
+    "aisp": "ai-orchestrator",
+    "uip": "web-app",
+}
+
+
+def get_state_path() -> Path:
+    """Get the file recording the source hashes of the last service rebuilds."""
+    return get_workspace_root() / "state" / "stack-services.json"
+
+
+def resolve_services(graph: RepoGraph, names: list[str]) -> list[str]:
+    """Resolve repo keys or compose service names to the repo keys of services.
+
+    A repo without a service of its own (e.g. apis) selects every service
+    built from a repo that depends on it.
+
+    Returns:
+        Repo keys of the selected services, in SERVICE_MAP order.
+
+    Raises:
+        ValueError: If a name is neither a repo key nor a compose service.
+    """
+    by_service = {service: repo_key for repo_key, service in SERVICE_MAP.items()}
+    repo_keys = set()
+    for name in names:
+        if name in by_service:
+            repo_keys.add(by_service[name])
+        elif name in graph:
+            repo_keys.update(graph.with_dependents([name]))
+        else:
+            raise ValueError(f"Unknown service: {name}")
+    return [repo_key for repo_key in SERVICE_MAP if repo_key in repo_keys]
+
+
+def source_states(graph: RepoGraph, repo_keys: list[str]) -> dict[str, dict]:
+    """Fingerprint the sources of each service.
+
+    Returns:
+        Mapping of repo key to {"hash", "repos"}, where "repos" maps each
+        source repo to its tree fingerprint and "hash" combines them. Both
+        are None for repos that are missing or not git repositories.
+    """
+    sources = {repo_key: graph.sources(repo_key) for repo_key in repo_keys}
+    needed = sorted({key for keys in sources.values() for key in keys})
+
+    def fingerprint(key: str) -> str | None:
+        path = graph[key].path
+        return tree_fingerprint(path) if path.exists() else None
+
+    with ThreadPoolExecutor(max_workers=max(len(needed), 1)) as pool:
+        fingerprints = dict(zip(needed, pool.map(fingerprint, needed)))
+
+    states = {}
+    for repo_key, keys in sources.items():
+        repos = {key: fingerprints[key] for key in keys}
+        digest = None
+        if None not in repos.values():
+            digest = hashlib.sha256(
+                json.dumps(repos, sort_keys=True).encode()
+            ).hexdigest()
+        states[repo_key] = {"hash": digest, "repos": repos}
+    return states
+
+
+def load_recorded() -> dict[str, dict]:
+    """Load the source states recorded at each service's last rebuild."""
+    try:
+        return json.loads(get_state_path().read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def record(states: dict[str, dict]) -> None:
+    """Record source states for services that were just rebuilt."""
+    recorded = {**load_recorded(), **states}
+    path = get_state_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(recorded, indent=2, sort_keys=True) + "\n")
+
+
+def changed_sources(state: dict, recorded: dict | None) -> list[str] | None:
+    """List the source repos that changed since the recorded state.
+
+    Returns:
+        Repo keys whose fingerprint differs, or None if the service was
+        never rebuilt by `stack up` (or its sources can't be fingerprinted).
+    """
+    if recorded is None or state["hash"] is None:
+        return None
+    return [
+        key
+        for key, fingerprint in state["repos"].items()
+        if recorded.get("repos", {}).get(key) != fingerprint
+    ]
+
+
+def compose_dependencies(stack_path: Path, compose_files: list[str]) -> dict:
+    """Read the depends_on graph of the compose project.
+
+    Returns:
+        Mapping of compose service to the services it depends on, or an
+        empty mapping if docker compose could not be run.
+    """
+    cmd = ["docker", "compose"]
+    for compose_file in compose_files:
+        cmd += ["-f", compose_file]
+    try:
+        result = subprocess.run(
+            [*cmd, "config", "--format", "json"],
+            cwd=stack_path,
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+        config = json.loads(result.stdout) if result.returncode == 0 else {}
+    except (OSError, subprocess.TimeoutExpired, ValueError):
+        return {}
+    return {
+        name: list(service.get("depends_on") or [])
+        for name, service in (config.get("services") or {}).items()
+    }
+
+
+def dependency_closure(dependencies: dict, services: list[str]) -> list[str]:
+    """Every service the given services transitively depend on, excluding them."""
+    selected = set(services)
+    closure = []
+    stack = list(services)
+    while stack:
+        for dep in dependencies.get(stack.pop(), ()):
+            if dep not in selected:
+                selected.add(dep)
+                closure.append(dep)
+                stack.append(dep)
+    return sorted(closure)
+
@@ -0,0 +1,123 @@
+"""Pytest sharding by historical per-file test duration."""
+
+import heapq
+import json
+import re
+import statistics
+import subprocess
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from stack.config import get_workspace_root
+
+# Assumed duration for test files without recorded history
+DEFAULT_FILE_DURATION = 1.0
+
+
+def get_durations_path(repo_key: str) -> Path:
+    """Get the path of the recorded per-file test durations for a repo."""
+    durations_dir = get_workspace_root() / "state" / "cache" / "test-durations"
+    return durations_dir / f"{repo_key}.json"
+
+
+def load_durations(repo_key: str) -> dict[str, float]:
+    """Load recorded per-file test durations, or an empty mapping."""
+    try:
+        return json.loads(get_durations_path(repo_key).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_durations(repo_key: str, durations: dict[str, float]) -> None:
+    """Merge new per-file durations into the recorded ones."""
+    path = get_durations_path(repo_key)
+    merged = {**load_durations(repo_key), **durations}
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(merged, indent=2, sort_keys=True))
+    except OSError:
+        pass
+
+
+def collect_test_files(cmd: list[str], repo_path: Path) -> list[str]:
+    """Collect the test files pytest would run.
+
+    Args:
+        cmd: The pytest command for the repo (e.g. `uv run pytest -q`).
+        repo_path: Repository root.
+
+    Returns:
+        Test file paths relative to the repo root, or an empty list if
+        collection failed.
+    """
+    try:
+        result = subprocess.run(
+            [*cmd, "--collect-only", "-q"],
+            cwd=repo_path,
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return []
+    if result.returncode != 0:
+        return []
+
+    # `-q` lists node ids (`path::test`); `-qq` lists per-file counts (`path: 3`)
+    files = []
+    for line in result.stdout.splitlines():
+        if "::" in line:
+            path = line.split("::", 1)[0]
+        elif re.match(r"^\S+\.py: \d+$", line):
+            path = line.rsplit(":", 1)[0]
+        else:
+            continue
+        if path not in files:
+            files.append(path)
+    return files
+
+
+def partition(
+    files: list[str], durations: dict[str, float], shards: int
+) -> list[list[str]]:
+    """Split files into at most `shards` partitions of similar total duration.
+
+    Uses longest-processing-time-first: files are assigned, slowest first, to
+    the partition with the smallest total so far.
+    """
+    known = [durations[f] for f in files if f in durations]
+    fallback = statistics.median(known) if known else DEFAULT_FILE_DURATION
+
+    heap = [(0.0, index, []) for index in range(min(shards, len(files)))]
+    for path in sorted(files, key=lambda f: durations.get(f, fallback), reverse=True):
+        total, index, members = heapq.heappop(heap)
+        members.append(path)
+        heapq.heappush(heap, (total + durations.get(path, fallback), index, members))
+
+    return [members for _, _, members in sorted(heap, key=lambda item: item[1])]
+
+
+def shard_command(cmd: list[str], files: list[str], junit_path: Path) -> list[str]:
+    """Build the pytest command for one shard, reporting per-test times as JUnit."""
+    return [
+        *cmd,
+        "-o",
+        "junit_family=xunit1",
+        f"--junitxml={junit_path}",
+        *files,
+    ]
+
+
+def read_junit_durations(junit_path: Path) -> dict[str, float]:
+    """Sum per-file test durations from an xunit1 JUnit report."""
+    try:
+        root = ET.parse(junit_path).getroot()
+    except (OSError, ET.ParseError):
+        return {}
+
+    durations: dict[str, float] = {}
+    for case in root.iter("testcase"):
+        path = case.get("file")
+        if path:
+            durations[path] = durations.get(path, 0.0) + float(case.get("time") or 0)
+    return durations
@@ -0,0 +1,178 @@
+"""Incremental Server-Sent Events parser.
+
+Implements the event stream interpretation from the HTML spec: lines end in
+CRLF, LF or CR, `data` fields accumulate (joined with newlines) until a
+blank line dispatches the event, `id` persists across events, `retry` only
+accepts digits, and comment lines are ignored. Input arrives as arbitrary
+byte chunks, so UTF-8 sequences and line endings may be split anywhere.
+
+Event names are normalized to the snake_case types of the platform event
+model (`token_delta`, `metrics`, `done`, `error`), so `Done` and
+`TokenDelta` map to `done` and `token_delta`.
+"""
+
+import codecs
+import json
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Iterator
+
+TOKEN_DELTA = "token_delta"
+METRICS = "metrics"
+DONE = "done"
+ERROR = "error"
+
+# Type of events sent without an `event` field
+DEFAULT_TYPE = "message"
+
+_LINE_END = re.compile(r"\r\n|\r|\n")
+_CAMEL_BOUNDARY = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+
+
+@dataclass(slots=True)
+class Event:
+    """A dispatched SSE event.
+
+    Attributes:
+        type: Normalized event type (see module docstring).
+        data: Raw data, with multiple `data` lines joined by newlines.
+        payload: `data` parsed as JSON, or None if it isn't JSON.
+        id: Last event id seen on the stream, if any.
+        retry: Reconnection time in milliseconds, if the event set one.
+        received_at: time.monotonic() when the chunk completing the event
+            was received.
+    """
+
+    type: str
+    data: str
+    payload: Any
+    id: str | None
+    retry: int | None
+    received_at: float
+
+    @property
+    def content(self) -> str | None:
+        """Text carried by a token event, or None."""
+        if isinstance(self.payload, dict):
+            content = self.payload.get("content")
+            if isinstance(content, str):
+                return content
+        return None
+
+
+def normalize_type(name: str) -> str:
+    """Map an SSE event name to its snake_case event model type."""
+    if not name:
+        return DEFAULT_TYPE
+    return _CAMEL_BOUNDARY.sub("_", name).replace("-", "_").lower()
+
+
+class SSEParser:
+    """Parse an event stream fed in byte chunks.
+
+    Only the incomplete last line and the current event's fields are kept
+    between calls, so a stream costs time linear in its size regardless of
+    how it is chunked.
+    """
+
+    def __init__(self) -> None:
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._tail = ""
+        self._skip_lf = False
+        self._started = False
+        self._event_type = ""
+        self._data: list[str] = []
+        self._last_id: str | None = None
+        self._retry: int | None = None
+
+    def feed(self, chunk: bytes, received_at: float | None = None) -> list[Event]:
+        """Parse a chunk and return the events it completed.
+
+        Args:
+            chunk: Raw bytes from the stream.
+            received_at: Receive timestamp for completed events. Defaults to
+                time.monotonic() at the call.
+        """
+        if received_at is None:
+            received_at = time.monotonic()
+
+        text = self._decoder.decode(chunk)
+        if not self._started and text:
+            text = text.removeprefix("\ufeff")
+            self._started = True
+        if self._skip_lf and text:
+            # A CR ended the previous chunk; an LF right after it belongs to it
+            text = text.removeprefix("\n")
+            self._skip_lf = False
+        if not text:
+            return []
+
+        lines = _LINE_END.split(self._tail + text)
+        self._tail = lines.pop()
+        self._skip_lf = text.endswith("\r")
+
+        events = []
+        for line in lines:
+            event = self._process_line(line, received_at)
+            if event is not None:
+                events.append(event)
+        return events
+
+    def _process_line(self, line: str, received_at: float) -> Event | None:
+        if not line:
+            return self._dispatch(received_at)
+        if line.startswith(":"):
+            return None
+
+        field, colon, value = line.partition(":")
+        if colon:
+            value = value.removeprefix(" ")
+
+        if field == "data":
+            self._data.append(value)
+        elif field == "event":
+            self._event_type = value
+        elif field == "id":
+            if "\0" not in value:
+                self._last_id = value
+        elif field == "retry":
+            if value.isascii() and value.isdigit():
+                self._retry = int(value)
+        return None
+
+    def _dispatch(self, received_at: float) -> Event | None:
+        event_type, self._event_type = self._event_type, ""
+        retry, self._retry = self._retry, None
+        if not self._data:
+            return None
+
+        data = "\n".join(self._data)
+        self._data = []
+        try:
+            payload = json.loads(data)
+        except ValueError:
+            payload = None
+        return Event(
+            type=normalize_type(event_type),
+            data=data,
+            payload=payload,
+            id=self._last_id,
+            retry=retry,
+            received_at=received_at,
+        )
+
+
+def iter_events(chunks) -> Iterator[Event]:
+    """Parse events from an iterable of byte chunks (e.g. `iter_bytes()`)."""
+    parser = SSEParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+
+
+async def aiter_events(chunks) -> AsyncIterator[Event]:
+    """Parse events from an async iterable of byte chunks (e.g. `aiter_bytes()`)."""
+    parser = SSEParser()
+    async for chunk in chunks:
+        for event in parser.feed(chunk):
+            yield event
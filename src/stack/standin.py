@@ -0,0 +1,351 @@
+"""PCP stand-in server for offline streaming tests.
+
+A small HTTP/1.1 server on asyncio streams, with no dependencies beyond
+httpx (only used when recording). It serves the chat endpoints in one of
+three modes:
+
+- record: proxy every request to a real PCP and write each exchange, with
+  the time offset of every SSE chunk, to a cassette file.
+- replay: answer from a cassette, reproducing the recorded chunk timing
+  scaled by a speed factor.
+- synthetic: generate token streams at a configurable rate.
+
+Replay picks the first non-empty group of recorded exchanges among: same
+path and request body, same route (method and path with UUID segments
+normalized) and body, and same route. The route groups only hold 2xx
+exchanges, so a cassette recorded against one session replays for any
+session id while a recorded 404 for a bogus id stays tied to that id.
+Exchanges within a group are replayed round-robin.
+"""
+
+import asyncio
+import codecs
+import json
+import re
+import time
+import uuid
+from pathlib import Path
+
+CASSETTE_VERSION = 1
+
+# Path prefix of the PCP public API
+API_PREFIX = "/api/v1"
+
+_UUID_SEGMENT = re.compile(
+    r"/[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+)
+_TOKEN = re.compile(r"\S+\s*")
+
+_REASONS = {200: "OK", 201: "Created", 404: "Not Found", 502: "Bad Gateway"}
+
+
+def route_key(method: str, path: str) -> str:
+    """Normalize a request into a route key, e.g. `POST /chat/sessions/{id}/turns`."""
+    path = path.split("?", 1)[0]
+    return f"{method} {_UUID_SEGMENT.sub('/{id}', path)}"
+
+
+class _Request:
+    __slots__ = ("method", "path", "headers", "body")
+
+    def __init__(self, method: str, path: str, headers: dict, body: bytes) -> None:
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.body = body
+
+
+class _Response:
+    """Writes a plain or chunked (streamed) HTTP/1.1 response."""
+
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        self._writer = writer
+
+    def _head(self, status: int, headers: dict[str, str]) -> None:
+        reason = _REASONS.get(status, "Unknown")
+        lines = [f"HTTP/1.1 {status} {reason}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        self._writer.write(("\r\n".join(lines) + "\r\n\r\n").encode())
+
+    async def send(self, status: int, body: bytes, content_type: str) -> None:
+        self._head(
+            status,
+            {"Content-Type": content_type, "Content-Length": str(len(body))},
+        )
+        self._writer.write(body)
+        await self._writer.drain()
+
+    async def send_json(self, status: int, payload) -> None:
+        await self.send(status, json.dumps(payload).encode(), "application/json")
+
+    async def start_stream(self, status: int = 200) -> None:
+        self._head(
+            status,
+            {
+                "Content-Type": "text/event-stream",
+                "Cache-Control": "no-cache",
+                "Transfer-Encoding": "chunked",
+            },
+        )
+        await self._writer.drain()
+
+    async def write(self, data: bytes) -> None:
+        if data:
+            self._writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+            await self._writer.drain()
+
+    async def end_stream(self) -> None:
+        self._writer.write(b"0\r\n\r\n")
+        await self._writer.drain()
+
+
+async def _read_request(reader: asyncio.StreamReader) -> _Request | None:
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    method, target, _ = line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while (header := await reader.readline()) not in (b"\r\n", b"\n", b""):
+        name, _, value = header.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return _Request(method, target, headers, body)
+
+
+class StandinServer:
+    """Base server: connection handling, keep-alive and the health route."""
+
+    async def handle(self, request: _Request, response: _Response) -> None:
+        raise NotImplementedError
+
+    async def _serve_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while (request := await _read_request(reader)) is not None:
+                response = _Response(writer)
+                if request.path.split("?", 1)[0] == f"{API_PREFIX}/health":
+                    await response.send_json(200, {"status": "ok"})
+                else:
+                    await self.handle(request, response)
+                if request.headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int, on_ready=None) -> None:
+        """Serve until cancelled; on_ready receives the bound (host, port)."""
+        server = await asyncio.start_server(self._serve_connection, host, port)
+        async with server:
+            if on_ready is not None:
+                on_ready(server.sockets[0].getsockname()[:2])
+            await server.serve_forever()
+
+
+def _sse(event: str, payload) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n".encode()
+
+
+class SyntheticServer(StandinServer):
+    """Generate token streams at a fixed rate.
+
+    Args:
+        text: Response text, split into whitespace-delimited tokens.
+        tokens: Number of tokens per turn; text is repeated or cut to fit.
+            Defaults to the number of tokens in text.
+        tokens_per_s: Token emission rate.
+        ttft: Delay before the first token, in seconds.
+    """
+
+    def __init__(
+        self,
+        text: str = "The answer is 35.",
+        tokens: int | None = None,
+        tokens_per_s: float = 50.0,
+        ttft: float = 0.2,
+    ) -> None:
+        words = _TOKEN.findall(text) or ["x"]
+        count = tokens or len(words)
+        self.tokens = [words[i % len(words)] for i in range(count)]
+        self.interval = 1 / tokens_per_s if tokens_per_s > 0 else 0.0
+        self.ttft = ttft
+        self.sessions: set[str] = set()
+
+    async def handle(self, request: _Request, response: _Response) -> None:
+        path = request.path.split("?", 1)[0].removeprefix(API_PREFIX)
+        key = route_key(request.method, path)
+        if key == "POST /chat/sessions":
+            session_id = str(uuid.uuid4())
+            self.sessions.add(session_id)
+            await response.send_json(201, {"id": session_id})
+            return
+        if key != "POST /chat/sessions/{id}/turns":
+            await response.send_json(404, {"detail": f"No route for {key}"})
+            return
+        if path.split("/")[3] not in self.sessions:
+            await response.send_json(404, {"detail": "Session not found"})
+            return
+
+        start = time.monotonic()
+        await response.start_stream()
+        await asyncio.sleep(self.ttft)
+        first = time.monotonic()
+        for index, token in enumerate(self.tokens):
+            # Pace against the start time so sleep overshoot doesn't accumulate
+            delay = first + index * self.interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await response.write(_sse("token_delta", {"content": token}))
+        await response.write(
+            _sse(
+                "metrics",
+                {
+                    "output_tokens": len(self.tokens),
+                    "ttft_ms": round((first - start) * 1000, 1),
+                    "total_ms": round((time.monotonic() - start) * 1000, 1),
+                },
+            )
+        )
+        await response.write(_sse("done", {}))
+        await response.end_stream()
+
+
+def load_cassette(path: Path) -> dict:
+    """Load a cassette, raising ValueError if its format is unsupported."""
+    cassette = json.loads(path.read_text())
+    if cassette.get("version") != CASSETTE_VERSION:
+        raise ValueError(f"Unsupported cassette version in {path}")
+    return cassette
+
+
+class ReplayServer(StandinServer):
+    """Replay recorded exchanges with their chunk timing scaled by 1/speed.
+
+    A speed of 0 (or less) replays without any delays.
+    """
+
+    def __init__(self, cassette: dict, speed: float = 1.0) -> None:
+        self.speed = speed
+        self.routes: dict[str, list[dict]] = {}
+        self._groups: dict[tuple, list[dict]] = {}
+        for exchange in cassette["exchanges"]:
+            self.routes.setdefault(exchange["route"], []).append(exchange)
+            keys = [("path", exchange["path"], exchange["request"])]
+            if 200 <= exchange["status"] < 300:
+                keys.append(("route", exchange["route"], exchange["request"]))
+                keys.append(("route", exchange["route"]))
+            for key in keys:
+                self._groups.setdefault(key, []).append(exchange)
+        self._next: dict[tuple, int] = {}
+
+    def _match(self, request: _Request) -> dict | None:
+        body = request.body.decode(errors="replace")
+        route = route_key(request.method, request.path)
+        for key in (("path", request.path, body), ("route", route, body)):
+            if key in self._groups:
+                break
+        else:
+            key = ("route", route)
+        exchanges = self._groups.get(key)
+        if not exchanges:
+            return None
+        index = self._next.get(key, 0)
+        self._next[key] = index + 1
+        return exchanges[index % len(exchanges)]
+
+    async def handle(self, request: _Request, response: _Response) -> None:
+        exchange = self._match(request)
+        if exchange is None:
+            key = route_key(request.method, request.path)
+            await response.send_json(404, {"detail": f"No recording for {key}"})
+            return
+
+        if exchange.get("chunks") is None:
+            await response.send(
+                exchange["status"],
+                exchange.get("body", "").encode(),
+                exchange.get("content_type", "application/json"),
+            )
+            return
+
+        start = time.monotonic()
+        await response.start_stream(exchange["status"])
+        for offset, data in exchange["chunks"]:
+            if self.speed > 0:
+                delay = start + offset / self.speed - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await response.write(data.encode())
+        await response.end_stream()
+
+
+class RecordingServer(StandinServer):
+    """Proxy requests to an upstream server and record every exchange."""
+
+    def __init__(self, upstream: str, cassette_path: Path) -> None:
+        import httpx
+
+        self.client = httpx.AsyncClient(base_url=upstream.rstrip("/"), timeout=None)
+        self.cassette_path = cassette_path
+        self.exchanges: list[dict] = []
+
+    def _save(self) -> None:
+        self.cassette_path.parent.mkdir(parents=True, exist_ok=True)
+        self.cassette_path.write_text(
+            json.dumps(
+                {"version": CASSETTE_VERSION, "exchanges": self.exchanges}, indent=1
+            )
+        )
+
+    async def handle(self, request: _Request, response: _Response) -> None:
+        import httpx
+
+        headers = {
+            name: value
+            for name, value in request.headers.items()
+            if name in ("content-type", "accept", "authorization", "x-request-id")
+        }
+        exchange = {
+            "route": route_key(request.method, request.path),
+            "path": request.path,
+            "request": request.body.decode(errors="replace"),
+        }
+        start = time.monotonic()
+        try:
+            upstream_request = self.client.build_request(
+                request.method, request.path, content=request.body, headers=headers
+            )
+            upstream = await self.client.send(upstream_request, stream=True)
+        except httpx.HTTPError as e:
+            await response.send_json(502, {"detail": f"Upstream error: {e}"})
+            return
+
+        content_type = upstream.headers.get("content-type", "application/json")
+        exchange["status"] = upstream.status_code
+        exchange["content_type"] = content_type
+        try:
+            if content_type.startswith("text/event-stream"):
+                chunks = exchange["chunks"] = []
+                # Chunks can end inside a multi-byte character; the decoder
+                # holds the partial bytes back for the next chunk
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+                await response.start_stream(upstream.status_code)
+                async for data in upstream.aiter_bytes():
+                    text = decoder.decode(data)
+                    if text:
+                        chunks.append([round(time.monotonic() - start, 4), text])
+                    await response.write(data)
+                text = decoder.decode(b"", final=True)
+                if text:
+                    chunks.append([round(time.monotonic() - start, 4), text])
+                await response.end_stream()
+            else:
+                body = await upstream.aread()
+                exchange["body"] = body.decode("utf-8", errors="replace")
+                await response.send(upstream.status_code, body, content_type)
+        finally:
+            await upstream.aclose()
+            self.exchanges.append(exchange)
+            self._save()
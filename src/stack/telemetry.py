@@ -0,0 +1,227 @@
+"""Validation timing telemetry: JSON/JUnit reports and run history."""
+
+import json
+import statistics
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from pathlib import Path
+
+from stack.config import get_workspace_root
+
+STEP_NAMES = ("install", "build", "format", "lint", "test")
+
+# Number of runs kept in the history file
+MAX_HISTORY = 500
+
+# Recent runs compared against the older baseline when computing trends
+TREND_WINDOW = 5
+
+# A step is flagged when its recent median grows by this factor and by at
+# least TREND_MIN_DELTA seconds, so jitter on sub-second steps is ignored
+TREND_FACTOR = 1.25
+TREND_MIN_DELTA = 1.0
+
+# Statuses of steps that actually ran to completion, so their wall time counts
+EXECUTED_STATUSES = ("passed", "slow", "failed")
+
+# Variant of steps that ran their whole workload in one process. Test steps
+# may instead run sharded ("shards-N") or impact-selected ("impact-select")
+# or record coverage ("impact-record"), and their durations aren't comparable
+DEFAULT_VARIANT = "full"
+
+
+def get_history_path() -> Path:
+    """Get the path of the validation history file."""
+    return get_workspace_root() / "state" / "validate-history.jsonl"
+
+
+def build_report(results: dict, started_at: float, duration: float) -> dict:
+    """Build a JSON-serializable run report from validation results.
+
+    Args:
+        results: Per-repo results as produced by the validate command.
+        started_at: Run start as a Unix timestamp.
+        duration: Total wall time of the run in seconds.
+    """
+    repos = {}
+    for repo_key, result in results.items():
+        timings = result.get("timings", {})
+        steps = {}
+        for step_name in STEP_NAMES:
+            status = result.get(step_name)
+            if status is None:
+                continue
+            steps[step_name] = {"status": status, **timings.get(step_name, {})}
+            if f"{step_name}_shards" in result:
+                steps[step_name]["shards"] = result[f"{step_name}_shards"]
+            if f"{step_name}_variant" in result:
+                steps[step_name]["variant"] = result[f"{step_name}_variant"]
+        repos[repo_key] = {
+            "status": result.get("status"),
+            "details": result.get("details"),
+            "steps": steps,
+        }
+
+    return {
+        "started_at": datetime.fromtimestamp(started_at, timezone.utc).isoformat(),
+        "duration": round(duration, 3),
+        "repos": repos,
+    }
+
+
+def write_json_report(report: dict, path: Path) -> None:
+    """Write a run report as JSON."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2) + "\n")
+
+
+def write_junit_report(report: dict, path: Path) -> None:
+    """Write a run report as JUnit XML, one testsuite per repo and testcase per step."""
+    suites = ET.Element("testsuites", name="stack validate", time=str(report["duration"]))
+
+    for repo_key, repo in report["repos"].items():
+        steps = repo["steps"]
+        suite = ET.SubElement(suites, "testsuite", name=repo_key)
+        failures = skipped = 0
+        suite_time = 0.0
+
+        if not steps and repo.get("details"):
+            # Repos that never ran steps (missing, blocked, ...) become one skipped case
+            case = ET.SubElement(suite, "testcase", classname=repo_key, name="validate")
+            ET.SubElement(case, "skipped", message=repo["details"])
+            skipped += 1
+
+        for step_name, step in steps.items():
+            wall = step.get("wall", 0.0)
+            suite_time += wall
+            case = ET.SubElement(
+                suite,
+                "testcase",
+                classname=repo_key,
+                name=step_name,
+                time=f"{wall:.3f}",
+            )
+            status = step["status"]
+            if status in ("failed", "timeout"):
+                ET.SubElement(case, "failure", message=f"{step_name} {status}")
+                failures += 1
+            elif status in ("skipped", "cancelled"):
+                ET.SubElement(case, "skipped", message=status)
+                skipped += 1
+            elif status == "cached":
+                ET.SubElement(case, "system-out").text = "result replayed from cache"
+
+        suite.set("tests", str(len(suite)))
+        suite.set("failures", str(failures))
+        suite.set("skipped", str(skipped))
+        suite.set("time", f"{suite_time:.3f}")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    ET.indent(suites)
+    ET.ElementTree(suites).write(path, encoding="utf-8", xml_declaration=True)
+
+
+def append_history(report: dict) -> None:
+    """Append a run report to the history file, keeping the last MAX_HISTORY runs."""
+    path = get_history_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(report) + "\n")
+
+    lines = path.read_text().splitlines()
+    if len(lines) > MAX_HISTORY:
+        tmp_path = path.with_suffix(f".{time.time_ns()}.tmp")
+        tmp_path.write_text("\n".join(lines[-MAX_HISTORY:]) + "\n")
+        tmp_path.replace(path)
+
+
+def load_history() -> list[dict]:
+    """Load run reports from the history file, oldest first."""
+    path = get_history_path()
+    if not path.exists():
+        return []
+
+    history = []
+    for line in path.read_text().splitlines():
+        try:
+            history.append(json.loads(line))
+        except ValueError:
+            continue
+    return history
+
+
+def step_variant(step_name: str, step: dict) -> str | None:
+    """Return the variant a recorded step ran as, or None if it is unknown."""
+    if "variant" in step:
+        return step["variant"]
+    if "shards" in step:
+        return f"shards-{len(step['shards'])}"
+    # Older reports didn't record whether a test run was impact-selected
+    return None if step_name == "test" else DEFAULT_VARIANT
+
+
+def step_durations(
+    history: list[dict],
+) -> dict[tuple[str, str, str], list[float]]:
+    """Collect wall times of executed steps, oldest first.
+
+    Returns:
+        Wall times keyed by (repo, step, variant). Steps whose variant is
+        unknown are left out.
+    """
+    durations: dict[tuple[str, str, str], list[float]] = {}
+    for report in history:
+        for repo_key, repo in report.get("repos", {}).items():
+            for step_name, step in repo.get("steps", {}).items():
+                if step.get("status") not in EXECUTED_STATUSES or "wall" not in step:
+                    continue
+                variant = step_variant(step_name, step)
+                if variant is not None:
+                    key = (repo_key, step_name, variant)
+                    durations.setdefault(key, []).append(step["wall"])
+    return durations
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Return the pct-th percentile of values using linear interpolation."""
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def compute_trends(history: list[dict]) -> list[dict]:
+    """Summarize per-repo/per-step durations and flag steps that got slower.
+
+    Returns:
+        One row per (repo, step, variant) with the run count, overall median,
+        recent median, baseline median, and whether the step regressed.
+    """
+    rows = []
+    for (repo_key, step_name, variant), walls in sorted(
+        step_durations(history).items()
+    ):
+        recent = walls[-TREND_WINDOW:]
+        baseline = walls[:-TREND_WINDOW]
+        recent_median = statistics.median(recent)
+        baseline_median = statistics.median(baseline) if baseline else None
+        regressed = (
+            baseline_median is not None
+            and recent_median >= baseline_median * TREND_FACTOR
+            and recent_median - baseline_median >= TREND_MIN_DELTA
+        )
+        rows.append(
+            {
+                "repo": repo_key,
+                "step": step_name,
+                "variant": variant,
+                "runs": len(walls),
+                "median": statistics.median(walls),
+                "recent_median": recent_median,
+                "baseline_median": baseline_median,
+                "regressed": regressed,
+            }
+        )
+    return rows
@@ -0,0 +1,144 @@
+"""Shared fixtures for the stack cli tests."""
+
+import asyncio
+import contextlib
+import os
+import stat
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from stack.standin import API_PREFIX
+
+# Logs of three services around an hour boundary, as `docker compose logs
+# --timestamps --no-log-prefix` prints them
+SAMPLE_LOGS = {
+    "platform-api": [
+        '2026-10-17T10:59:59.950000000Z {"level": "info", '
+        '"message": "request started", "request_id": "req-1"}',
+        '2026-10-17T11:00:00.400000000Z {"level": "error", '
+        '"message": "upstream failed", "request_id": "req-1", "trace_id": "abc123"}',
+        '2026-10-17T11:00:01.000000000Z {"level": "info", '
+        '"message": "request started", "request_id": "req-2"}',
+    ],
+    "ai-orchestrator": [
+        '2026-10-17T11:00:00.200000000Z {"severity": "WARNING", '
+        '"msg": "slow model", "fields": {"request_id": "req-1"}}',
+        "2026-10-17T11:00:00.300000001Z INFO generating trace_id=abc123",
+        "2026-10-17T11:00:00.900000000Z plain line request_id=req-2",
+    ],
+    "web-app": ["2026-10-17T10:59:59.900000000Z GET /chat 200"],
+}
+
+
+@pytest.fixture
+def fake_docker(tmp_path, monkeypatch):
+    """Put a fake `docker` on PATH that runs the given shell script body.
+
+    The script's arguments are appended to `docker-calls` in its directory,
+    one invocation per line, so tests can check how docker was called.
+    """
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+    def install(body: str):
+        script = bin_dir / "docker"
+        script.write_text(
+            f'#!/bin/sh\necho "$*" >> "{bin_dir}/docker-calls"\n{body}\n'
+        )
+        script.chmod(script.stat().st_mode | stat.S_IEXEC)
+        return bin_dir / "docker-calls"
+
+    return install
+
+
+def git(cwd, *args: str) -> str:
+    """Run git in cwd and return its stdout, failing the test on error."""
+    result = subprocess.run(
+        ["git", *args], cwd=cwd, capture_output=True, text=True, check=True
+    )
+    return result.stdout
+
+
+@pytest.fixture
+def git_remote(tmp_path, monkeypatch):
+    """Create bare repositories in tmp_path, each with an initial commit.
+
+    Returns a function taking a name and returning (bare repo, work tree);
+    commits pushed from the work tree show up in the bare repo.
+    """
+    for name in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{name}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{name}_EMAIL", "test@example.com")
+    monkeypatch.setenv("GIT_CONFIG_GLOBAL", os.devnull)
+    monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+
+    def create(name: str) -> tuple[Path, Path]:
+        bare = tmp_path / "remotes" / f"{name}.git"
+        work = tmp_path / "work" / name
+        bare.mkdir(parents=True)
+        git(bare, "init", "--bare", "--initial-branch=main")
+        work.mkdir(parents=True)
+        git(work, "init", "--initial-branch=main")
+        git(work, "remote", "add", "origin", str(bare))
+        commit(work, "README", "initial\n")
+        git(work, "push", "--set-upstream", "origin", "main")
+        return bare, work
+
+    return create
+
+
+def commit(work: Path, filename: str, content: str) -> None:
+    """Write a file and commit it in a work tree."""
+    (work / filename).write_text(content)
+    git(work, "add", filename)
+    git(work, "commit", "--message", f"Update {filename}")
+
+
+@contextlib.asynccontextmanager
+async def serving(server):
+    """Serve a stand-in server on an ephemeral port and yield its API base URL."""
+    ready = asyncio.get_running_loop().create_future()
+    task = asyncio.create_task(
+        server.serve("127.0.0.1", 0, on_ready=ready.set_result)
+    )
+    host, port = await ready
+    try:
+        yield f"http://{host}:{port}{API_PREFIX}"
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+@pytest.fixture
+def compose_logs(fake_docker, tmp_path):
+    """Fake `docker compose logs` printing a fixed log per service.
+
+    Takes a mapping of service name to log lines (with docker timestamps)
+    and returns the docker-calls file. `--since` and `--follow` are
+    ignored; a service listed in `delays` sleeps that many seconds first.
+    """
+
+    def install(logs: dict[str, list[str]], delays: dict[str, float] | None = None):
+        logs_dir = tmp_path / "compose-logs"
+        logs_dir.mkdir(exist_ok=True)
+        for service, lines in logs.items():
+            log = "".join(f"{line}\n" for line in lines)
+            (logs_dir / f"{service}.log").write_text(log)
+        for service, seconds in (delays or {}).items():
+            (logs_dir / f"{service}.delay").write_text(str(seconds))
+        # The service is the last argument
+        return fake_docker(
+            "for service; do :; done\n"
+            f'dir="{logs_dir}"\n'
+            'if [ -f "$dir/$service.delay" ]; then\n'
+            '  sleep "$(cat "$dir/$service.delay")"\n'
+            "fi\n"
+            'cat "$dir/$service.log" 2>/dev/null\n'
+            "exit 0"
+        )
+
+    return install
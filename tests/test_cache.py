@@ -0,0 +1,98 @@
+"""Tests for the validation result cache."""
+
+import os
+
+import pytest
+from conftest import commit, git
+
+from stack import cache
+
+
+@pytest.fixture
+def workspace(monkeypatch, tmp_path):
+    """Keep cache entries under tmp_path and pin the toolchain versions."""
+    versions = {"python": "Python 3.14.0", "uv": "uv 0.9.0"}
+    monkeypatch.setattr(cache, "get_workspace_root", lambda: tmp_path)
+    monkeypatch.setattr(cache, "tool_version", lambda tool: versions.get(tool, ""))
+    return versions
+
+
+def test_fingerprint_tracks_commits_edits_and_untracked_files(git_remote):
+    _, repo = git_remote("api")
+    commit(repo, "app.py", "print('hello')\n")
+    committed = cache.tree_fingerprint(repo)
+
+    (repo / "app.py").write_text("print('edited')\n")
+    edited = cache.tree_fingerprint(repo)
+    (repo / "notes.py").write_text("")
+    untracked = cache.tree_fingerprint(repo)
+    (repo / "notes.py").write_text("x = 1\n")
+    untracked_edited = cache.tree_fingerprint(repo)
+
+    git(repo, "add", "--all")
+    git(repo, "commit", "--message", "Add notes")
+    recommitted = cache.tree_fingerprint(repo)
+
+    fingerprints = [committed, edited, untracked, untracked_edited, recommitted]
+    assert len(set(fingerprints)) == 5
+    assert cache.tree_fingerprint(repo) == recommitted
+
+
+def test_fingerprint_is_none_outside_git(tmp_path):
+    assert cache.tree_fingerprint(tmp_path) is None
+
+
+def test_step_key_changes_with_source_toolchain_and_upstream(workspace):
+    cmd = ["uv", "run", "pytest"]
+    trees = {"sdk": "sdk-1", "api": "api-1"}
+    tools = ["python", "uv"]
+    key = cache.step_key("api", trees, tools, cmd)
+
+    reordered = dict(reversed(trees.items()))
+    assert cache.step_key("api", reordered, tools[::-1], cmd) == key
+    # Own source, upstream source and command
+    assert cache.step_key("api", {**trees, "api": "api-2"}, tools, cmd) != key
+    assert cache.step_key("api", {**trees, "sdk": "sdk-2"}, tools, cmd) != key
+    assert cache.step_key("api", trees, tools, ["uv", "run", "ruff"]) != key
+
+    workspace["uv"] = "uv 0.9.1"
+    assert cache.step_key("api", trees, tools, cmd) != key
+
+
+def test_store_and_load_round_trip(workspace):
+    assert cache.load_result("missing") is None
+
+    cache.store_result("abc", {"status": "passed"})
+
+    entry = cache.load_result("abc")
+    assert entry["status"] == "passed"
+    assert "created" in entry
+    assert [path.name for path in cache.get_cache_dir().iterdir()] == ["abc.json"]
+
+
+def test_evict_removes_least_recently_used_entries(workspace):
+    for age, key in enumerate(["newest", "recent", "old", "oldest"]):
+        cache.store_result(key, {"status": "passed"})
+        mtime = 1_000_000 - age * 60
+        os.utime(cache.get_cache_dir() / f"{key}.json", (mtime, mtime))
+    # Loading an entry marks it as recently used
+    cache.load_result("oldest")
+
+    assert cache.evict(max_entries=2) == 2
+
+    remaining = sorted(path.stem for path in cache.get_cache_dir().glob("*.json"))
+    assert remaining == ["newest", "oldest"]
+
+
+def test_evict_enforces_the_size_bound(workspace):
+    for key in ["a", "b", "c"]:
+        cache.store_result(key, {"output": "x" * 100})
+    size = (cache.get_cache_dir() / "a.json").stat().st_size
+
+    assert cache.evict(max_bytes=size * 2) == 1
+    assert len(list(cache.get_cache_dir().glob("*.json"))) == 2
+    assert cache.evict(max_bytes=size * 2) == 0
+
+
+def test_evict_without_cache_dir(workspace):
+    assert cache.evict() == 0
@@ -0,0 +1,94 @@
+"""Tests for `stack clone` against local bare repositories."""
+
+import pytest
+from conftest import commit, git
+
+from stack.commands import clone as clone_cmd
+from stack.config import Repo, RepoGraph
+
+
+@pytest.fixture
+def use_repos(monkeypatch):
+    """Point the clone command at repos with the given urls and paths."""
+
+    def install(repos: dict[str, tuple[str | None, object]]) -> None:
+        graph = RepoGraph(
+            {
+                key: Repo(key, url, path, None, (), {})
+                for key, (url, path) in repos.items()
+            }
+        )
+        monkeypatch.setattr(clone_cmd, "get_repo_graph", lambda: graph)
+
+    return install
+
+
+def test_clones_missing_repos_and_skips_existing(git_remote, use_repos, tmp_path):
+    api, _ = git_remote("api")
+    web, _ = git_remote("web")
+    existing = tmp_path / "checkouts" / "web"
+    existing.mkdir(parents=True)
+    use_repos(
+        {
+            "api": (str(api), tmp_path / "checkouts" / "api"),
+            "web": (str(web), existing),
+        }
+    )
+
+    clone_cmd.clone(jobs=2)
+
+    api_checkout = tmp_path / "checkouts" / "api"
+    assert (api_checkout / "README").read_text() == "initial\n"
+    assert git(api_checkout, "rev-parse", "HEAD") == git(api, "rev-parse", "main")
+    assert list(existing.iterdir()) == []
+
+
+def test_shallow_partial_clone(git_remote, use_repos, tmp_path):
+    bare, work = git_remote("api")
+    commit(work, "README", "second\n")
+    git(work, "push")
+    checkout = tmp_path / "checkouts" / "api"
+    use_repos({"api": (bare.as_uri(), checkout)})
+
+    clone_cmd.clone(partial=True, depth=1)
+
+    assert git(checkout, "rev-list", "--count", "HEAD").strip() == "1"
+    assert git(checkout, "config", "remote.origin.partialclonefilter").strip() == (
+        "blob:none"
+    )
+    assert (checkout / "README").read_text() == "second\n"
+
+
+def test_mirror_cache_is_created_then_refreshed(git_remote, use_repos, tmp_path):
+    bare, work = git_remote("api")
+    mirrors = tmp_path / "mirrors"
+    first = tmp_path / "one" / "api"
+    use_repos({"api": (str(bare), first)})
+    clone_cmd.clone(mirror_cache=mirrors)
+
+    (mirror,) = mirrors.iterdir()
+    alternates = first / ".git" / "objects" / "info" / "alternates"
+    assert alternates.read_text().strip() == str(mirror / "objects")
+
+    # A second workspace refreshes the mirror and sees the new commit
+    commit(work, "README", "second\n")
+    git(work, "push")
+    second = tmp_path / "two" / "api"
+    use_repos({"api": (str(bare), second)})
+    clone_cmd.clone(mirror_cache=mirrors)
+
+    assert list(mirrors.iterdir()) == [mirror]
+    assert (second / "README").read_text() == "second\n"
+
+
+def test_failed_clone_exits_non_zero(use_repos, tmp_path):
+    use_repos(
+        {
+            "gone": (str(tmp_path / "missing.git"), tmp_path / "gone"),
+            "unset": (None, tmp_path / "unset"),
+        }
+    )
+    with pytest.raises(SystemExit) as exc:
+        clone_cmd.clone()
+    assert exc.value.code == 1
+    assert not (tmp_path / "unset").exists()
@@ -0,0 +1,126 @@
+"""Tests for the repo graph built from repos.yaml."""
+
+import pytest
+
+from stack import config
+from stack.config import Repo, RepoGraph
+
+# Declared out of dependency order: web -> api -> sdk, docs stands alone
+REPOS_YAML = """\
+repos:
+  web:
+    url: git@example.com:web.git
+    depends_on: [api, missing]
+  api:
+    path: services/api
+    depends_on: [sdk]
+    timeouts:
+      test: 600
+  sdk:
+  docs:
+"""
+
+
+@pytest.fixture
+def workspace(monkeypatch, tmp_path):
+    """A workspace in tmp_path with the repos.yaml above."""
+    monkeypatch.setattr(config, "get_workspace_root", lambda: tmp_path)
+    monkeypatch.setattr(config, "_graph_cache", None)
+    (tmp_path / "repos.yaml").write_text(REPOS_YAML)
+    return tmp_path
+
+
+def _graph(dependencies: dict[str, tuple[str, ...]]) -> RepoGraph:
+    return RepoGraph(
+        {
+            key: Repo(key, None, config.get_workspace_root() / key, None, deps, {})
+            for key, deps in dependencies.items()
+        }
+    )
+
+
+def test_builds_repos_from_repos_yaml(workspace):
+    graph = config.get_repo_graph()
+
+    assert list(graph) == ["web", "api", "sdk", "docs"]
+    assert graph["web"].url == "git@example.com:web.git"
+    assert graph["web"].depends_on == ("api",)
+    assert graph["api"].path == (workspace / "services" / "api").resolve()
+    assert graph["api"].timeouts == {"test": 600.0}
+    assert graph["sdk"].path == (workspace.parent / "sdk").resolve()
+    assert config.get_repo_path("api") == graph["api"].path
+    with pytest.raises(ValueError, match="Unknown repository: missing"):
+        config.get_repo_path("missing")
+
+
+def test_graph_is_reread_only_when_repos_yaml_changes(workspace):
+    graph = config.get_repo_graph()
+    assert config.get_repo_graph() is graph
+
+    (workspace / "repos.yaml").write_text("repos:\n  sdk:\n")
+
+    assert list(config.get_repo_graph()) == ["sdk"]
+
+
+def test_missing_repos_yaml(workspace):
+    (workspace / "repos.yaml").unlink()
+
+    with pytest.raises(FileNotFoundError, match="repos.yaml not found"):
+        config.get_repo_graph()
+
+
+def test_order_puts_upstreams_first(workspace):
+    graph = config.get_repo_graph()
+
+    assert graph.order == ("sdk", "api", "web", "docs")
+    assert graph.dependents == {
+        "web": (),
+        "api": ("web",),
+        "sdk": ("api",),
+        "docs": (),
+    }
+
+
+def test_rejects_dependency_cycles(workspace):
+    with pytest.raises(ValueError, match="cycle in repos.yaml: a -> b -> c -> a"):
+        _graph({"a": ("b",), "b": ("c",), "c": ("a",), "d": ()})
+
+
+def test_with_dependents_expands_transitively(workspace):
+    graph = config.get_repo_graph()
+
+    assert graph.with_dependents(["sdk"]) == ["web", "api", "sdk"]
+    assert graph.with_dependents(["api", "docs"]) == ["web", "api", "docs"]
+    assert graph.with_dependents(["web"]) == ["web"]
+    assert graph.with_dependents([]) == []
+
+
+def test_sources_include_transitive_upstreams(workspace):
+    graph = config.get_repo_graph()
+
+    assert graph.sources("web") == ["sdk", "api", "web"]
+    assert graph.sources("docs") == ["docs"]
+
+
+def test_upstreams_skip_unselected_repos(workspace):
+    graph = config.get_repo_graph()
+
+    assert graph.upstreams(["web", "api", "sdk"]) == {
+        "web": ["api"],
+        "api": ["sdk"],
+        "sdk": [],
+    }
+    # web still waits for sdk through the unselected api
+    assert graph.upstreams(["sdk", "web", "docs"]) == {
+        "sdk": [],
+        "web": ["sdk"],
+        "docs": [],
+    }
+
+
+def test_upstreams_follow_diamonds_once(workspace):
+    graph = _graph(
+        {"app": ("left", "right"), "left": ("base",), "right": ("base",), "base": ()}
+    )
+
+    assert graph.upstreams(["base", "app"]) == {"base": [], "app": ["base"]}
@@ -0,0 +1,195 @@
+"""Tests for the container state model and `stack status`, with a fake docker."""
+
+import json
+
+import pytest
+
+from stack import containers
+from stack.commands import status as status_cmd
+
+PROJECT = "platform-stack"
+
+PS = [
+    {
+        "Service": "platform-api",
+        "Name": "platform-stack-platform-api-1",
+        "State": "running",
+        "Health": "healthy",
+        "ExitCode": 0,
+        "Project": PROJECT,
+    },
+    {
+        "Service": "migrate",
+        "Name": "platform-stack-migrate-1",
+        "State": "exited",
+        "Health": "",
+        "ExitCode": 0,
+        "Project": PROJECT,
+    },
+    {
+        "Service": "web-app",
+        "Name": "platform-stack-web-app-1",
+        "State": "created",
+        "Health": "",
+        "ExitCode": 0,
+        "Project": PROJECT,
+    },
+]
+
+STATS = {
+    "Name": "platform-stack-platform-api-1",
+    "CPUPerc": "12.50%",
+    "MemUsage": "64MiB / 2GiB",
+    "NetIO": "1.5kB / 3kB",
+}
+
+
+def _event(service: str, action: str, time_nano: int | None = None, **attributes):
+    event = {
+        "Type": "container",
+        "Action": action,
+        "Actor": {
+            "Attributes": {
+                "com.docker.compose.service": service,
+                "name": f"{PROJECT}-{service}-1",
+                **attributes,
+            }
+        },
+    }
+    if time_nano is not None:
+        event["timeNano"] = time_nano
+    return event
+
+
+@pytest.fixture
+def docker_stack(fake_docker, tmp_path):
+    """A fake docker answering compose ps, events and stats for PS."""
+
+    def install(events: list[dict]):
+        data = tmp_path / "docker-data"
+        data.mkdir(exist_ok=True)
+        (data / "ps").write_text("".join(json.dumps(e) + "\n" for e in PS))
+        (data / "events").write_text("".join(json.dumps(e) + "\n" for e in events))
+        (data / "stats").write_text(json.dumps(STATS) + "\n")
+        return fake_docker(
+            'case "$*" in\n'
+            f'  *" ps "*) cat "{data}/ps" ;;\n'
+            f'  events*) cat "{data}/events" ;;\n'
+            f'  stats*) cat "{data}/stats" ;;\n'
+            "esac"
+        )
+
+    return install
+
+
+@pytest.fixture
+def model(docker_stack, tmp_path):
+    docker_stack([])
+    return containers.StackModel.from_compose(tmp_path)
+
+
+def test_seeds_from_compose_ps(model):
+    assert model.project == PROJECT
+    assert model.seeded_at is not None
+    assert model.running_containers() == {
+        "platform-stack-platform-api-1": "platform-api"
+    }
+    api = model.services["platform-api"]
+    assert (api.state, api.health, api.exit_code) == ("running", "healthy", None)
+    assert model.services["migrate"].exit_code == 0
+
+
+def test_crash_restart_and_health_transitions(model):
+    api = model.services["platform-api"]
+    model.apply_stats([STATS], sampled_at=1.0)
+    assert api.mem_bytes == 64 * 1024**2
+
+    died = _event("platform-api", "die", 5_000_000_000, exitCode="137")
+    assert model.apply_event(died) == "platform-api"
+    assert (api.state, api.exit_code, api.changed_at) == ("exited", 137, 5.0)
+    # Usage of a stopped container is stale
+    assert api.mem_bytes is None and api.sampled_at is None
+
+    assert model.apply_event(_event("platform-api", "start")) == "platform-api"
+    assert (api.state, api.health, api.exit_code) == ("running", "starting", None)
+
+    model.apply_event(_event("platform-api", "health_status: healthy"))
+    assert api.health == "healthy"
+
+
+def test_events_that_change_nothing_are_ignored(model):
+    assert model.apply_event(_event("migrate", "die", exitCode="0")) is None
+    assert model.apply_event(_event("platform-api", "exec_start: sh")) is None
+    assert model.apply_event({**_event("platform-api", "die"), "Type": "image"}) is None
+    assert model.apply_event({"Type": "container", "Action": "start"}) is None
+
+
+def test_events_for_new_services_add_them(model):
+    assert model.apply_event(_event("worker", "create")) == "worker"
+    assert model.apply_event(_event("worker", "start")) == "worker"
+    worker = model.services["worker"]
+    assert (worker.state, worker.container) == ("running", f"{PROJECT}-worker-1")
+    assert model.apply_event(_event("worker", "destroy")) == "worker"
+    assert worker.state == "removed"
+
+
+def test_stats_only_apply_to_running_containers(model):
+    other = {**STATS, "Name": "platform-stack-web-app-1"}
+    bad = {**STATS, "CPUPerc": "--", "Name": "platform-stack-platform-api-1"}
+    assert model.apply_stats([STATS, other], sampled_at=2.0) == ["platform-api"]
+    api = model.services["platform-api"]
+    assert (api.cpu_percent, api.net_rx, api.net_tx) == (12.5, 1500, 3000)
+    assert api.mem_limit == 2 * 1024**3
+    model.apply_stats([bad], sampled_at=3.0)
+    assert api.cpu_percent is None
+
+
+def test_start_events_replays_from_before_the_snapshot(docker_stack):
+    calls = docker_stack([_event("web-app", "start")])
+    process = containers.start_events(PROJECT, since=100.0)
+    lines = process.stdout.read().splitlines()
+    process.wait()
+
+    assert [json.loads(line)["Action"] for line in lines] == ["start"]
+    args = calls.read_text().splitlines()[-1]
+    assert f"label=com.docker.compose.project={PROJECT}" in args
+    assert args.endswith(f"--since {100.0 - containers.EVENTS_OVERLAP:.3f}")
+
+
+def test_live_status_applies_events(docker_stack, monkeypatch, capsys, tmp_path):
+    docker_stack(
+        [
+            {"Type": "image", "Action": "pull"},
+            _event("web-app", "start"),
+            _event("platform-api", "die", exitCode="1"),
+        ]
+    )
+    monkeypatch.setattr(status_cmd, "get_platform_stack_path", lambda: tmp_path)
+
+    status_cmd.status(live=True, json_output=True, interval=60, duration=5)
+
+    snapshots = [
+        json.loads(line)
+        for line in capsys.readouterr().out.splitlines()
+        if line.startswith("{")
+    ]
+    reasons = [s["reason"] for s in snapshots]
+    assert reasons[0] == "snapshot"
+    assert [r for r in reasons if r.startswith("event:")] == [
+        "event:web-app",
+        "event:platform-api",
+    ]
+    final = snapshots[-1]["services"]
+    assert final["web-app"]["state"] == "running"
+    assert (final["platform-api"]["state"], final["platform-api"]["exit_code"]) == (
+        "exited",
+        1,
+    )
+
+
+def test_parse_size():
+    assert containers.parse_size("12.5MiB") == int(12.5 * 1024**2)
+    assert containers.parse_size("3.4kB") == 3400
+    assert containers.parse_size("0B") == 0
+    assert containers.parse_size("lots") is None
+    assert containers.parse_size("1XB") is None
@@ -0,0 +1,127 @@
+"""Tests for selecting the tests impacted by a change."""
+
+import json
+
+import pytest
+from conftest import commit, git
+
+from stack import impact
+
+COVERAGE = {
+    "tests/test_app.py::test_run": ["app.py", "util.py"],
+    "tests/test_app.py::test_help": ["app.py"],
+    "tests/test_util.py::test_parse": ["util.py"],
+}
+
+
+@pytest.fixture
+def repo(git_remote, monkeypatch, tmp_path):
+    """A work tree whose coverage map was recorded at its latest commit."""
+    monkeypatch.setattr(impact, "get_workspace_root", lambda: tmp_path)
+    _, work = git_remote("api")
+    (work / "tests").mkdir()
+    for path in ["app.py", "util.py", "pyproject.toml", *COVERAGE]:
+        (work / path.split("::", 1)[0]).write_text("")
+    git(work, "add", "--all")
+    git(work, "commit", "--message", "Add sources")
+    impact.save_map("api", work, COVERAGE)
+    return work
+
+
+def test_selects_tests_covering_changed_files(repo):
+    (repo / "app.py").write_text("changed = True\n")
+
+    selection, reason = impact.select_tests("api", repo)
+
+    assert selection == ["tests/test_app.py::test_run", "tests/test_app.py::test_help"]
+    assert reason == "2 impacted test(s)/file(s) for 1 changed file(s)"
+
+
+def test_changed_test_files_run_whole(repo):
+    (repo / "tests" / "test_util.py").write_text("def test_new(): pass\n")
+    (repo / "tests" / "test_cli.py").write_text("def test_cli(): pass\n")
+
+    selection, _ = impact.select_tests("api", repo)
+
+    assert selection == ["tests/test_cli.py", "tests/test_util.py"]
+
+
+def test_committed_changes_count_since_the_recorded_commit(repo):
+    commit(repo, "util.py", "changed = True\n")
+
+    selection, _ = impact.select_tests("api", repo)
+
+    assert selection == [
+        "tests/test_app.py::test_run",
+        "tests/test_util.py::test_parse",
+    ]
+
+
+def test_no_changes_select_nothing(repo):
+    assert impact.select_tests("api", repo)[0] == []
+
+
+def test_large_selections_fall_back_to_files(repo, monkeypatch):
+    monkeypatch.setattr(impact, "MAX_NODE_IDS", 1)
+    (repo / "util.py").write_text("changed = True\n")
+
+    selection, _ = impact.select_tests("api", repo)
+
+    assert selection == ["tests/test_app.py", "tests/test_util.py"]
+
+
+def test_missing_map_runs_everything(repo):
+    impact.get_map_path("api").unlink()
+
+    assert impact.select_tests("api", repo) == (None, "no coverage map recorded")
+
+
+def test_outdated_map_runs_everything(repo):
+    path = impact.get_map_path("api")
+    recorded = json.loads(path.read_text())
+    path.write_text(json.dumps({**recorded, "version": impact.IMPACT_VERSION - 1}))
+
+    assert impact.select_tests("api", repo) == (
+        None,
+        "coverage map format is outdated",
+    )
+
+
+def test_map_from_another_branch_runs_everything(repo):
+    git(repo, "checkout", "-b", "feature")
+    commit(repo, "app.py", "feature = True\n")
+    impact.save_map("api", repo, COVERAGE)
+    git(repo, "checkout", "main")
+
+    assert impact.select_tests("api", repo) == (
+        None,
+        "coverage map was recorded on another branch",
+    )
+
+
+def test_config_changes_run_everything(repo):
+    (repo / "pyproject.toml").write_text("[project]\n")
+    (repo / "app.py").write_text("changed = True\n")
+
+    assert impact.select_tests("api", repo) == (
+        None,
+        "config changed: pyproject.toml",
+    )
+
+
+def test_unmapped_files_run_everything(repo):
+    (repo / "templates.html").write_text("<p></p>\n")
+    (repo / "app.py").write_text("changed = True\n")
+
+    assert impact.select_tests("api", repo) == (
+        None,
+        "not in the coverage map: templates.html",
+    )
+
+
+def test_empty_coverage_is_not_saved(repo):
+    impact.get_map_path("api").unlink()
+
+    impact.save_map("api", repo, {})
+
+    assert not impact.get_map_path("api").exists()
@@ -0,0 +1,78 @@
+"""Import-time budgets for the CLI entry point and lightweight commands.
+
+cli.py imports command modules inside the command functions, so `stack`
+only pays for the dependencies of the command it runs. These tests keep
+that from regressing, both for the entry point and for commands such as
+`stack logs` and `stack prompt` that must not pull in the HTTP client or
+the YAML and template libraries.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+# Cumulative import time of stack.cli, in microseconds (about 40ms today)
+BUDGET_US = 100_000
+
+# Import time of a lightweight command module once stack.cli is imported, in
+# microseconds (about 100ms for logs, most of it asyncio and rich.console)
+COMMAND_BUDGET_US = 150_000
+
+# Modules only some commands need
+DEFERRED_MODULES = ("httpx", "jinja2", "yaml", "rich.table")
+
+# Dependencies that commands without HTTP, repos.yaml or template work skip
+HEAVY_MODULES = ("httpx", "jinja2", "yaml")
+
+LIGHT_COMMANDS = ("stack.commands.logs", "stack.commands.prompt")
+
+
+def _import_times(*modules: str) -> dict[str, int]:
+    """Import modules in order in a fresh interpreter; return cumulative times."""
+    env = {**os.environ, "PYTHONPATH": str(SRC_DIR)}
+    statement = "; ".join(f"import {module}" for module in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_defers_command_dependencies():
+    imported = _import_times("stack.cli")
+    assert "stack.cli" in imported
+    assert [name for name in DEFERRED_MODULES if name in imported] == []
+
+
+def test_cli_import_within_budget():
+    # The best of a few runs, so a cold bytecode cache or a busy machine
+    # doesn't fail the test
+    best = min(_import_times("stack.cli")["stack.cli"] for _ in range(3))
+    assert best < BUDGET_US, f"importing stack.cli took {best / 1000:.1f}ms"
+
+
+@pytest.mark.parametrize("module", LIGHT_COMMANDS)
+def test_light_commands_defer_heavy_dependencies(module):
+    imported = _import_times("stack.cli", module)
+    assert module in imported
+    assert [name for name in HEAVY_MODULES if name in imported] == []
+
+
+@pytest.mark.parametrize("module", LIGHT_COMMANDS)
+def test_light_command_import_within_budget(module):
+    best = min(_import_times("stack.cli", module)[module] for _ in range(3))
+    assert best < COMMAND_BUDGET_US, f"importing {module} took {best / 1000:.1f}ms"
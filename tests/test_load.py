@@ -0,0 +1,83 @@
+"""Tests for `stack load` driven against the synthetic stand-in."""
+
+import asyncio
+import time
+
+from conftest import serving
+
+from stack.commands.load import _RateLimiter, _run_load, _summarize
+from stack.standin import SyntheticServer
+
+
+async def _load(sessions: int, turns: int, max_rps: float | None = None) -> dict:
+    server = SyntheticServer(text="one two three", tokens_per_s=1000, ttft=0.01)
+    async with serving(server) as base_url:
+        return await _run_load(sessions, turns, 0.0, max_rps, base_url, "hi")
+
+
+def test_summary_counts_sessions_turns_and_tokens():
+    summary = _summarize(asyncio.run(_load(sessions=3, turns=2)))
+
+    assert (summary["sessions"], summary["turns"], summary["requests"]) == (3, 6, 9)
+    assert summary["errors"] == {}
+    assert summary["error_rate"] == 0.0
+    metrics = summary["metrics"]
+    assert metrics["session_create"]["count"] == 3
+    assert metrics["ttft"]["count"] == 6
+    # Three tokens per turn leave two gaps between them
+    assert metrics["inter_token"]["count"] == 12
+    assert metrics["server_time"]["count"] == 6
+    assert metrics["ttft"]["p50"] >= 0.01
+
+
+def test_max_rps_spaces_out_turn_starts():
+    start = time.monotonic()
+    results = asyncio.run(_load(sessions=4, turns=1, max_rps=20))
+    # Four turns at most 20/s apart: the last starts 150ms after the first
+    assert time.monotonic() - start >= 0.15
+    assert all(turn["error"] is None for turn in results["turns"])
+
+
+def test_failed_sessions_count_as_errors():
+    async def run() -> dict:
+        # Nothing listens on the port once the server is stopped
+        async with serving(SyntheticServer()) as base_url:
+            pass
+        return await _run_load(2, 1, 0.0, None, base_url, "hi")
+
+    summary = _summarize(asyncio.run(run()))
+    assert summary["turns"] == 0
+    assert summary["error_rate"] == 1.0
+    assert summary["errors"] == {"ConnectError": 2}
+
+
+def test_rate_limiter_without_rate_does_not_wait():
+    async def acquire_all(limiter: _RateLimiter) -> float:
+        start = time.monotonic()
+        for _ in range(5):
+            await limiter.acquire()
+        return time.monotonic() - start
+
+    assert asyncio.run(acquire_all(_RateLimiter(None))) < 0.05
+    assert asyncio.run(acquire_all(_RateLimiter(50))) >= 0.08
+
+
+class _BadSessions(SyntheticServer):
+    """Answers session creation with a 2xx body that isn't a JSON object."""
+
+    def __init__(self, bodies: list[bytes]) -> None:
+        super().__init__()
+        self.bodies = bodies
+
+    async def handle(self, request, response) -> None:
+        await response.send(201, self.bodies.pop(0), "application/json")
+
+
+def test_invalid_session_bodies_count_as_errors():
+    async def run() -> dict:
+        async with serving(_BadSessions([b"<html>", b"[1, 2]"])) as base_url:
+            return await _run_load(2, 1, 0.0, None, base_url, "hi")
+
+    summary = _summarize(asyncio.run(run()))
+    assert summary["turns"] == 0
+    assert summary["errors"] == {"invalid JSON": 2}
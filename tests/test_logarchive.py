@@ -0,0 +1,225 @@
+"""Capture, index and search round trips through the log archive."""
+
+import json
+from datetime import datetime, timezone
+
+import pytest
+from conftest import SAMPLE_LOGS
+
+from stack import logarchive, logstream
+from stack.commands import logs as logs_cmd
+
+
+def _ts(text: str) -> float:
+    return datetime.fromisoformat(text).replace(tzinfo=timezone.utc).timestamp()
+
+
+@pytest.fixture
+def archive(compose_logs, tmp_path):
+    """Capture SAMPLE_LOGS into an archive; returns (archive dir, docker-calls)."""
+    calls = compose_logs(SAMPLE_LOGS)
+    root = tmp_path / "archive"
+    assert logs_cmd.capture_logs(tmp_path, root) == 7
+    return root, calls
+
+
+def test_capture_partitions_by_hour_and_indexes_terms(archive):
+    root, _ = archive
+    partitions = sorted(p.name for p in root.iterdir() if p.is_dir())
+    assert partitions == ["20261017T10", "20261017T11"]
+
+    index = json.loads((root / "20261017T11" / "index.json").read_text())
+    services = sorted(meta["service"] for meta in index["segments"].values())
+    assert services == ["ai-orchestrator", "platform-api"]
+    assert set(index["terms"]) == {
+        "request_id:req-1",
+        "request_id:req-2",
+        "trace_id:abc123",
+        "level:info",
+        "level:warn",
+        "level:error",
+    }
+    watermarks = json.loads((root / "watermarks.json").read_text())
+    assert watermarks["web-app"] == {
+        "ts": pytest.approx(_ts("2026-10-17T10:59:59.9")),
+        "lines": ["GET /chat 200"],
+    }
+
+
+def test_recapture_resumes_at_the_watermark(archive, tmp_path):
+    root, calls = archive
+    assert logs_cmd.capture_logs(tmp_path, root) == 0
+
+    last_call = {line.split()[-1]: line for line in calls.read_text().splitlines()}
+    assert "--since 2026-10-17T10:59:59.9" in last_call["web-app"]
+    assert len(logarchive.search(root)) == 7
+
+
+def test_search_by_request_id_across_partitions(archive):
+    root, _ = archive
+    records = logarchive.search(root, request_id="req-1")
+    assert [(r.service, r.message) for r in records] == [
+        ("platform-api", "request started"),
+        ("ai-orchestrator", "slow model"),
+        ("platform-api", "upstream failed"),
+    ]
+    assert records[0].timestamp == pytest.approx(_ts("2026-10-17T10:59:59.95"))
+    assert records[2].trace_id == "abc123"
+
+    traced = logarchive.search(root, request_id="abc123")
+    assert [r.message for r in traced] == [
+        "INFO generating trace_id=abc123",
+        "upstream failed",
+    ]
+    assert logarchive.search(root, request_id="nope") == []
+
+
+def test_search_filters_combine(archive):
+    root, _ = archive
+    warnings = logarchive.search(root, min_level="warn")
+    assert [r.level for r in warnings] == ["warn", "error"]
+
+    records = logarchive.search(root, request_id="req-1", min_level="error")
+    assert [r.message for r in records] == ["upstream failed"]
+
+    records = logarchive.search(root, services=["web-app", "ai-orchestrator"])
+    assert {r.service for r in records} == {"web-app", "ai-orchestrator"}
+    assert len(records) == 4
+
+
+def test_search_time_range(archive):
+    root, _ = archive
+    since = _ts("2026-10-17T11:00:00.25")
+    until = _ts("2026-10-17T11:00:00.95")
+    records = logarchive.search(root, since=since, until=until)
+    assert [r.message for r in records] == [
+        "INFO generating trace_id=abc123",
+        "upstream failed",
+        "plain line request_id=req-2",
+    ]
+    before_the_hour = logarchive.search(root, until=_ts("2026-10-17T10:59:59.99"))
+    assert [r.service for r in before_the_hour] == ["web-app", "platform-api"]
+
+
+def test_retention_deletes_oldest_segments_first(archive):
+    root, _ = archive
+    size = logarchive.archive_size(root)
+    assert size > 0
+
+    assert logarchive.enforce_retention(root, max_bytes=size - 1) == 1
+    assert "web-app" not in {r.service for r in logarchive.search(root)}
+    assert len(logarchive.search(root)) == 6
+
+    removed = logarchive.enforce_retention(root, max_bytes=0)
+    assert removed == 3
+    assert logarchive.search(root) == []
+    assert [p.name for p in root.iterdir()] == ["watermarks.json"]
+
+
+def test_full_segments_are_written_while_capturing(
+    compose_logs, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(logarchive, "SEGMENT_RECORDS", 1)
+    compose_logs(SAMPLE_LOGS)
+    root = tmp_path / "archive"
+    logs_cmd.capture_logs(tmp_path, root)
+
+    index = json.loads((root / "20261017T11" / "index.json").read_text())
+    assert len(index["segments"]) == 5
+    # Each posting points at the only line of its segment
+    assert all(
+        lines == [0]
+        for postings in index["terms"].values()
+        for lines in postings.values()
+    )
+    assert len(logarchive.search(root, request_id="req-1")) == 3
+
+
+def test_logs_capture_stores_lines_the_filter_hides(
+    compose_logs, tmp_path, monkeypatch, capsys
+):
+    compose_logs(SAMPLE_LOGS)
+    monkeypatch.setattr(logs_cmd, "get_platform_stack_path", lambda: tmp_path)
+    root = tmp_path / "archive"
+
+    logs_cmd.logs(request_id="req-2", capture=True, archive=root)
+    printed = capsys.readouterr().out
+    assert "plain line request_id=req-2" in printed
+    assert "slow model" not in printed
+    assert "Captured 7 line(s)" in printed
+
+    logs_cmd.logs_search(request_id="req-1", archive=root)
+    assert "3 line(s) from 2 service(s)" in capsys.readouterr().out
+
+
+def test_parse_time():
+    assert logarchive.parse_time("5m", now=1000.0) == 700.0
+    assert logarchive.parse_time("1.5h", now=10_000.0) == 4600.0
+    assert logarchive.parse_time("2026-10-17T11:00:00") == _ts("2026-10-17T11:00")
+    assert logarchive.parse_time("2026-10-17T13:00:00+02:00") == _ts(
+        "2026-10-17T11:00"
+    )
+    with pytest.raises(ValueError):
+        logarchive.parse_time("yesterday")
+
+
+def test_recapture_keeps_new_lines_sharing_the_watermark(compose_logs, tmp_path):
+    root = tmp_path / "archive"
+    line = "2026-10-17T11:00:00.500000000Z first"
+    compose_logs({"web-app": [line]})
+    logs_cmd.capture_logs(tmp_path, root)
+
+    # The second capture sees the same line again plus one more at its time
+    compose_logs({"web-app": [line, "2026-10-17T11:00:00.500000000Z second"]})
+    assert logs_cmd.capture_logs(tmp_path, root) == 1
+    assert logs_cmd.capture_logs(tmp_path, root) == 0
+    assert [r.message for r in logarchive.search(root)] == ["first", "second"]
+
+
+def test_watermark_waits_for_every_buffer_to_be_written(tmp_path, monkeypatch):
+    monkeypatch.setattr(logarchive, "SEGMENT_RECORDS", 2)
+    root = tmp_path / "archive"
+    writer = logarchive.ArchiveWriter(root)
+    lines = [
+        "2026-10-17T10:59:59.000000000Z early",
+        "2026-10-17T11:00:00.000000000Z late 1",
+        "2026-10-17T11:00:01.000000000Z late 2",
+    ]
+    for line in lines:
+        writer.add(logstream.parse_line("web-app", line))
+
+    # The 11:00 segment is full and written, but the 10:59 record is only
+    # buffered: an interrupted capture must not skip it next time
+    assert writer.written == 2
+    assert writer.watermarks == {}
+    assert not (root / "watermarks.json").exists()
+    resumed = logarchive.ArchiveWriter(root)
+    resumed.add(logstream.parse_line("web-app", lines[0]))
+    resumed.flush()
+    assert [r.message for r in logarchive.search(root)] == [
+        "early",
+        "late 1",
+        "late 2",
+    ]
+    assert resumed.watermarks == {"web-app": _ts("2026-10-17T10:59:59")}
+
+
+def test_legacy_watermarks_skip_their_whole_timestamp(tmp_path):
+    root = tmp_path / "archive"
+    root.mkdir()
+    mark = _ts("2026-10-17T11:00")
+    (root / "watermarks.json").write_text(json.dumps({"web-app": mark}))
+    writer = logarchive.ArchiveWriter(root)
+    writer.add(logstream.parse_line("web-app", "2026-10-17T11:00:00Z old"))
+    writer.add(logstream.parse_line("web-app", "2026-10-17T11:00:01Z new"))
+    writer.flush()
+    assert [r.message for r in logarchive.search(root)] == ["new"]
+
+
+def test_format_since_rounds_down_to_the_microsecond():
+    assert logarchive.format_since(_ts("2026-10-17T11:00")) == (
+        "2026-10-17T11:00:00.000000Z"
+    )
+    assert logarchive.format_since(_ts("2026-10-17T11:00") + 0.0000015) == (
+        "2026-10-17T11:00:00.000001Z"
+    )
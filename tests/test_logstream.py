@@ -0,0 +1,162 @@
+"""Tests for interleaved log streaming, with a fake docker compose."""
+
+import asyncio
+
+import pytest
+from conftest import SAMPLE_LOGS
+
+from stack import logstream
+from stack.logstream import Interleaver, LogRecord, matches, parse_line
+
+SERVICES = list(SAMPLE_LOGS)
+
+
+def _stream(stack_path, **kwargs) -> tuple[list[LogRecord], list[LogRecord]]:
+    """Collect the streamed records and every record passed to the sink."""
+    seen: list[LogRecord] = []
+
+    async def collect() -> list[LogRecord]:
+        return [
+            record
+            async for record in logstream.stream_logs(
+                stack_path, SERVICES, sink=seen.append, **kwargs
+            )
+        ]
+
+    return asyncio.run(collect()), seen
+
+
+def _messages(records: list[LogRecord]) -> list[str]:
+    return [record.message for record in records]
+
+
+ALL_IN_ORDER = [
+    "GET /chat 200",
+    "request started",
+    "slow model",
+    "INFO generating trace_id=abc123",
+    "upstream failed",
+    "plain line request_id=req-2",
+    "request started",
+]
+
+
+def test_interleaves_services_by_docker_timestamp(compose_logs, tmp_path):
+    compose_logs(SAMPLE_LOGS)
+    records, seen = _stream(tmp_path)
+
+    assert _messages(records) == ALL_IN_ORDER
+    timestamps = [record.timestamp for record in records]
+    assert timestamps == sorted(timestamps)
+    assert len(seen) == len(records)
+
+
+def test_request_id_filter_matches_request_and_trace_ids(compose_logs, tmp_path):
+    compose_logs(SAMPLE_LOGS)
+
+    records, seen = _stream(tmp_path, request_id="req-1")
+    assert [(r.service, r.message) for r in records] == [
+        ("platform-api", "request started"),
+        ("ai-orchestrator", "slow model"),
+        ("platform-api", "upstream failed"),
+    ]
+    # The sink still gets every line, e.g. for capturing
+    assert len(seen) == len(ALL_IN_ORDER)
+
+    records, _ = _stream(tmp_path, request_id="abc123")
+    assert _messages(records) == ["INFO generating trace_id=abc123", "upstream failed"]
+
+
+def test_min_level_filter(compose_logs, tmp_path):
+    compose_logs(SAMPLE_LOGS)
+    records, _ = _stream(tmp_path, min_level="warn")
+    assert [(r.level, r.message) for r in records] == [
+        ("warn", "slow model"),
+        ("error", "upstream failed"),
+    ]
+
+
+def test_passes_since_until_follow_and_resume_points(compose_logs, tmp_path):
+    calls = compose_logs(SAMPLE_LOGS)
+    _stream(tmp_path, since="5m", until="1m", resume={"web-app": "2026-10-17T10:00Z"})
+
+    args = {line.split()[-1]: line for line in calls.read_text().splitlines()}
+    assert "--since 5m --until 1m" in args["platform-api"]
+    assert "--since 2026-10-17T10:00Z --until 1m" in args["web-app"]
+    assert "--follow" not in args["web-app"]
+    assert "--timestamps" in args["web-app"]
+
+
+def test_follow_does_not_wait_for_an_idle_service(compose_logs, tmp_path, monkeypatch):
+    monkeypatch.setattr(logstream, "REORDER_WINDOW", 0.1)
+    compose_logs(SAMPLE_LOGS, delays={"web-app": 1.0})
+
+    # Without follow the merge waits for web-app and is exact
+    records, _ = _stream(tmp_path)
+    assert _messages(records) == ALL_IN_ORDER
+
+    # While following, the others are emitted once the window has passed
+    records, _ = _stream(tmp_path, follow=True)
+    assert _messages(records) == [*ALL_IN_ORDER[1:], "GET /chat 200"]
+
+
+def test_missing_docker_ends_the_stream(tmp_path, monkeypatch):
+    monkeypatch.setenv("PATH", str(tmp_path))
+    records, _ = _stream(tmp_path)
+    assert records == []
+
+
+def _record(service: str, timestamp: float) -> LogRecord:
+    return LogRecord(service=service, timestamp=timestamp, level="", message="")
+
+
+def test_interleaver_waits_for_open_streams():
+    interleaver = Interleaver(["a", "b"])
+    interleaver.push(_record("a", 2.0), arrived=0.0)
+    assert interleaver.pop_ready(now=100.0) == []
+
+    # A filtered-out record from b shows b has passed 2.0
+    interleaver.push_watermark("b", 3.0)
+    assert [r.timestamp for r in interleaver.pop_ready(now=0.0)] == [2.0]
+
+    interleaver.push(_record("a", 5.0), arrived=0.0)
+    interleaver.close("b")
+    assert [r.timestamp for r in interleaver.pop_ready(now=0.0)] == [5.0]
+
+
+def test_interleaver_window():
+    interleaver = Interleaver(["a", "b"], window=0.5)
+    interleaver.push(_record("a", 1.0), arrived=10.0)
+    assert interleaver.pop_ready(now=10.4) == []
+    assert len(interleaver.pop_ready(now=10.5)) == 1
+
+
+@pytest.mark.parametrize(
+    ("line", "level", "request_id", "trace_id"),
+    [
+        ('{"level": "WARNING", "msg": "x", "request_id": "r"}', "warn", "r", None),
+        ('{"severity": "err", "span": {"trace_id": "t"}}', "error", None, "t"),
+        ('{"lvl": "info", "fields": {"extra": {"requestId": "r"}}}', "info", "r", None),
+        # Context is only searched two objects deep
+        ('{"fields": {"span": {"context": {"trace_id": "t"}}}}', "", None, None),
+        ("ERROR something request_id=r-1 trace_id=ab12", "error", "r-1", "ab12"),
+        ("no level here", "", None, None),
+    ],
+)
+def test_parse_line(line, level, request_id, trace_id):
+    record = parse_line("svc", f"2026-10-17T11:00:00.123456789Z {line}\n")
+    assert record.timestamp == pytest.approx(1792234800.123456789)
+    assert (record.level, record.request_id, record.trace_id) == (
+        level,
+        request_id,
+        trace_id,
+    )
+    assert record.line == line
+
+
+def test_matches():
+    record = parse_line("svc", "no level request_id=r")
+    assert matches(record, request_id="r")
+    assert not matches(record, request_id="other")
+    # Lines without a level only pass when no level filter is set
+    assert not matches(record, min_level="trace")
@@ -0,0 +1,113 @@
+"""Tests for running validation steps in their own process groups."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from stack.process import Cancellation, run_step
+
+pytestmark = pytest.mark.skipif(
+    not Path("/proc/self/stat").exists(), reason="needs /proc"
+)
+
+# Starts a grandchild in the step's process group and prints its pid. A step
+# that outlives its timeout holds the pipe open until the grandchild exits.
+SPAWN_GRANDCHILD = ["sh", "-c", "sleep 15 & echo $!; wait"]
+
+
+def _alive(pid: int) -> bool:
+    """Whether a process exists and is not a zombie awaiting its reaper."""
+    try:
+        stat = Path(f"/proc/{pid}/stat").read_text()
+    except FileNotFoundError:
+        return False
+    return stat.rsplit(")", 1)[1].split()[0] != "Z"
+
+
+def _wait_dead(pid: int, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while _alive(pid):
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+def test_captures_output_and_exit_code(tmp_path):
+    run = run_step(
+        ["sh", "-c", 'echo "out $STEP_NAME"; echo err >&2; exit 3'],
+        cwd=tmp_path,
+        timeout=30,
+        env={"STEP_NAME": "lint"},
+    )
+
+    assert run.returncode == 3
+    assert run.stdout == "out lint\n"
+    assert run.stderr == "err\n"
+    assert not run.timed_out
+    assert not run.cancelled
+    assert run.cpu_time is not None
+
+
+def test_merges_output_when_streaming_lines(tmp_path):
+    lines = []
+
+    run = run_step(
+        ["sh", "-c", "echo one; echo two >&2"],
+        cwd=tmp_path,
+        timeout=30,
+        on_line=lines.append,
+    )
+
+    assert run.returncode == 0
+    assert [line.rstrip("\n") for line in lines] == ["one", "two"]
+
+
+def test_timeout_kills_the_whole_process_group(tmp_path):
+    run = run_step(SPAWN_GRANDCHILD, cwd=tmp_path, timeout=0.5)
+
+    assert run.timed_out
+    assert not run.cancelled
+    assert run.returncode != 0
+    assert run.wall_time < 10
+    assert _wait_dead(int(run.stdout.split()[0]))
+
+
+def test_cancellation_terminates_the_whole_process_group(tmp_path):
+    cancellation = Cancellation()
+    pids = []
+
+    def on_line(line: str) -> None:
+        pids.append(int(line))
+        threading.Thread(target=cancellation.cancel).start()
+
+    run = run_step(
+        SPAWN_GRANDCHILD,
+        cwd=tmp_path,
+        timeout=30,
+        cancellation=cancellation,
+        on_line=on_line,
+    )
+
+    assert run.cancelled
+    assert not run.timed_out
+    assert run.wall_time < 10
+    assert _wait_dead(pids[0])
+
+
+def test_steps_started_after_cancellation_are_terminated(tmp_path):
+    cancellation = Cancellation()
+    cancellation.cancel()
+
+    run = run_step(
+        [sys.executable, "-c", "import time; time.sleep(60)"],
+        cwd=tmp_path,
+        timeout=30,
+        cancellation=cancellation,
+    )
+
+    assert run.cancelled
+    assert run.wall_time < 10
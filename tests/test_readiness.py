@@ -0,0 +1,37 @@
+"""Tests for reading compose service state."""
+
+from stack.readiness import get_compose_services
+
+RUNNING = '{"Service": "db", "State": "running", "Health": "healthy", "Name": "s-db-1"}'
+EXITED = '{"Service": "migrate", "State": "exited", "ExitCode": 1, "Project": "s"}'
+
+
+def test_line_delimited_output(fake_docker, tmp_path):
+    fake_docker(f"cat <<'JSON'\n{RUNNING}\n{EXITED}\nJSON")
+    services = get_compose_services(tmp_path)
+    assert services["db"]["health"] == "healthy"
+    assert services["db"]["name"] == "s-db-1"
+    assert services["migrate"]["exit_code"] == 1
+    assert services["migrate"]["project"] == "s"
+
+
+def test_array_output(fake_docker, tmp_path):
+    fake_docker(f"cat <<'JSON'\n[{RUNNING}, {EXITED}]\nJSON")
+    assert sorted(get_compose_services(tmp_path)) == ["db", "migrate"]
+
+
+def test_empty_output_means_no_services(fake_docker, tmp_path):
+    fake_docker("exit 0")
+    assert get_compose_services(tmp_path) == {}
+
+
+def test_skips_lines_that_are_not_json(fake_docker, tmp_path):
+    fake_docker(f"echo 'WARN[0000] version is obsolete'\necho '{RUNNING}'")
+    assert list(get_compose_services(tmp_path)) == ["db"]
+
+
+def test_unreadable_array_or_failure_is_none(fake_docker, tmp_path):
+    fake_docker("echo '[{\"Service\": '")
+    assert get_compose_services(tmp_path) is None
+    fake_docker("exit 1")
+    assert get_compose_services(tmp_path) is None
@@ -0,0 +1,106 @@
+"""Tests for splitting pytest runs into shards by recorded duration."""
+
+import sys
+
+import pytest
+
+from stack import sharding
+
+QUIET_COLLECTION = """\
+tests/test_api.py::test_create
+tests/test_api.py::test_delete[a-b]
+tests/test_web.py::TestViews::test_index
+
+3 tests collected in 0.01s
+"""
+
+VERY_QUIET_COLLECTION = """\
+tests/test_api.py: 2
+tests/test_web.py: 1
+
+3 tests collected in 0.01s
+"""
+
+JUNIT_REPORT = """\
+<?xml version="1.0" encoding="utf-8"?>
+<testsuites>
+  <testsuite name="pytest" tests="4">
+    <testcase classname="tests.test_api" name="test_create"
+              file="tests/test_api.py" time="1.25" />
+    <testcase classname="tests.test_api" name="test_delete"
+              file="tests/test_api.py" time="0.5" />
+    <testcase classname="tests.test_web" name="test_index"
+              file="tests/test_web.py" time="2.0" />
+    <testcase classname="tests.test_web" name="test_skipped"
+              file="tests/test_web.py" />
+  </testsuite>
+</testsuites>
+"""
+
+
+def _printing(output: str, returncode: int = 0) -> list[str]:
+    """A stand-in pytest command that prints output and exits."""
+    script = f"import sys; sys.stdout.write({output!r}); sys.exit({returncode})"
+    return [sys.executable, "-c", script]
+
+
+@pytest.mark.parametrize("output", [QUIET_COLLECTION, VERY_QUIET_COLLECTION])
+def test_collects_test_files_from_either_verbosity(output, tmp_path):
+    files = sharding.collect_test_files(_printing(output), tmp_path)
+
+    assert files == ["tests/test_api.py", "tests/test_web.py"]
+
+
+def test_failed_collection_yields_no_files(tmp_path):
+    cmd = _printing(QUIET_COLLECTION, returncode=2)
+
+    assert sharding.collect_test_files(cmd, tmp_path) == []
+
+
+def test_partition_assigns_slowest_files_first():
+    durations = {"a.py": 5, "b.py": 4, "c.py": 3, "d.py": 3, "e.py": 1}
+
+    shards = sharding.partition(list(durations), durations, 2)
+
+    assert shards == [["a.py", "d.py"], ["b.py", "c.py", "e.py"]]
+
+
+def test_partition_uses_median_for_files_without_history():
+    durations = {"a.py": 6, "b.py": 2, "c.py": 4}
+
+    shards = sharding.partition(["a.py", "b.py", "c.py", "new.py"], durations, 2)
+
+    # new.py is assumed to take the median 4s, like c.py
+    assert shards == [["a.py", "b.py"], ["c.py", "new.py"]]
+
+
+def test_partition_never_creates_empty_shards():
+    assert sharding.partition(["a.py"], {}, 4) == [["a.py"]]
+    assert sharding.partition([], {}, 4) == []
+
+
+def test_reads_per_file_durations_from_junit(tmp_path):
+    report = tmp_path / "junit.xml"
+    report.write_text(JUNIT_REPORT)
+
+    durations = sharding.read_junit_durations(report)
+
+    assert durations == {"tests/test_api.py": 1.75, "tests/test_web.py": 2.0}
+
+
+def test_unreadable_junit_yields_no_durations(tmp_path):
+    report = tmp_path / "junit.xml"
+    assert sharding.read_junit_durations(report) == {}
+
+    report.write_text("<testsuites>")
+    assert sharding.read_junit_durations(report) == {}
+
+
+def test_saved_durations_merge_with_recorded_ones(monkeypatch, tmp_path):
+    monkeypatch.setattr(sharding, "get_workspace_root", lambda: tmp_path)
+    assert sharding.load_durations("api") == {}
+
+    sharding.save_durations("api", {"a.py": 1.0, "b.py": 2.0})
+    sharding.save_durations("api", {"b.py": 3.0})
+
+    assert sharding.load_durations("api") == {"a.py": 1.0, "b.py": 3.0}
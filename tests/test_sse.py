@@ -0,0 +1,108 @@
+"""Tests for the incremental SSE parser."""
+
+import asyncio
+import json
+
+import pytest
+
+from stack import sse
+
+STREAM = (
+    "﻿: keep-alive\r\n"
+    "event: TokenDelta\r\n"
+    'data: {"content": "héllo ✓"}\r\n'
+    "id: 1\r\n"
+    "\r\n"
+    "event: metrics\r"
+    "data: first line\r"
+    "data: second line\r"
+    "retry: 1500\r"
+    "\r"
+    "data: no type\n"
+    "retry: soon\n"
+    "\n"
+    "event: Done\n"
+    "data: {}\n"
+    "\n"
+).encode()
+
+
+def _parse_bytewise(stream: bytes) -> list[sse.Event]:
+    parser = sse.SSEParser()
+    events = []
+    for offset in range(len(stream)):
+        events.extend(parser.feed(stream[offset : offset + 1], received_at=offset))
+    return events
+
+
+def _summary(events: list[sse.Event]) -> list[tuple]:
+    return [(e.type, e.data, e.id, e.retry) for e in events]
+
+
+EXPECTED = [
+    ("token_delta", '{"content": "héllo ✓"}', "1", None),
+    ("metrics", "first line\nsecond line", "1", 1500),
+    ("message", "no type", "1", None),
+    ("done", "{}", "1", None),
+]
+
+
+def test_byte_by_byte_matches_whole_stream():
+    assert _summary(_parse_bytewise(STREAM)) == EXPECTED
+    assert _summary(sse.SSEParser().feed(STREAM)) == EXPECTED
+
+
+@pytest.mark.parametrize("split", [1, 2, 3, 5, 7])
+def test_chunk_boundaries_do_not_matter(split):
+    chunks = [STREAM[i : i + split] for i in range(0, len(STREAM), split)]
+    assert _summary(sse.iter_events(chunks)) == EXPECTED
+
+
+def test_byte_by_byte_keeps_split_utf8_and_payloads():
+    (token, *_, done) = _parse_bytewise(STREAM)
+    assert token.content == "héllo ✓"
+    assert token.payload == json.loads(token.data)
+    assert done.payload == {}
+    assert done.content is None
+
+
+def test_received_at_is_the_chunk_that_completed_the_event():
+    events = _parse_bytewise(STREAM)
+    # A CR ends a line on arrival, without waiting to see if an LF follows
+    ends = [STREAM.index(b"\r\n\r\n") + 2, STREAM.index(b"\r\r") + 1]
+    assert [e.received_at for e in events[:2]] == ends
+
+
+def test_crlf_split_across_chunks_is_one_line_end():
+    parser = sse.SSEParser()
+    assert parser.feed(b"data: a\r") == []
+    assert parser.feed(b"\n") == []
+    (event,) = parser.feed(b"\r\n")
+    assert event.data == "a"
+
+
+def test_events_without_data_are_not_dispatched():
+    assert sse.SSEParser().feed(b"event: done\n\n: comment\n\n") == []
+
+
+def test_incomplete_event_is_held_back():
+    parser = sse.SSEParser()
+    assert parser.feed(b"data: partial\n") == []
+    assert [e.data for e in parser.feed(b"\n")] == ["partial"]
+
+
+def test_aiter_events():
+    async def chunks():
+        for offset in range(len(STREAM)):
+            yield STREAM[offset : offset + 1]
+
+    async def collect():
+        return [event async for event in sse.aiter_events(chunks())]
+
+    assert _summary(asyncio.run(collect())) == EXPECTED
+
+
+def test_normalize_type():
+    assert sse.normalize_type("TokenDelta") == sse.TOKEN_DELTA
+    assert sse.normalize_type("token-delta") == sse.TOKEN_DELTA
+    assert sse.normalize_type("") == sse.DEFAULT_TYPE
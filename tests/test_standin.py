@@ -0,0 +1,133 @@
+"""Record/replay round trips through the PCP stand-in server."""
+
+import asyncio
+import json
+
+import httpx
+from conftest import serving
+
+from stack import sse
+from stack.standin import (
+    API_PREFIX,
+    RecordingServer,
+    ReplayServer,
+    StandinServer,
+    load_cassette,
+    route_key,
+)
+
+SESSION_ID = "0b6f1c4e-2d7a-4c1e-9f3b-5a8d7e6c4b21"
+OTHER_SESSION_ID = "7c2e9a10-4b3d-4f6e-8a1c-2d5e7f9b0a34"
+
+# A token event whose "é" is split across two chunks, then metrics and done
+TURN_CHUNKS = [
+    b'event: token_delta\ndata: {"content": "caf\xc3',
+    b'\xa9 \xe2\x9c',
+    b'\x93"}\n\n',
+    b'event: metrics\ndata: {"output_tokens": 1}\n\nevent: done\ndata: {}\n\n',
+]
+
+
+class _Upstream(StandinServer):
+    """A fake PCP with one session that streams TURN_CHUNKS slowly."""
+
+    async def handle(self, request, response) -> None:
+        key = route_key(request.method, request.path)
+        if key == f"POST {API_PREFIX}/chat/sessions":
+            await response.send_json(201, {"id": SESSION_ID})
+        elif request.path == f"{API_PREFIX}/chat/sessions/{SESSION_ID}/turns":
+            await response.start_stream()
+            for chunk in TURN_CHUNKS:
+                # Separate writes arrive as separate chunks at the recorder
+                await asyncio.sleep(0.02)
+                await response.write(chunk)
+            await response.end_stream()
+        else:
+            await response.send_json(404, {"detail": "Session not found"})
+
+
+async def _conversation(base_url: str, session_id: str | None = None) -> dict:
+    """Create a session, stream one turn and hit a missing session."""
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        created = await client.post("/chat/sessions", json={"title": "t"})
+        session_id = session_id or created.json()["id"]
+        async with client.stream(
+            "POST", f"/chat/sessions/{session_id}/turns", json={"message": "hi"}
+        ) as response:
+            events = [
+                (event.type, event.payload)
+                async for event in sse.aiter_events(response.aiter_bytes())
+            ]
+            turn_status = response.status_code
+        missing = await client.post(
+            f"/chat/sessions/{OTHER_SESSION_ID}/turns", json={"message": "hi"}
+        )
+    return {
+        "created": (created.status_code, created.json()),
+        "turn": (turn_status, events),
+        "missing": missing.status_code,
+    }
+
+
+async def _record(cassette_path) -> dict:
+    async with serving(_Upstream()) as upstream_url:
+        recorder = RecordingServer(upstream_url.removesuffix(API_PREFIX), cassette_path)
+        try:
+            async with serving(recorder) as recorder_url:
+                return await _conversation(recorder_url)
+        finally:
+            await recorder.client.aclose()
+
+
+async def _replay(cassette_path, session_id: str | None = None) -> dict:
+    async with serving(ReplayServer(load_cassette(cassette_path), speed=0)) as url:
+        return await _conversation(url, session_id)
+
+
+def test_record_then_replay_round_trip(tmp_path):
+    cassette_path = tmp_path / "cassettes" / "turn.json"
+    recorded = asyncio.run(_record(cassette_path))
+
+    assert recorded["created"] == (201, {"id": SESSION_ID})
+    assert recorded["turn"] == (
+        200,
+        [
+            ("token_delta", {"content": "café ✓"}),
+            ("metrics", {"output_tokens": 1}),
+            ("done", {}),
+        ],
+    )
+    assert recorded["missing"] == 404
+    assert asyncio.run(_replay(cassette_path)) == recorded
+
+
+def test_recorded_chunks_keep_split_utf8_intact(tmp_path):
+    cassette_path = tmp_path / "turn.json"
+    asyncio.run(_record(cassette_path))
+
+    cassette = json.loads(cassette_path.read_text())
+    (turn,) = [e for e in cassette["exchanges"] if e.get("chunks") is not None]
+    texts = [text for _, text in turn["chunks"]]
+    assert "".join(texts) == b"".join(TURN_CHUNKS).decode()
+    assert all(text and "�" not in text for text in texts)
+    offsets = [offset for offset, _ in turn["chunks"]]
+    assert offsets == sorted(offsets)
+
+
+def test_replay_serves_recorded_turn_for_any_session(tmp_path):
+    cassette_path = tmp_path / "turn.json"
+    recorded = asyncio.run(_record(cassette_path))
+
+    # The turn route group answers for a session id it never saw, but the
+    # recorded 404 stays tied to the exact path it was recorded for
+    replayed = asyncio.run(
+        _replay(cassette_path, "11111111-2222-4333-8444-555555555555")
+    )
+    assert replayed["turn"] == recorded["turn"]
+    assert replayed["missing"] == 404
+
+
+def test_route_key_normalizes_ids_and_query():
+    assert route_key("POST", f"/chat/sessions/{SESSION_ID}/turns?x=1") == (
+        "POST /chat/sessions/{id}/turns"
+    )
@@ -0,0 +1,127 @@
+"""Tests for `stack sync` against local bare repositories."""
+
+import pytest
+from conftest import commit, git
+
+from stack.commands import sync as sync_cmd
+from stack.config import Repo, RepoGraph
+
+
+@pytest.fixture
+def checkout(git_remote, tmp_path):
+    """Clone a fresh bare repo; returns (checkout, work tree that can push)."""
+
+    def create(name: str):
+        bare, work = git_remote(name)
+        path = tmp_path / "checkouts" / name
+        git(tmp_path, "clone", str(bare), str(path))
+        return path, work
+
+    return create
+
+
+def push(work, filename: str = "README", content: str = "update\n") -> None:
+    commit(work, filename, content)
+    git(work, "push")
+
+
+def test_fast_forwards_clean_repo_behind_upstream(checkout):
+    path, work = checkout("api")
+    push(work)
+    push(work, "NOTES", "notes\n")
+
+    result = sync_cmd._sync_repo(path)
+
+    assert result["state"] == "fast-forwarded"
+    assert result["pulled"] == 2
+    assert result["behind"] == 0
+    assert (path / "NOTES").read_text() == "notes\n"
+
+
+def test_up_to_date_and_ahead(checkout):
+    path, _ = checkout("api")
+    assert sync_cmd._sync_repo(path)["state"] == "up-to-date"
+
+    commit(path, "LOCAL", "local\n")
+    result = sync_cmd._sync_repo(path)
+    assert result["state"] == "ahead"
+    assert result["ahead"] == 1
+
+
+def test_dirty_repo_is_left_alone(checkout):
+    path, work = checkout("api")
+    push(work)
+    (path / "README").write_text("local edit\n")
+    (path / "scratch").write_text("")
+
+    result = sync_cmd._sync_repo(path)
+
+    assert result["state"] == "dirty"
+    assert (result["changed"], result["untracked"]) == (1, 1)
+    assert (path / "README").read_text() == "local edit\n"
+
+
+def test_diverged_repo_is_left_alone(checkout):
+    path, work = checkout("api")
+    push(work)
+    commit(path, "LOCAL", "local\n")
+
+    result = sync_cmd._sync_repo(path)
+
+    assert result["state"] == "diverged"
+    assert (result["ahead"], result["behind"]) == (1, 1)
+
+
+def test_detached_and_no_upstream(checkout):
+    path, _ = checkout("api")
+    git(path, "checkout", "--detach")
+    assert sync_cmd._sync_repo(path)["state"] == "detached"
+
+    git(path, "checkout", "-b", "topic")
+    assert sync_cmd._sync_repo(path)["state"] == "no-upstream"
+
+
+def test_sync_reports_missing_and_fails_on_fetch_error(
+    checkout, monkeypatch, tmp_path
+):
+    path, work = checkout("api")
+    push(work)
+    broken, _ = checkout("web")
+    git(broken, "remote", "set-url", "origin", str(tmp_path / "missing.git"))
+    graph = RepoGraph(
+        {
+            key: Repo(key, None, repo_path, None, (), {})
+            for key, repo_path in {
+                "api": path,
+                "web": broken,
+                "gone": tmp_path / "gone",
+            }.items()
+        }
+    )
+    monkeypatch.setattr(sync_cmd, "get_repo_graph", lambda: graph)
+
+    with pytest.raises(SystemExit) as exc:
+        sync_cmd.sync(jobs=2)
+
+    assert exc.value.code == 1
+    assert (path / "README").read_text() == "update\n"
+
+
+def test_parse_branch_status():
+    output = (
+        "# branch.oid 1234\n"
+        "# branch.head main\n"
+        "# branch.upstream origin/main\n"
+        "# branch.ab +2 -3\n"
+        "1 .M N... 100644 100644 100644 abc abc file.py\n"
+        "? new.txt\n"
+        "! ignored.log\n"
+    )
+    assert sync_cmd._parse_branch_status(output) == {
+        "branch": "main",
+        "upstream": "origin/main",
+        "ahead": 2,
+        "behind": 3,
+        "changed": 1,
+        "untracked": 1,
+    }
@@ -0,0 +1,97 @@
+"""Tests for the dependency scheduler behind `stack validate`."""
+
+import threading
+
+import pytest
+
+from stack.commands.validate import _run_scheduled
+from stack.process import Cancellation
+
+
+def _recorder(statuses: dict[str, str] | None = None):
+    """Build a run function that records the keys it ran, in order."""
+    ran = []
+    lock = threading.Lock()
+
+    def run(key: str) -> dict:
+        with lock:
+            ran.append(key)
+        return {"status": (statuses or {}).get(key, "passed")}
+
+    return run, ran
+
+
+def test_runs_each_node_after_its_dependencies():
+    dependencies = {"lint": [], "build": ["lint"], "test": ["build"], "docs": []}
+    run, ran = _recorder()
+
+    results = _run_scheduled(dependencies, run, max_workers=4)
+
+    assert list(results) == ["lint", "build", "test", "docs"]
+    assert all(result["status"] == "passed" for result in results.values())
+    assert ran.index("lint") < ran.index("build") < ran.index("test")
+
+
+def test_failed_dependency_blocks_its_dependents_transitively():
+    dependencies = {"api": [], "sdk": ["api"], "web": ["sdk"], "docs": []}
+    run, ran = _recorder({"api": "failed"})
+
+    results = _run_scheduled(dependencies, run, max_workers=2)
+
+    assert sorted(ran) == ["api", "docs"]
+    assert results["api"]["status"] == "failed"
+    assert results["sdk"] == {"status": "blocked", "details": "Upstream failed: api"}
+    assert results["web"] == {"status": "blocked", "details": "Upstream failed: sdk"}
+    assert results["docs"]["status"] == "passed"
+
+
+def test_non_blocking_statuses_let_dependents_run():
+    dependencies = {"api": [], "web": ["api"]}
+    run, ran = _recorder({"api": "slow"})
+
+    results = _run_scheduled(
+        dependencies, run, max_workers=1, blocking_statuses={"failed"}
+    )
+
+    assert ran == ["api", "web"]
+    assert results["web"]["status"] == "passed"
+
+
+def test_cancellation_stops_starting_new_nodes():
+    cancellation = Cancellation()
+    ran = []
+
+    def run(key: str) -> dict:
+        ran.append(key)
+        # Cancelled elsewhere while this node still passes
+        cancellation.cancel()
+        return {"status": "passed"}
+
+    dependencies = {"api": [], "sdk": ["api"], "web": ["sdk"]}
+    results = _run_scheduled(
+        dependencies, run, max_workers=2, cancellation=cancellation
+    )
+
+    assert ran == ["api"]
+    assert results["api"]["status"] == "passed"
+    assert results["sdk"]["status"] == "cancelled"
+    assert results["web"]["status"] == "cancelled"
+
+
+def test_order_sets_submission_priority():
+    dependencies = {"a": [], "b": [], "c": []}
+    run, ran = _recorder()
+
+    results = _run_scheduled(dependencies, run, max_workers=1, order=("c", "a", "b"))
+
+    assert ran == ["c", "a", "b"]
+    assert list(results) == ["a", "b", "c"]
+
+
+def test_rejects_dependency_cycles():
+    dependencies = {"docs": [], "api": ["web"], "web": ["api"]}
+    run, ran = _recorder()
+
+    with pytest.raises(ValueError, match="Dependency cycle among: api, web"):
+        _run_scheduled(dependencies, run, max_workers=2)
+    assert ran == ["docs"]